@@ -6,7 +6,7 @@ class BrConfig(AppConfig):
     name = 'BR'
     
     def ready(self):
-        """Inicia el scheduler cuando Django arranca"""
-        from .scheduler import scheduler
-        if not scheduler.running:
+        """Inicia el scheduler cuando arranca el servidor web (PROGRAMADOR_ACTIVO)"""
+        from .scheduler import programador_habilitado, scheduler
+        if programador_habilitado() and not scheduler.running:
             scheduler.start()
@@ -7,16 +7,34 @@ from apscheduler.triggers.date import DateTrigger
 from apscheduler.triggers.interval import IntervalTrigger
 from datetime import datetime
 import pytz
+import multiprocessing
 import os
 import subprocess
+import sys
 from pathlib import Path
 from django.conf import settings
 import boto3
 from botocore.exceptions import NoCredentialsError
 
-# Scheduler global
+# Scheduler global; solo se inicia en el servidor web (ver programador_habilitado)
 scheduler = BackgroundScheduler(timezone=pytz.UTC)
-scheduler.start()
+
+def programador_habilitado():
+    """
+    True solo en el proceso del servidor web con PROGRAMADOR_ACTIVO. No en los
+    comandos de manage.py, ni en el proceso vigía del autoreload de runserver,
+    ni en los hijos de los pools de procesos (heredan el entorno del worker).
+    """
+    if not getattr(settings, 'PROGRAMADOR_ACTIVO', False):
+        return False
+    if multiprocessing.parent_process() is not None:
+        return False
+    if os.path.basename(sys.argv[0]) == 'manage.py':
+        if sys.argv[1:2] != ['runserver']:
+            return False
+        if '--noreload' not in sys.argv and os.environ.get('RUN_MAIN') != 'true':
+            return False
+    return True
 
 def ejecutar_backup():
     """Función que ejecuta el backup y lo sube a S3"""
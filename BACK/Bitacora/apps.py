@@ -1,6 +1,13 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class BitacoraConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'Bitacora'
+
+    def ready(self):
+        # Vaciar la cola del escritor también cuando el proceso termina por señal
+        if getattr(settings, 'BITACORA_ASYNC', True):
+            from .writer import instalar_senales
+            instalar_senales()
@@ -0,0 +1,289 @@
+"""
+Clasificador ruta -> acción de la bitácora, precompilado.
+
+Antes cada petición auditada recorría las cadenas if/elif de subcadenas
+sobre request.path. Ahora las reglas se evalúan una sola vez por patrón de
+URL (las rutas resueltas de backwf/urls.py) y método, y el resultado queda
+en una tabla: acción, descripción base y qué campos del body aportan
+detalles a la descripción.
+"""
+import re
+import threading
+from collections import namedtuple
+
+from django.urls import Resolver404, URLPattern, URLResolver, get_resolver, resolve
+
+Regla = namedtuple('Regla', ['accion', 'descripcion', 'detalles'])
+
+METODOS_AUDITADOS = ('POST', 'PUT', 'PATCH', 'DELETE')
+
+_CONVERSORES = re.compile(r'<[^>]+>')
+
+
+def _normalizar(route):
+    """'api/personal/eliminar/<int:id>' -> '/api/personal/eliminar/'"""
+    return '/' + _CONVERSORES.sub('', route).lower()
+
+
+def _accion(metodo, ruta):
+    """Tipo de acción según el método HTTP y la ruta"""
+    # === AUTENTICACIÓN Y USUARIOS ===
+    if 'login' in ruta:
+        return 'INICIO_SESION'
+    elif 'register' in ruta or 'registro' in ruta:
+        return 'REGISTRO_USUARIO'
+    elif 'logout' in ruta:
+        return 'CIERRE_SESION'
+    elif 'newpassword' in ruta or 'actualizar_password' in ruta:
+        return 'CAMBIO_PASSWORD'
+    elif 'permisos' in ruta:
+        if metodo == 'POST':
+            return 'ASIGNACION_PERMISOS'
+        elif metodo in ['PUT', 'PATCH']:
+            return 'MODIFICACION_PERMISOS'
+        elif metodo == 'DELETE':
+            return 'ELIMINACION_PERMISOS'
+        else:
+            return 'CONSULTA_PERMISOS'
+    elif 'usuario' in ruta:
+        if metodo == 'POST':
+            return 'CREACION_USUARIO'
+        elif metodo in ['PUT', 'PATCH']:
+            return 'ACTUALIZACION_USUARIO'
+        elif metodo == 'DELETE':
+            return 'ELIMINACION_USUARIO'
+
+    # === PERSONAL/EMPLEADOS ===
+    elif 'personal' in ruta or 'empleado' in ruta:
+        if metodo == 'POST':
+            return 'REGISTRO_EMPLEADO'
+        elif metodo in ['PUT', 'PATCH']:
+            return 'ACTUALIZACION_EMPLEADO'
+        elif metodo == 'DELETE':
+            return 'ELIMINACION_EMPLEADO'
+
+    # === TURNOS ===
+    elif 'turno' in ruta:
+        if 'desactivar' in ruta:
+            return 'DESACTIVACION_TURNO'
+        elif metodo == 'POST':
+            return 'CREACION_TURNO'
+        elif metodo in ['PUT', 'PATCH']:
+            return 'ACTUALIZACION_TURNO'
+        elif metodo == 'DELETE':
+            return 'ELIMINACION_TURNO'
+
+    # === ASISTENCIAS ===
+    elif 'asistencia' in ruta:
+        if metodo == 'POST':
+            return 'REGISTRO_ASISTENCIA'
+        elif metodo in ['PUT', 'PATCH']:
+            return 'ACTUALIZACION_ASISTENCIA'
+        elif metodo == 'DELETE':
+            return 'ELIMINACION_ASISTENCIA'
+    # === GENÉRICO ===
+    elif metodo == 'POST':
+        return 'CREACION'
+    elif metodo == 'PUT':
+        return 'ACTUALIZACION_COMPLETA'
+    elif metodo == 'PATCH':
+        return 'ACTUALIZACION_PARCIAL'
+    elif metodo == 'DELETE':
+        return 'ELIMINACION'
+
+    return f'{metodo}_REQUEST'
+
+
+def _extraer_modulo(ruta):
+    """Extrae el módulo de la ruta para descripciones genéricas"""
+    partes = ruta.split('/')
+    if len(partes) > 2:
+        modulo = partes[2]
+        # Capitalizar y hacer más legible
+        return modulo.replace('_', ' ').capitalize()
+    return 'el sistema'
+
+
+def _descripcion(metodo, ruta):
+    """Descripción legible y natural de la acción"""
+    # === AUTENTICACIÓN ===
+    if 'login' in ruta:
+        return 'Usuario inició sesión en el sistema'
+
+    if 'register' in ruta or 'registro' in ruta:
+        return 'Se registró un nuevo usuario en el sistema'
+
+    if 'logout' in ruta:
+        return 'Usuario cerró sesión'
+
+    if 'newpassword' in ruta or 'actualizar_password' in ruta:
+        return 'Usuario cambió su contraseña'
+
+    # === PERMISOS ===
+    if 'permisos' in ruta:
+        if metodo == 'POST':
+            return 'Usuario asignó permisos a otro usuario'
+        elif metodo in ['PUT', 'PATCH']:
+            return 'Usuario modificó los permisos de otro usuario'
+        elif metodo == 'DELETE':
+            return 'Usuario eliminó permisos de otro usuario'
+        else:
+            return 'Usuario consultó permisos'
+
+    # === USUARIOS ===
+    if 'usuario' in ruta and 'empleado' not in ruta:
+        if 'actualizarempleadousuario' in ruta:
+            return 'Usuario actualizó la vinculación empleado-usuario'
+        elif 'tipo_usuario' in ruta:
+            return 'Usuario consultó el tipo de usuario'
+        elif 'username_email' in ruta:
+            return 'Usuario consultó información por email'
+        elif metodo == 'POST':
+            return 'Usuario creó una nueva cuenta de usuario'
+        elif metodo in ['PUT', 'PATCH']:
+            return 'Usuario actualizó información de un usuario'
+        elif metodo == 'DELETE':
+            return 'Usuario eliminó una cuenta de usuario'
+
+    # === PERSONAL/EMPLEADOS ===
+    if 'personal' in ruta or 'empleado' in ruta:
+        if 'registrar' in ruta or metodo == 'POST':
+            return 'Usuario registró un nuevo empleado en el sistema'
+        elif 'actualizar' in ruta or metodo in ['PUT', 'PATCH']:
+            return 'Usuario actualizó la información de un empleado'
+        elif 'eliminar' in ruta or metodo == 'DELETE':
+            return 'Usuario eliminó un empleado del sistema'
+        elif 'getempleado' in ruta:
+            return 'Usuario consultó información de empleados'
+
+    # === TURNOS ===
+    if 'turno' in ruta:
+        if 'desactivar' in ruta:
+            return 'Usuario desactivó un turno'
+        elif 'agregar' in ruta or metodo == 'POST':
+            return 'Usuario creó un nuevo turno de trabajo'
+        elif metodo in ['PUT', 'PATCH']:
+            return 'Usuario modificó un turno existente'
+        elif metodo == 'DELETE':
+            return 'Usuario eliminó un turno'
+        elif 'listar' in ruta:
+            return 'Usuario consultó la lista de turnos'
+
+    # === ASISTENCIAS ===
+    if 'asistencia' in ruta:
+        if 'agregar' in ruta or metodo == 'POST':
+            return 'Usuario registró una asistencia de empleado'
+        elif metodo in ['PUT', 'PATCH']:
+            return 'Usuario modificó un registro de asistencia'
+        elif metodo == 'DELETE':
+            return 'Usuario eliminó un registro de asistencia'
+        elif 'listar' in ruta:
+            return 'Usuario consultó registros de asistencias'
+
+    # === GENÉRICO CON CONTEXTO ===
+    modulo = _extraer_modulo(ruta)
+
+    if metodo == 'POST':
+        return f'Usuario creó un nuevo registro en {modulo}'
+    elif metodo in ['PUT', 'PATCH']:
+        return f'Usuario actualizó información en {modulo}'
+    elif metodo == 'DELETE':
+        return f'Usuario eliminó un registro de {modulo}'
+
+    return f'Usuario realizó una operación en {modulo}'
+
+
+def _detalles(ruta):
+    """
+    Campos del body que enriquecen la descripción: lista de
+    (etiqueta, claves alternativas) en el orden en que se agregan.
+    """
+    detalles = []
+    # Para empleados, agregar nombre si está disponible
+    if 'empleado' in ruta or 'personal' in ruta:
+        detalles.append(('Empleado', ('nombre', 'nombre_completo')))
+    # Para turnos, agregar tipo de turno
+    if 'turno' in ruta:
+        detalles.append(('Turno', ('turno', 'turno_nombre')))
+    # Para asistencias, agregar información del empleado
+    if 'asistencia' in ruta:
+        detalles.append(('Empleado', ('nombre',)))
+        detalles.append(('Estado', ('estado',)))
+    # Para usuarios, agregar email o tipo
+    if 'usuario' in ruta:
+        if 'register' in ruta:
+            detalles.append(('Email', ('email',)))
+        detalles.append(('Tipo', ('tipo_usuario',)))
+    # Para permisos, agregar usuario afectado
+    if 'permiso' in ruta:
+        detalles.append(('Para usuario', ('name_user', 'username')))
+        detalles.append(('Ventana', ('ventana',)))
+    return tuple(detalles)
+
+
+def compilar_regla(metodo, ruta):
+    return Regla(_accion(metodo, ruta), _descripcion(metodo, ruta), _detalles(ruta))
+
+
+def _recorrer(patrones, prefijo=''):
+    for patron in patrones:
+        if isinstance(patron, URLResolver):
+            yield from _recorrer(patron.url_patterns, prefijo + str(patron.pattern))
+        elif isinstance(patron, URLPattern):
+            yield prefijo + str(patron.pattern)
+
+
+class ClasificadorRutas:
+    """Tabla (route, método) -> Regla construida una vez desde el URLconf."""
+
+    def __init__(self):
+        self._tabla = None
+        self._lock = threading.Lock()
+
+    def _construir(self):
+        tabla = {}
+        for route in _recorrer(get_resolver().url_patterns):
+            ruta = _normalizar(route)
+            for metodo in METODOS_AUDITADOS:
+                tabla[(route, metodo)] = compilar_regla(metodo, ruta)
+        return tabla
+
+    @property
+    def tabla(self):
+        if self._tabla is None:
+            with self._lock:
+                if self._tabla is None:
+                    self._tabla = self._construir()
+        return self._tabla
+
+    def route_de(self, request):
+        """Patrón de URL de la petición (o None si no resuelve)."""
+        match = getattr(request, 'resolver_match', None)
+        if match is None:
+            try:
+                match = resolve(request.path_info)
+            except Resolver404:
+                return None
+        return match.route
+
+    def regla(self, request):
+        regla = getattr(request, '_regla_bitacora', None)
+        if regla is None:
+            regla = self._buscar(request)
+            request._regla_bitacora = regla
+        return regla
+
+    def _buscar(self, request):
+        route = self.route_de(request)
+        if route is None:
+            # Rutas sin patrón: se clasifica por el path (no se cachea)
+            return compilar_regla(request.method, request.path.lower())
+        clave = (route, request.method)
+        regla = self.tabla.get(clave)
+        if regla is None:
+            regla = compilar_regla(request.method, _normalizar(route))
+            self.tabla[clave] = regla
+        return regla
+
+
+clasificador = ClasificadorRutas()
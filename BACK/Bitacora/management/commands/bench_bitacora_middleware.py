@@ -0,0 +1,91 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.urls import resolve
+
+from Bitacora import middleware as bitacora_middleware
+from Bitacora.clasificador import clasificador, compilar_regla
+
+RUTAS = [
+    ('post', '/api/usuario/login', {'name_user': 'admin', 'password': 'x'}),
+    ('post', '/api/personal/registrar/', {'nombre_completo': 'Juan Pérez', 'rol': 'Operario'}),
+    ('post', '/api/turnos/agregar', {'turno': 'Mañana'}),
+    ('put', '/api/usuario/actualizar/1', {'email': 'a@b.com', 'tipo_usuario': 'empleado'}),
+    ('post', '/api/pedidos/crear/', {'id_cliente': 1, 'observaciones': 'x' * 200}),
+    ('delete', '/api/lotes/lotes/eliminar/1/', None),
+]
+
+
+class _EscritorNulo:
+    registros = 0
+
+    def registrar(self, *args):
+        self.registros += 1
+
+
+class Command(BaseCommand):
+    help = 'Mide el costo por petición del BitacoraMiddleware (sin escribir en la base de datos)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--iteraciones',
+            type=int,
+            default=20000,
+            help='Número de peticiones simuladas (por defecto: 20000)',
+        )
+
+    def _peticiones(self, iteraciones):
+        factory = RequestFactory()
+        for i in range(iteraciones):
+            metodo, ruta, body = RUTAS[i % len(RUTAS)]
+            if body is None:
+                request = getattr(factory, metodo)(ruta)
+            else:
+                request = getattr(factory, metodo)(ruta, data=json.dumps(body), content_type='application/json')
+            # El handler de Django resuelve la URL antes del registro de bitácora
+            request.resolver_match = resolve(ruta)
+            yield request
+
+    def _medir(self, funcion, peticiones):
+        inicio = time.perf_counter()
+        for request in peticiones:
+            funcion(request)
+        return (time.perf_counter() - inicio) / len(peticiones) * 1e6
+
+    def handle(self, *args, **options):
+        iteraciones = options['iteraciones']
+        respuesta = HttpResponse(status=200)
+
+        def vista(request):
+            return respuesta
+
+        escritor_original = bitacora_middleware.escritor
+        async_original = bitacora_middleware.BITACORA_ASYNC
+        escritor_nulo = _EscritorNulo()
+        bitacora_middleware.escritor = escritor_nulo
+        bitacora_middleware.BITACORA_ASYNC = True
+        try:
+            mw = bitacora_middleware.BitacoraMiddleware(vista)
+            clasificador.tabla  # construir la tabla fuera de la medición
+
+            base = self._medir(vista, list(self._peticiones(iteraciones)))
+            con_mw = self._medir(mw, list(self._peticiones(iteraciones)))
+            sin_tabla = self._medir(
+                lambda r: compilar_regla(r.method, r.path.lower()),
+                list(self._peticiones(iteraciones)),
+            )
+            con_tabla = self._medir(clasificador.regla, list(self._peticiones(iteraciones)))
+        finally:
+            bitacora_middleware.escritor = escritor_original
+            bitacora_middleware.BITACORA_ASYNC = async_original
+
+        self.stdout.write(f'Iteraciones: {iteraciones} ({escritor_nulo.registros} registros generados)')
+        self.stdout.write(f'Vista sola:              {base:.2f} µs/petición')
+        self.stdout.write(f'Vista + middleware:      {con_mw:.2f} µs/petición')
+        self.stdout.write(self.style.SUCCESS(f'✓ Sobrecosto del middleware: {con_mw - base:.2f} µs/petición'))
+        self.stdout.write(f'Clasificación por cadenas if/elif: {sin_tabla:.2f} µs')
+        self.stdout.write(f'Clasificación con tabla precompilada: {con_tabla:.2f} µs')
+        self.stdout.write(f'Rutas en la tabla: {len(clasificador.tabla)}')
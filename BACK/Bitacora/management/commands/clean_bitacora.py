@@ -1,8 +1,14 @@
 from django.core.management.base import BaseCommand
+from django.db import connection, transaction
 from Bitacora.models import Bitacora
+from Bitacora.particiones import (
+    PARTICION_DEFAULT, es_particionada, exportar_particion, listar_particiones,
+)
 from django.utils import timezone
 from datetime import timedelta
 
+TAMANIO_LOTE_DELETE = 10000
+
 
 class Command(BaseCommand):
     help = 'Limpia registros de bitácora antiguos (más de X días)'
@@ -14,29 +20,100 @@ class Command(BaseCommand):
             default=90,
             help='Número de días de antigüedad para limpiar (por defecto: 90)',
         )
+        parser.add_argument(
+            '--exportar',
+            metavar='DIRECTORIO',
+            help='Exportar cada mes eliminado a DIRECTORIO/bitacora_AAAA_MM.jsonl.gz antes de borrarlo',
+        )
+        parser.add_argument(
+            '--yes',
+            action='store_true',
+            help='No pedir confirmación (para ejecuciones programadas)',
+        )
 
     def handle(self, *args, **options):
         dias = options['days']
         fecha_limite = timezone.now() - timedelta(days=dias)
-        
+
         try:
-            # Contar registros a eliminar
-            count = Bitacora.objects.filter(fecha_hora__lt=fecha_limite).count()
-            
-            if count == 0:
-                self.stdout.write(self.style.WARNING(f'No hay registros de bitácora mayores a {dias} días.'))
-                return
-            
-            # Confirmar acción
-            self.stdout.write(self.style.WARNING(f'Se eliminarán {count} registros de bitácora mayores a {dias} días.'))
-            confirmacion = input('¿Desea continuar? (s/n): ')
-            
-            if confirmacion.lower() == 's':
-                # Eliminar registros antiguos
-                Bitacora.objects.filter(fecha_hora__lt=fecha_limite).delete()
-                self.stdout.write(self.style.SUCCESS(f'✓ Se eliminaron {count} registros antiguos de la bitácora.'))
+            with connection.cursor() as cursor:
+                particionada = es_particionada(cursor)
+
+            if particionada:
+                self._limpiar_particiones(fecha_limite, dias, options)
             else:
-                self.stdout.write(self.style.WARNING('Operación cancelada.'))
-                
+                self._limpiar_tabla(fecha_limite, dias, options)
+
         except Exception as e:
             self.stdout.write(self.style.ERROR(f'✗ Error al limpiar bitácora: {str(e)}'))
+
+    def _confirmar(self, options):
+        if options['yes']:
+            return True
+        confirmacion = input('¿Desea continuar? (s/n): ')
+        if confirmacion.lower() == 's':
+            return True
+        self.stdout.write(self.style.WARNING('Operación cancelada.'))
+        return False
+
+    def _limpiar_particiones(self, fecha_limite, dias, options):
+        """Retención por particiones: se elimina cada mes completo anterior al límite."""
+        limite = fecha_limite.replace(tzinfo=None)
+        with connection.cursor() as cursor:
+            vencidas = [p for p in listar_particiones(cursor) if p[2] <= limite]
+
+        if not vencidas:
+            self.stdout.write(self.style.WARNING(f'No hay particiones de bitácora completas mayores a {dias} días.'))
+            return
+
+        nombres = ', '.join(nombre for nombre, _, _ in vencidas)
+        self.stdout.write(self.style.WARNING(f'Se eliminarán las particiones: {nombres}'))
+        if not self._confirmar(options):
+            return
+
+        for nombre, _, _ in vencidas:
+            if options['exportar']:
+                ruta, filas = exportar_particion(nombre, options['exportar'])
+                self.stdout.write(f'  Exportados {filas} registros a {ruta}')
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.execute(f"DROP TABLE {nombre}")
+            self.stdout.write(self.style.SUCCESS(f'✓ Partición {nombre} eliminada.'))
+
+        # Registros antiguos que hayan caído en la partición default
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {PARTICION_DEFAULT} WHERE fecha_hora < %s", [fecha_limite])
+            if cursor.rowcount:
+                self.stdout.write(self.style.SUCCESS(f'✓ Se eliminaron {cursor.rowcount} registros antiguos de {PARTICION_DEFAULT}.'))
+
+    def _limpiar_tabla(self, fecha_limite, dias, options):
+        """Tabla sin particionar: DELETE por lotes para no bloquear la tabla."""
+        # Contar registros a eliminar
+        count = Bitacora.objects.filter(fecha_hora__lt=fecha_limite).count()
+
+        if count == 0:
+            self.stdout.write(self.style.WARNING(f'No hay registros de bitácora mayores a {dias} días.'))
+            return
+
+        # Confirmar acción
+        self.stdout.write(self.style.WARNING(f'Se eliminarán {count} registros de bitácora mayores a {dias} días.'))
+        if not self._confirmar(options):
+            return
+
+        if options['exportar']:
+            self.stdout.write(self.style.WARNING(
+                'La exportación solo está disponible con la tabla particionada (ver particionar_bitacora).'
+            ))
+
+        eliminados = 0
+        while True:
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.execute("""
+                    DELETE FROM bitacora WHERE id_bitacora IN (
+                        SELECT id_bitacora FROM bitacora WHERE fecha_hora < %s LIMIT %s
+                    )
+                """, [fecha_limite, TAMANIO_LOTE_DELETE])
+                borrados = cursor.rowcount
+            eliminados += borrados
+            if borrados < TAMANIO_LOTE_DELETE:
+                break
+        self.stdout.write(self.style.SUCCESS(f'✓ Se eliminaron {eliminados} registros antiguos de la bitácora.'))
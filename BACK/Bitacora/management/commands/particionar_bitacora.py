@@ -0,0 +1,106 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from Bitacora.particiones import (
+    PARTICION_DEFAULT, TABLA, crear_particion, es_particionada, inicio_mes, sumar_meses,
+)
+
+
+class Command(BaseCommand):
+    help = ('Convierte la tabla bitacora en particiones mensuales por fecha_hora '
+            'y crea por adelantado las particiones de los próximos meses')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--meses-adelante',
+            type=int,
+            default=3,
+            help='Meses futuros para los que se crean particiones (por defecto: 3)',
+        )
+        parser.add_argument(
+            '--conservar-original',
+            action='store_true',
+            help='No eliminar la tabla original (queda como bitacora_sin_particionar)',
+        )
+        parser.add_argument(
+            '--yes',
+            action='store_true',
+            help='No pedir confirmación (para ejecuciones programadas)',
+        )
+
+    def handle(self, *args, **options):
+        meses_adelante = options['meses_adelante']
+        hasta = sumar_meses(inicio_mes(timezone.now()), meses_adelante)
+
+        try:
+            with connection.cursor() as cursor:
+                if es_particionada(cursor):
+                    # Ya está particionada: solo se crean las particiones futuras
+                    with transaction.atomic():
+                        creadas = self._crear_rango(cursor, inicio_mes(timezone.now()), hasta)
+                    self.stdout.write(self.style.SUCCESS(f'✓ Particiones nuevas: {creadas or "ninguna"}'))
+                    return
+
+                cursor.execute(f"SELECT MIN(fecha_hora), COUNT(*) FROM {TABLA}")
+                minimo, total = cursor.fetchone()
+
+            self.stdout.write(self.style.WARNING(
+                f'Se convertirá la tabla {TABLA} ({total} registros) a particiones mensuales.'
+            ))
+            if not options['yes']:
+                confirmacion = input('¿Desea continuar? (s/n): ')
+                if confirmacion.lower() != 's':
+                    self.stdout.write(self.style.WARNING('Operación cancelada.'))
+                    return
+
+            desde = inicio_mes(minimo or timezone.now())
+            with transaction.atomic(), connection.cursor() as cursor:
+                self._convertir(cursor, desde, hasta, options['conservar_original'])
+
+            self.stdout.write(self.style.SUCCESS(f'✓ Tabla {TABLA} particionada ({total} registros migrados).'))
+
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f'✗ Error al particionar la bitácora: {str(e)}'))
+
+    def _crear_rango(self, cursor, desde, hasta):
+        creadas = []
+        mes = desde
+        while mes <= hasta:
+            if crear_particion(cursor, mes):
+                creadas.append(f'{mes:%Y-%m}')
+            mes = sumar_meses(mes, 1)
+        return creadas
+
+    def _convertir(self, cursor, desde, hasta, conservar):
+        original = f'{TABLA}_sin_particionar'
+        cursor.execute(f"ALTER TABLE {TABLA} RENAME TO {original}")
+        cursor.execute(f"ALTER TABLE {original} RENAME CONSTRAINT bitacora_pkey TO {original}_pkey")
+
+        # La clave primaria de una tabla particionada debe incluir la columna de partición
+        cursor.execute(f"""
+            CREATE TABLE {TABLA} (
+                id_bitacora integer NOT NULL DEFAULT nextval('bitacora_id_bitacora_seq'::regclass),
+                username character varying(100) NOT NULL,
+                ip character varying(45) NOT NULL,
+                fecha_hora timestamp without time zone NOT NULL,
+                accion text NOT NULL,
+                descripcion text NOT NULL,
+                CONSTRAINT bitacora_pkey PRIMARY KEY (id_bitacora, fecha_hora)
+            ) PARTITION BY RANGE (fecha_hora)
+        """)
+        cursor.execute(f"CREATE INDEX bitacora_fecha_hora_idx ON {TABLA} (fecha_hora)")
+
+        # La secuencia pasa a la nueva tabla (fix_bitacora_sequence sigue funcionando)
+        cursor.execute(f"ALTER TABLE {original} ALTER COLUMN id_bitacora DROP DEFAULT")
+        cursor.execute(f"ALTER SEQUENCE bitacora_id_bitacora_seq OWNED BY {TABLA}.id_bitacora")
+
+        self._crear_rango(cursor, desde, hasta)
+        cursor.execute(f"CREATE TABLE {PARTICION_DEFAULT} PARTITION OF {TABLA} DEFAULT")
+
+        cursor.execute(f"""
+            INSERT INTO {TABLA} (id_bitacora, username, ip, fecha_hora, accion, descripcion)
+            SELECT id_bitacora, username, ip, fecha_hora, accion, descripcion FROM {original}
+        """)
+        if not conservar:
+            cursor.execute(f"DROP TABLE {original}")
@@ -0,0 +1,42 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+
+class Command(BaseCommand):
+    help = 'Recalcula el resumen diario de la bitácora (día, usuario, acción) a partir de la tabla bitacora'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--desde',
+            help='Recalcular solo desde esta fecha (YYYY-MM-DD); por defecto se recalcula todo',
+        )
+
+    def handle(self, *args, **options):
+        desde = options['desde']
+        if desde:
+            try:
+                desde = datetime.strptime(desde, '%Y-%m-%d').date()
+            except ValueError:
+                raise CommandError('--desde debe tener el formato YYYY-MM-DD')
+
+        filtro_resumen = " WHERE dia >= %s" if desde else ""
+        filtro_bitacora = " WHERE fecha_hora >= %s" if desde else ""
+        params = [desde] if desde else []
+
+        try:
+            with transaction.atomic(), connection.cursor() as cursor:
+                # Bloquea escrituras concurrentes del resumen mientras se recalcula
+                cursor.execute("LOCK TABLE bitacora_resumen_diario IN SHARE ROW EXCLUSIVE MODE")
+                cursor.execute("DELETE FROM bitacora_resumen_diario" + filtro_resumen, params)
+                cursor.execute("""
+                    INSERT INTO bitacora_resumen_diario (dia, username, accion, cantidad)
+                    SELECT fecha_hora::date, username, accion, COUNT(*)
+                    FROM bitacora""" + filtro_bitacora + """
+                    GROUP BY 1, 2, 3
+                """, params)
+                filas = cursor.rowcount
+            self.stdout.write(self.style.SUCCESS(f'✓ Resumen de bitácora recalculado ({filas} filas).'))
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f'✗ Error al recalcular el resumen: {str(e)}'))
@@ -0,0 +1,46 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Bitacora', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql="""
+                CREATE TABLE IF NOT EXISTS bitacora_resumen_diario (
+                    id_resumen serial PRIMARY KEY,
+                    dia date NOT NULL,
+                    username character varying(100) NOT NULL,
+                    accion text NOT NULL,
+                    cantidad integer NOT NULL DEFAULT 0,
+                    CONSTRAINT bitacora_resumen_diario_uniq UNIQUE (dia, username, accion)
+                );
+                INSERT INTO bitacora_resumen_diario (dia, username, accion, cantidad)
+                SELECT fecha_hora::date, username, accion, COUNT(*)
+                FROM bitacora
+                GROUP BY 1, 2, 3
+                ON CONFLICT (dia, username, accion) DO NOTHING;
+            """,
+            reverse_sql="DROP TABLE IF EXISTS bitacora_resumen_diario;",
+            state_operations=[
+                migrations.CreateModel(
+                    name='BitacoraResumenDiario',
+                    fields=[
+                        ('id_resumen', models.AutoField(primary_key=True, serialize=False)),
+                        ('dia', models.DateField()),
+                        ('username', models.CharField(max_length=100)),
+                        ('accion', models.TextField()),
+                        ('cantidad', models.IntegerField(default=0)),
+                    ],
+                    options={
+                        'db_table': 'bitacora_resumen_diario',
+                        'managed': False,
+                        'unique_together': {('dia', 'username', 'accion')},
+                    },
+                ),
+            ],
+        ),
+    ]
@@ -11,4 +11,17 @@ class Bitacora (models.Model):
 
     class Meta :
         db_table = 'bitacora'
-        managed = False
\ No newline at end of file
+        managed = False
+
+class BitacoraResumenDiario(models.Model):
+    """Conteo diario de acciones por usuario (mantenido por Bitacora/writer.py)"""
+    id_resumen = models.AutoField(primary_key=True)
+    dia = models.DateField()
+    username = models.CharField(max_length=100)
+    accion = models.TextField()
+    cantidad = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = 'bitacora_resumen_diario'
+        managed = False
+        unique_together = (('dia', 'username', 'accion'),)
@@ -0,0 +1,120 @@
+"""
+Utilidades para la tabla bitacora particionada por mes (RANGE sobre fecha_hora).
+
+Cada mes vive en bitacora_AAAA_MM; bitacora_default recibe lo que no
+tenga partición. La retención elimina particiones completas (DROP TABLE)
+en lugar de un DELETE masivo.
+"""
+import datetime
+import gzip
+import json
+import os
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+
+TABLA = 'bitacora'
+PARTICION_DEFAULT = 'bitacora_default'
+COLUMNAS = ('id_bitacora', 'username', 'ip', 'fecha_hora', 'accion', 'descripcion')
+
+
+def inicio_mes(fecha):
+    return datetime.datetime(fecha.year, fecha.month, 1)
+
+
+def sumar_meses(fecha, meses):
+    total = fecha.year * 12 + (fecha.month - 1) + meses
+    return datetime.datetime(total // 12, total % 12 + 1, 1)
+
+
+def nombre_particion(fecha):
+    return f'{TABLA}_{fecha.year:04d}_{fecha.month:02d}'
+
+
+def es_particionada(cursor):
+    cursor.execute("""
+        SELECT c.relkind FROM pg_class c
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE c.relname = %s AND n.nspname = current_schema()
+    """, [TABLA])
+    fila = cursor.fetchone()
+    return bool(fila) and fila[0] == 'p'
+
+
+def listar_particiones(cursor):
+    """[(nombre, desde, hasta)] de las particiones mensuales, ordenadas."""
+    cursor.execute("""
+        SELECT c.relname FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        JOIN pg_class p ON p.oid = i.inhparent
+        WHERE p.relname = %s
+    """, [TABLA])
+    particiones = []
+    for (nombre,) in cursor.fetchall():
+        try:
+            _, anio, mes = nombre.rsplit('_', 2)
+            desde = datetime.datetime(int(anio), int(mes), 1)
+        except ValueError:
+            continue  # bitacora_default u otras tablas ajenas a la convención
+        particiones.append((nombre, desde, sumar_meses(desde, 1)))
+    return sorted(particiones, key=lambda p: p[1])
+
+
+def crear_particion(cursor, mes):
+    """
+    Crea la partición del mes si no existe. Si la partición default ya
+    tiene filas de ese rango, se mueven a la nueva partición.
+    """
+    desde = inicio_mes(mes)
+    hasta = sumar_meses(desde, 1)
+    nombre = nombre_particion(desde)
+    cursor.execute("SELECT to_regclass(%s)", [nombre])
+    if cursor.fetchone()[0] is not None:
+        return False
+
+    cursor.execute("SELECT to_regclass(%s)", [PARTICION_DEFAULT])
+    hay_default = cursor.fetchone()[0] is not None
+    if hay_default:
+        cursor.execute(f"CREATE TEMP TABLE _bitacora_mover (LIKE {TABLA}) ON COMMIT DROP")
+        cursor.execute(f"""
+            WITH movidas AS (
+                DELETE FROM {PARTICION_DEFAULT}
+                WHERE fecha_hora >= %s AND fecha_hora < %s
+                RETURNING *
+            )
+            INSERT INTO _bitacora_mover SELECT * FROM movidas
+        """, [desde, hasta])
+
+    cursor.execute(
+        f"CREATE TABLE {nombre} PARTITION OF {TABLA} FOR VALUES FROM (%s) TO (%s)",
+        [desde, hasta]
+    )
+
+    if hay_default:
+        cursor.execute(f"INSERT INTO {TABLA} SELECT * FROM _bitacora_mover")
+        cursor.execute("DROP TABLE _bitacora_mover")
+    return True
+
+
+def exportar_particion(nombre, directorio):
+    """Exporta la partición a <directorio>/<nombre>.jsonl.gz; devuelve (ruta, filas)."""
+    os.makedirs(directorio, exist_ok=True)
+    ruta = os.path.join(directorio, f'{nombre}.jsonl.gz')
+    filas = 0
+    # Cursor del lado del servidor: la partición no se carga completa en memoria
+    with transaction.atomic():
+        cursor = connection.chunked_cursor()
+        try:
+            cursor.execute(f"SELECT {', '.join(COLUMNAS)} FROM {nombre} ORDER BY fecha_hora, id_bitacora")
+            with gzip.open(ruta, 'wt', encoding='utf-8') as archivo:
+                while True:
+                    lote = cursor.fetchmany(2000)
+                    if not lote:
+                        break
+                    for fila in lote:
+                        archivo.write(json.dumps(dict(zip(COLUMNAS, fila)), cls=DjangoJSONEncoder, ensure_ascii=False))
+                        archivo.write('\n')
+                    filas += len(lote)
+        finally:
+            cursor.close()
+    return ruta, filas
@@ -1,7 +1,8 @@
 from django.urls import path
-from .views import listar_bitacoras, registrar_bitacora
+from .views import listar_bitacoras, registrar_bitacora, estado_escritor_bitacora
 
 urlpatterns = [
     path('listar/', listar_bitacoras, name='listar_bitacoras'),
     path('registrar/', registrar_bitacora, name='registrar_bitacora'),
+    path('escritor/', estado_escritor_bitacora, name='estado_escritor_bitacora'),
 ]
@@ -3,7 +3,8 @@ from rest_framework.response import Response
 from rest_framework import status
 from .models import Bitacora
 from .serializers import RegistroBitacora, serializerBitacora
-from django.utils import timezone
+from .writer import escritor, insertar_registros
+from backwf.pagination import respuesta_paginada
 
 
 # � Función auxiliar para obtener el usuario del request
@@ -22,6 +23,9 @@ def obtener_usuario_request(request):
 @api_view(["GET"])
 def listar_bitacoras(request):
     bitacoras = Bitacora.objects.all().order_by("-fecha_hora")  # orden descendente
+    paginada = respuesta_paginada(request, bitacoras, "-fecha_hora", serializerBitacora)
+    if paginada is not None:
+        return paginada
     serializer = serializerBitacora(bitacoras, many=True)
     return Response(serializer.data, status=status.HTTP_200_OK)
 
@@ -33,19 +37,21 @@ def registrar_bitacora(request):
     if serializer.is_valid():
         try:
             # Usar SQL directo para evitar problemas con la secuencia
-            from django.db import connection
-            with connection.cursor() as cursor:
-                cursor.execute("""
-                    INSERT INTO bitacora (username, ip, fecha_hora, accion, descripcion)
-                    VALUES (%s, %s, %s, %s, %s)
-                """, [
-                    serializer.validated_data["username"],
-                    serializer.validated_data["ip"],
-                    serializer.validated_data["fecha_hora"],
-                    serializer.validated_data["accion"],
-                    serializer.validated_data["descripcion"]
-                ])
+            # (también actualiza el resumen diario de la bitácora)
+            insertar_registros([(
+                serializer.validated_data["username"],
+                serializer.validated_data["ip"],
+                serializer.validated_data["fecha_hora"],
+                serializer.validated_data["accion"],
+                serializer.validated_data["descripcion"]
+            )])
             return Response({"message": "Bitácora registrada correctamente"}, status=status.HTTP_201_CREATED)
         except Exception as e:
             return Response({"error": f"Error al registrar: {str(e)}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+# 📊 Estado del escritor asíncrono de la bitácora
+@api_view(["GET"])
+def estado_escritor_bitacora(request):
+    return Response(escritor.estadisticas(), status=status.HTTP_200_OK)
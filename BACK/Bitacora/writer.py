@@ -0,0 +1,277 @@
+"""
+Escritor asíncrono de la bitácora.
+
+El middleware ya no hace un INSERT por cada petición de escritura: encola
+el registro en una cola acotada en memoria y un hilo de fondo la vacía con
+INSERTs de varias filas cuando se alcanza BITACORA_LOTE registros o pasan
+BITACORA_FLUSH_SEGUNDOS. Si la cola está llena, el registro se escribe de
+forma síncrona (no se pierde auditoría).
+
+Un lote que falla se reintenta una vez y luego se escribe fila por fila,
+de modo que solo se descartan los registros que la base rechaza (o todos
+los restantes si la base no responde).
+
+Al terminar el proceso se vacía lo pendiente: con atexit y también ante
+SIGTERM/SIGINT (instalar_senales, desde BitacoraConfig.ready), porque
+runserver termina con SIGTERM sin ejecutar atexit.
+"""
+import atexit
+import os
+import queue
+import signal
+import threading
+import time
+
+from django.conf import settings
+from django.db import InterfaceError, OperationalError, connection, transaction
+
+from dashboard.eventos import emitir, recortar
+
+COLUMNAS = ('username', 'ip', 'fecha_hora', 'accion', 'descripcion')
+
+BITACORA_RESUMEN_DIARIO = getattr(settings, 'BITACORA_RESUMEN_DIARIO', True)
+
+
+def insertar_registros(registros):
+    """
+    Inserta una lista de tuplas (username, ip, fecha_hora, accion, descripcion).
+    En la misma sentencia actualiza el resumen diario (día, usuario, acción)
+    que usa el reporte de bitácora.
+    """
+    if not registros:
+        return
+    fila = '(' + ', '.join(['%s'] * len(COLUMNAS)) + ')'
+    valores = ', '.join([fila] * len(registros))
+    parametros = [valor for registro in registros for valor in registro]
+    if BITACORA_RESUMEN_DIARIO:
+        sql = f"""
+            WITH nuevos AS (
+                INSERT INTO bitacora ({', '.join(COLUMNAS)}) VALUES {valores}
+                RETURNING fecha_hora, username, accion
+            )
+            INSERT INTO bitacora_resumen_diario (dia, username, accion, cantidad)
+            SELECT fecha_hora::date, username, accion, COUNT(*)
+            FROM nuevos
+            GROUP BY 1, 2, 3
+            ON CONFLICT (dia, username, accion)
+            DO UPDATE SET cantidad = bitacora_resumen_diario.cantidad + EXCLUDED.cantidad
+        """
+    else:
+        sql = f"INSERT INTO bitacora ({', '.join(COLUMNAS)}) VALUES {valores}"
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(sql, parametros)
+        # Un evento por lote para el canal SSE del dashboard (solo los últimos registros)
+        emitir('bitacora', {
+            'cantidad': len(registros),
+            'registros': [
+                {
+                    'username': username,
+                    'fecha_hora': fecha_hora,
+                    'accion': accion,
+                    'descripcion': recortar(descripcion),
+                }
+                for username, _, fecha_hora, accion, descripcion in registros[-5:]
+            ],
+        })
+
+
+class EscritorBitacora:
+    """Cola acotada + hilo de fondo que escribe la bitácora por lotes."""
+
+    def __init__(self, tamanio_cola=10000, tamanio_lote=200, intervalo=1.0):
+        self.tamanio_lote = tamanio_lote
+        self.intervalo = intervalo
+        self._cola = queue.Queue(maxsize=tamanio_cola)
+        self._lock = threading.Lock()
+        self._hilo = None
+        self._pid = None
+        self._detenido = threading.Event()
+        # Contadores expuestos en estadisticas()
+        self.encolados = 0
+        self.escritos = 0
+        self.lotes = 0
+        self.sincronos = 0
+        self.descartados = 0
+        self.ultima_latencia_ms = 0.0
+        self.max_latencia_ms = 0.0
+
+    def _asegurar_hilo(self):
+        # Se arranca de forma perezosa y de nuevo tras un fork del worker
+        if self._hilo is not None and self._hilo.is_alive() and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._hilo is not None and self._hilo.is_alive() and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._detenido.clear()
+            self._hilo = threading.Thread(target=self._bucle, name='bitacora-writer', daemon=True)
+            self._hilo.start()
+
+    def registrar(self, username, ip, fecha_hora, accion, descripcion):
+        registro = (username, ip, fecha_hora, accion, descripcion)
+        self._asegurar_hilo()
+        try:
+            self._cola.put_nowait(registro)
+            self._sumar(encolados=1)
+        except queue.Full:
+            # Cola llena: se escribe en el hilo de la petición
+            try:
+                insertar_registros([registro])
+                self._sumar(sincronos=1, escritos=1)
+            except Exception as e:
+                self._sumar(sincronos=1, descartados=1)
+                print(f"Error al registrar en bitácora: {str(e)}")
+
+    def _sumar(self, **cantidades):
+        # Los contadores los modifican el hilo de fondo y los de las peticiones
+        with self._lock:
+            for contador, cantidad in cantidades.items():
+                setattr(self, contador, getattr(self, contador) + cantidad)
+
+    def _tomar_lote(self):
+        lote = []
+        limite = time.monotonic() + self.intervalo
+        while len(lote) < self.tamanio_lote:
+            restante = limite - time.monotonic()
+            if restante <= 0:
+                break
+            try:
+                registro = self._cola.get(timeout=restante)
+            except queue.Empty:
+                break
+            if registro is None:
+                # Aviso de detener(): no esperar al resto del intervalo
+                self._cola.task_done()
+                break
+            lote.append(registro)
+        return lote
+
+    def _insertar_lote(self, lote):
+        """Inserta el lote (un reintento) y si no, fila por fila. Devuelve cuántos se escribieron."""
+        for intento in range(2):
+            try:
+                insertar_registros(lote)
+                return len(lote)
+            except Exception as e:
+                print(f"Error al escribir lote de bitácora ({len(lote)} registros, intento {intento + 1}): {str(e)}")
+                # Conexión posiblemente rota: se descarta para abrir otra en el reintento
+                connection.close()
+
+        escritos = 0
+        for registro in lote:
+            try:
+                insertar_registros([registro])
+                escritos += 1
+            except (OperationalError, InterfaceError) as e:
+                # La base no responde: no tiene sentido seguir fila por fila
+                print(f"Error de conexión en bitácora, se descartan {len(lote) - escritos} registros: {str(e)}")
+                connection.close()
+                break
+            except Exception as e:
+                print(f"Registro de bitácora descartado ({registro[3]}): {str(e)}")
+        return escritos
+
+    def _escribir(self, lote):
+        inicio = time.perf_counter()
+        try:
+            escritos = self._insertar_lote(lote)
+        finally:
+            for _ in lote:
+                self._cola.task_done()
+        latencia = (time.perf_counter() - inicio) * 1000
+        with self._lock:
+            self.escritos += escritos
+            if escritos == len(lote):
+                self.lotes += 1
+            self.descartados += len(lote) - escritos
+            self.ultima_latencia_ms = round(latencia, 3)
+            self.max_latencia_ms = round(max(self.max_latencia_ms, latencia), 3)
+
+    def _bucle(self):
+        try:
+            while not self._detenido.is_set():
+                lote = self._tomar_lote()
+                if lote:
+                    self._escribir(lote)
+            # Al detenerse vacía lo pendiente con su propia conexión
+            self.flush()
+        finally:
+            connection.close()
+
+    def flush(self):
+        """Escribe todo lo pendiente en el hilo actual."""
+        while True:
+            lote = []
+            while len(lote) < self.tamanio_lote:
+                try:
+                    registro = self._cola.get_nowait()
+                except queue.Empty:
+                    break
+                if registro is None:
+                    self._cola.task_done()
+                    continue
+                lote.append(registro)
+            if not lote:
+                return
+            self._escribir(lote)
+
+    def detener(self):
+        """Detiene el hilo y vacía la cola (se llama al cerrar el worker)."""
+        self._detenido.set()
+        if self._hilo is not None and self._hilo.is_alive() and self._pid == os.getpid():
+            try:
+                self._cola.put_nowait(None)  # despierta al hilo si espera en la cola
+            except queue.Full:
+                pass  # con la cola llena el hilo no está esperando
+            self._hilo.join(timeout=self.intervalo + 5)
+        # Sin hilo (o si no terminó a tiempo) se escribe desde aquí
+        self.flush()
+
+    def estadisticas(self):
+        with self._lock:
+            contadores = {
+                'encolados': self.encolados,
+                'escritos': self.escritos,
+                'lotes': self.lotes,
+                'escrituras_sincronas': self.sincronos,
+                'descartados': self.descartados,
+                'ultima_latencia_flush_ms': self.ultima_latencia_ms,
+                'max_latencia_flush_ms': self.max_latencia_ms,
+            }
+        return {
+            'profundidad_cola': self._cola.qsize(),
+            'capacidad_cola': self._cola.maxsize,
+            **contadores,
+            'hilo_activo': self._hilo is not None and self._hilo.is_alive(),
+        }
+
+
+escritor = EscritorBitacora(
+    tamanio_cola=getattr(settings, 'BITACORA_COLA_MAX', 10000),
+    tamanio_lote=getattr(settings, 'BITACORA_LOTE', 200),
+    intervalo=getattr(settings, 'BITACORA_FLUSH_SEGUNDOS', 1.0),
+)
+atexit.register(escritor.detener)
+
+
+def instalar_senales():
+    """
+    Vacía la cola al recibir SIGTERM/SIGINT y después sigue con el manejador
+    que hubiera (el de gunicorn, KeyboardInterrupt o la terminación por
+    defecto). Solo puede instalarse desde el hilo principal.
+    """
+    if threading.current_thread() is not threading.main_thread():
+        return
+    for senal in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(senal, _manejador(signal.getsignal(senal)))
+
+
+def _manejador(anterior):
+    def manejar(senal, frame):
+        escritor.detener()
+        if callable(anterior):
+            anterior(senal, frame)
+        elif anterior == signal.SIG_DFL:
+            signal.signal(senal, signal.SIG_DFL)
+            os.kill(os.getpid(), senal)
+    return manejar
@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from personal.models import personal
+from backwf.loaders import BatchLoader, obtener_loader
 
 class ControlCalidadSerializer(serializers.Serializer):
     id_control = serializers.IntegerField()
@@ -10,12 +11,26 @@ class ControlCalidadSerializer(serializers.Serializer):
     id_trazabilidad = serializers.IntegerField()
     nombre_personal = serializers.SerializerMethodField()
 
+    def _loader_personal(self):
+        # Un solo loader por serialización: con many=True se precargan
+        # todos los id_personal de la lista en una única consulta
+        contexto = self.root.context
+        loader = contexto.get('_loader_personal')
+        if loader is None:
+            request = contexto.get('request')
+            if request is not None:
+                loader = obtener_loader(request, personal)
+            else:
+                loader = BatchLoader(personal)
+            instancias = getattr(self.parent, 'instance', None)
+            if instancias is not None:
+                loader.prime(getattr(c, 'id_personal', None) for c in instancias)
+            contexto['_loader_personal'] = loader
+        return loader
+
     def get_nombre_personal(self, obj):
-        try:
-            p = personal.objects.get(id=obj.id_personal)
-            return p.nombre_completo
-        except personal.DoesNotExist:
-            return None
+        p = self._loader_personal().load(obj.id_personal)
+        return p.nombre_completo if p is not None else None
 
 class InsertarControlCalidadSerializer(serializers.Serializer):
     observaciones = serializers.CharField()
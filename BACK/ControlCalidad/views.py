@@ -10,7 +10,7 @@ from personal.models import personal   # Importamos el modelo personal
 @api_view(['GET'])
 def listar_controles_calidad(request):
     controles = ControlCalidad.objects.all()
-    serializer = ControlCalidadSerializer(controles, many=True)
+    serializer = ControlCalidadSerializer(controles, many=True, context={'request': request})
     return Response(serializer.data, status=status.HTTP_200_OK)
 
 
@@ -0,0 +1,117 @@
+"""
+Caché en disco de los PDF de facturas.
+
+Una factura casi no cambia después del pago, así que el PDF se guarda en
+FACTURAS_PDF_DIR con clave id_factura + versión del contenido. La versión
+vive en la tabla facturas_pdf y se incrementa (invalidar_factura /
+invalidar_pedido) al cambiar el estado de pago, la fecha de pago, los datos
+de Stripe, el monto, el pedido o sus detalles. Una descarga repetida solo
+lee la factura con su versión (una consulta) y entrega el archivo; con
+If-None-Match igual al ETag responde 304.
+
+VERSION_PLANTILLA se incrementa al cambiar el diseño de documento_factura
+para no servir PDF con el diseño anterior.
+"""
+import glob
+import os
+import tempfile
+
+from django.conf import settings
+from django.db import connection, transaction
+
+FACTURAS_PDF_CACHE_ACTIVO = getattr(settings, 'FACTURAS_PDF_CACHE_ACTIVO', True)
+FACTURAS_PDF_DIR = getattr(settings, 'FACTURAS_PDF_DIR', os.path.join(settings.BASE_DIR, 'facturas_pdf'))
+
+VERSION_PLANTILLA = 1
+
+
+def version_factura(id_factura):
+    """(cod_factura, versión) de la factura o None si no existe"""
+    with connection.cursor() as cursor:
+        cursor.execute("""
+            SELECT f.cod_factura, COALESCE(v.version, 0)
+            FROM facturas f
+            LEFT JOIN facturas_pdf v ON v.id_factura = f.id_factura
+            WHERE f.id_factura = %s
+        """, [id_factura])
+        return cursor.fetchone()
+
+
+def etag_factura(id_factura, version):
+    # Débil: un PDF regenerado con la misma versión es equivalente pero no idéntico byte a byte
+    return f'W/"factura-{id_factura}-v{version}-p{VERSION_PLANTILLA}"'
+
+
+def ruta_pdf(id_factura, version):
+    return os.path.join(FACTURAS_PDF_DIR, f'factura_{id_factura}_v{version}_p{VERSION_PLANTILLA}.pdf')
+
+
+def abrir_pdf(id_factura, version):
+    """Archivo abierto del PDF en caché o None"""
+    if not FACTURAS_PDF_CACHE_ACTIVO:
+        return None
+    try:
+        return open(ruta_pdf(id_factura, version), 'rb')
+    except FileNotFoundError:
+        return None
+
+
+def guardar_pdf(id_factura, version, contenido):
+    """Escritura atómica (temporal + rename) para no servir archivos a medias"""
+    if not FACTURAS_PDF_CACHE_ACTIVO:
+        return
+    try:
+        os.makedirs(FACTURAS_PDF_DIR, exist_ok=True)
+        descriptor, temporal = tempfile.mkstemp(dir=FACTURAS_PDF_DIR, suffix='.tmp')
+        try:
+            with os.fdopen(descriptor, 'wb') as archivo:
+                archivo.write(contenido)
+            os.replace(temporal, ruta_pdf(id_factura, version))
+        except Exception:
+            os.unlink(temporal)
+            raise
+    except Exception as e:
+        print(f"Error guardando PDF de factura {id_factura} en caché: {e}")
+
+
+def _borrar_archivos(ids_factura):
+    for id_factura in ids_factura:
+        for ruta in glob.glob(os.path.join(FACTURAS_PDF_DIR, f'factura_{id_factura}_v*.pdf')):
+            try:
+                os.unlink(ruta)
+            except OSError:
+                pass
+
+
+def _incrementar(where, params):
+    # Savepoint: si falla no deja abortada la transacción de la vista que llama
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"""
+            INSERT INTO facturas_pdf (id_factura, version, actualizado)
+            SELECT id_factura, 1, now() FROM facturas WHERE {where}
+            ON CONFLICT (id_factura) DO UPDATE
+                SET version = facturas_pdf.version + 1, actualizado = now()
+            RETURNING id_factura
+        """, params)
+        ids_factura = [fila[0] for fila in cursor.fetchall()]
+    # Los archivos de versiones anteriores ya no se piden: se borran al confirmar
+    transaction.on_commit(lambda: _borrar_archivos(ids_factura))
+    return ids_factura
+
+
+def invalidar_factura(id_factura):
+    """Nueva versión del PDF de una factura (pago, Stripe, monto)"""
+    try:
+        return _incrementar('id_factura = %s', [id_factura])
+    except Exception as e:
+        print(f"Error invalidando PDF de factura {id_factura}: {e}")
+        return []
+
+
+def invalidar_pedido(id_pedido):
+    """Nueva versión del PDF de las facturas de un pedido (pedido o detalles modificados)"""
+    try:
+        return _incrementar('id_pedido = %s', [id_pedido])
+    except Exception as e:
+        print(f"Error invalidando PDF de facturas del pedido {id_pedido}: {e}")
+        return []
@@ -0,0 +1,142 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from decimal import Decimal
+from types import SimpleNamespace
+
+from django.core.management.base import BaseCommand
+
+from backwf.pdf import ServicioPDF
+from Facturas.views import documento_factura
+
+
+def _factura_sintetica(lineas):
+    """Factura, pedido y detalle con los atributos que usa documento_factura (sin base de datos)"""
+    factura = SimpleNamespace(
+        cod_factura='FAC-000123',
+        fecha_creacion=datetime(2025, 3, 14, 10, 30),
+        id_pedido=123,
+        metodo_pago='tarjeta',
+        fecha_pago=datetime(2025, 3, 14, 10, 35),
+        monto_total=Decimal('0.00'),
+        stripe_payment_intent_id='pi_3Obench000000000000000',
+        ultimos_digitos_tarjeta='4242',
+        tipo_tarjeta='visa',
+        codigo_autorizacion='AUT-998877',
+        get_estado_pago_display=lambda: 'Completado',
+    )
+    pedido = SimpleNamespace(cod_pedido='PED-000123', observaciones='Entrega en planta, horario de mañana')
+    detalles = []
+    for i in range(lineas):
+        cantidad = 10 + i % 40
+        precio = Decimal('35.50') + i % 7
+        detalles.append(SimpleNamespace(
+            tipo_prenda=f'Polera modelo {i % 12}',
+            color=['Azul', 'Blanco', 'Negro'][i % 3],
+            talla=['S', 'M', 'L', 'XL'][i % 4],
+            material='Algodón peinado',
+            cantidad=cantidad,
+            precio_unitario=precio,
+            subtotal=precio * cantidad,
+        ))
+    factura.monto_total = sum(detalle.subtotal for detalle in detalles)
+    cliente = {'nombre': 'Textiles Andinos SRL', 'direccion': 'Av. Banzer 123', 'telefono': '70000000', 'email': 'compras@example.com'}
+    return documento_factura(factura, pedido, detalles, cliente)
+
+
+def _percentil(valores, p):
+    valores = sorted(valores)
+    return valores[min(len(valores) - 1, int(len(valores) * p))] * 1000
+
+
+def _latido(detener, intervalo, atrasos):
+    """Hilo que duerme intervalo segundos y anota cuánto tarda de más en despertar (GIL ocupado)"""
+    while not detener.is_set():
+        inicio = time.perf_counter()
+        time.sleep(intervalo)
+        atrasos.append(time.perf_counter() - inicio - intervalo)
+
+
+class Command(BaseCommand):
+    help = 'Mide descargas concurrentes de facturas PDF construidas en el hilo vs en el pool de procesos'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrentes', type=int, default=8, help='Descargas simultáneas (por defecto: 8)')
+        parser.add_argument('--facturas', type=int, default=64, help='Facturas totales por escenario (por defecto: 64)')
+        parser.add_argument('--lineas', type=int, default=30, help='Líneas de detalle por factura (por defecto: 30)')
+        parser.add_argument(
+            '--procesos',
+            type=int,
+            nargs='+',
+            default=[2, 4],
+            help='Tamaños de pool a medir además del hilo de la petición (por defecto: 2 4)',
+        )
+
+    def _medir(self, servicio, especificacion, concurrentes, facturas):
+        # Calentamiento: arranque de los procesos hijos fuera de la medición
+        for _ in range(max(1, servicio.procesos)):
+            servicio.renderizar(especificacion)
+
+        latencias = []
+        atrasos = []
+        detener = threading.Event()
+        latido = threading.Thread(target=_latido, args=(detener, 0.005, atrasos), daemon=True)
+
+        def descargar(_):
+            inicio = time.perf_counter()
+            contenido = servicio.renderizar(especificacion)
+            latencias.append(time.perf_counter() - inicio)
+            return contenido
+
+        latido.start()
+        inicio = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrentes) as hilos:
+            contenidos = list(hilos.map(descargar, range(facturas)))
+        total = time.perf_counter() - inicio
+        detener.set()
+        latido.join()
+        return {
+            'por_segundo': facturas / total,
+            'p50': _percentil(latencias, 0.5),
+            'p95': _percentil(latencias, 0.95),
+            'latido_p95': _percentil(atrasos, 0.95) if atrasos else 0.0,
+            'latido_max': max(atrasos, default=0.0) * 1000,
+            'validos': all(contenido.startswith(b'%PDF') for contenido in contenidos),
+        }
+
+    def handle(self, *args, **options):
+        concurrentes = options['concurrentes']
+        facturas = options['facturas']
+        especificacion = _factura_sintetica(options['lineas'])
+        self.stdout.write(
+            f"{facturas} facturas de {options['lineas']} líneas, {concurrentes} descargas simultáneas "
+            f"(latido = atraso de un hilo que duerme 5 ms, mide cuánto se frena el resto del worker)"
+        )
+
+        escenarios = [('en el hilo', 0)] + [(f'pool de {procesos}', procesos) for procesos in options['procesos']]
+        base = None
+        fallos = 0
+        for nombre, procesos in escenarios:
+            servicio = ServicioPDF(procesos, max_pendientes=facturas, espera_max=300)
+            try:
+                resultado = self._medir(servicio, especificacion, concurrentes, facturas)
+            except Exception as e:
+                fallos += 1
+                self.stdout.write(self.style.ERROR(f'✗ {nombre}: {str(e)}'))
+                continue
+            finally:
+                servicio.cerrar()
+
+            base = base or resultado['por_segundo']
+            marca = self.style.SUCCESS('✓') if resultado['validos'] else self.style.ERROR('✗ PDF inválido')
+            fallos += not resultado['validos']
+            self.stdout.write(
+                f"  {nombre:<11} {resultado['por_segundo']:6.1f} PDF/s (x{resultado['por_segundo'] / base:.1f})   "
+                f"p50 {resultado['p50']:7.1f} ms   p95 {resultado['p95']:7.1f} ms   "
+                f"latido p95 {resultado['latido_p95']:6.1f} ms  max {resultado['latido_max']:6.1f} ms   {marca}"
+            )
+        if fallos:
+            self.stdout.write(self.style.ERROR(f'✗ {fallos} escenarios con error'))
+        else:
+            self.stdout.write(self.style.SUCCESS('✓ Medición completada'))
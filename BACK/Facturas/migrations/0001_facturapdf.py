@@ -0,0 +1,35 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.RunSQL(
+            sql="""
+                CREATE TABLE IF NOT EXISTS facturas_pdf (
+                    id_factura integer PRIMARY KEY,
+                    version integer NOT NULL DEFAULT 1,
+                    actualizado timestamp with time zone
+                );
+            """,
+            reverse_sql="DROP TABLE IF EXISTS facturas_pdf;",
+            state_operations=[
+                migrations.CreateModel(
+                    name='FacturaPdf',
+                    fields=[
+                        ('id_factura', models.IntegerField(primary_key=True, serialize=False)),
+                        ('version', models.IntegerField(default=1)),
+                        ('actualizado', models.DateTimeField(null=True)),
+                    ],
+                    options={
+                        'db_table': 'facturas_pdf',
+                        'managed': False,
+                    },
+                ),
+            ],
+        ),
+    ]
@@ -29,4 +29,14 @@ class Factura(models.Model):
     
     class Meta:
         db_table = 'facturas'
-        managed = False
\ No newline at end of file
+        managed = False
+
+class FacturaPdf(models.Model):
+    """Versión del contenido del PDF de una factura (Facturas/cache.py)"""
+    id_factura = models.IntegerField(primary_key=True)
+    version = models.IntegerField(default=1)
+    actualizado = models.DateTimeField(null=True)
+
+    class Meta:
+        db_table = 'facturas_pdf'
+        managed = False
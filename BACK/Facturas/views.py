@@ -5,20 +5,21 @@ from django.utils import timezone
 from rest_framework import status
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
+from .cache import abrir_pdf, etag_factura, guardar_pdf, invalidar_factura, version_factura
 from .models import Factura
 from .serializers import FacturaSerializer
+from backwf.pagination import respuesta_paginada
 from Pedidos.models import Pedido, DetallePedido
 
-from django.http import HttpResponse
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Table, TableStyle, Spacer
-from reportlab.lib import colors
-from reportlab.lib.units import inch
-import io
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseNotModified
+from django.utils.http import parse_etags
+from backwf import pdf
+from backwf.pdf import ColaPDFLlena, renderizar_pdf
 from datetime import datetime, timedelta
 
+# Puntos por pulgada (reportlab.lib.units.inch)
+inch = 72
+
 # Configurar Stripe
 stripe.api_key = settings.STRIPE_SECRET_KEY
 
@@ -59,6 +60,7 @@ def crear_sesion_pago(request, id_pedido):
             # Actualizar el monto por si cambió
             factura.monto_total = pedido.total
             factura.save()
+            invalidar_factura(factura.id_factura)
         
         # 4. Obtener detalles del pedido para productos dinámicos
         detalles = DetallePedido.objects.filter(id_pedido=id_pedido)
@@ -145,6 +147,7 @@ def pago_exitoso(request):
             factura.fecha_pago = timezone.now()
             factura.metodo_pago = 'tarjeta'
             factura.save()
+            invalidar_factura(factura.id_factura)
             
             # Actualizar pedido (opcional: cambiar estado)
             pedido = Pedido.objects.get(id_pedido=factura.id_pedido)
@@ -255,6 +258,7 @@ def manejar_pago_exitoso_webhook(session):
         factura.fecha_pago = timezone.now()
         factura.metodo_pago = 'tarjeta'
         factura.save()
+        invalidar_factura(factura.id_factura)
         
         # Lógica adicional: enviar email, actualizar inventario, etc.
         
@@ -268,6 +272,9 @@ def listar_facturas(request):
     Listar todas las facturas
     """
     facturas = Factura.objects.all().order_by('-fecha_creacion')
+    paginada = respuesta_paginada(request, facturas, '-fecha_creacion', FacturaSerializer)
+    if paginada is not None:
+        return paginada
     serializer = FacturaSerializer(facturas, many=True)
     return Response(serializer.data)
 
@@ -407,12 +414,230 @@ def crear_factura_manual(request):
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
     
+def documento_factura(factura, pedido, detalles_pedido, cliente_info):
+    """
+    Especificación del PDF de una factura (se construye en el pool de backwf.pdf)
+    """
+    title_style = pdf.estilo('CustomTitle', parent='Heading1', fontSize=16, spaceAfter=30, alignment=1)  # Centrado
+    normal_style = 'Normal'
+    heading_style = 'Heading2'
+    small_style = pdf.estilo('Small', parent='Normal', fontSize=8, textColor='grey')
+    
+    def fila(etiqueta, valor):
+        return [pdf.parrafo(f"<b>{etiqueta}</b>", normal_style), pdf.parrafo(valor, normal_style)]
+    
+    datos_style = [
+        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+        ('LEFTPADDING', (0, 0), (-1, -1), 6),
+        ('RIGHTPADDING', (0, 0), (-1, -1), 6),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+    ]
+    
+    # Contenido del PDF
+    elements = []
+    
+    # Título
+    elements.append(pdf.parrafo("FACTURA", title_style))
+    elements.append(pdf.espacio(1, 20))
+    
+    # Información de la empresa
+    empresa_info = [
+        "<b>MANUFACTURAPRO S.A.</b>",
+        "Av. Industrial #123",
+        "La Paz, Bolivia",
+        "Tel: +591 2 1234567",
+        "NIT: 123456789",
+    ]
+    for info in empresa_info:
+        elements.append(pdf.parrafo(info, normal_style))
+    
+    elements.append(pdf.espacio(1, 30))
+    
+    # Información del cliente si existe
+    if cliente_info:
+        elements.append(pdf.parrafo("<b>DATOS DEL CLIENTE</b>", heading_style))
+        elements.append(pdf.espacio(1, 10))
+        
+        cliente_data = [
+            fila("Nombre:", cliente_info['nombre']),
+            fila("Dirección:", cliente_info['direccion']),
+            fila("Teléfono:", cliente_info['telefono']),
+            fila("Email:", cliente_info['email']),
+        ]
+        elements.append(pdf.tabla(
+            cliente_data,
+            anchos=[1.5*inch, 4*inch],
+            estilo=datos_style + [('BACKGROUND', (0, 0), (-1, -1), 'lightgrey')],
+        ))
+        elements.append(pdf.espacio(1, 20))
+    
+    # Información de la factura
+    elements.append(pdf.parrafo("<b>INFORMACIÓN DE LA FACTURA</b>", heading_style))
+    elements.append(pdf.espacio(1, 10))
+    
+    factura_data = [
+        fila("N° Factura:", factura.cod_factura),
+        fila("Fecha Emisión:", factura.fecha_creacion.strftime("%d/%m/%Y %H:%M")),
+        fila("Pedido N°:", str(factura.id_pedido)),
+    ]
+    
+    if pedido:
+        factura_data.append(fila("Código Pedido:", pedido.cod_pedido))
+    
+    # Calcular fecha de vencimiento
+    fecha_vencimiento = factura.fecha_creacion + timedelta(days=30)
+    factura_data.append(fila("Fecha Vencimiento:", fecha_vencimiento.strftime("%d/%m/%Y")))
+    
+    factura_data.append(fila("Estado:", factura.get_estado_pago_display()))
+    
+    if factura.metodo_pago:
+        factura_data.append(fila("Método Pago:", factura.metodo_pago.capitalize()))
+    
+    if factura.fecha_pago:
+        factura_data.append(fila("Fecha Pago:", factura.fecha_pago.strftime("%d/%m/%Y %H:%M")))
+    
+    elements.append(pdf.tabla(factura_data, anchos=[2*inch, 3*inch], estilo=datos_style))
+    elements.append(pdf.espacio(1, 30))
+    
+    # Detalles de los productos/servicios
+    elements.append(pdf.parrafo("<b>DETALLES DEL PEDIDO</b>", heading_style))
+    elements.append(pdf.espacio(1, 10))
+    
+    if detalles_pedido:
+        productos_data = [
+            [pdf.parrafo(f"<b>{titulo}</b>", normal_style) for titulo in ("Producto", "Especificaciones", "Cantidad", "Precio Unit.", "Subtotal")]
+        ]
+        
+        for detalle in detalles_pedido:
+            especificaciones = f"{detalle.tipo_prenda.capitalize()}, {detalle.color}, Talla: {detalle.talla}"
+            if detalle.material:
+                especificaciones += f", Material: {detalle.material}"
+            
+            productos_data.append([
+                pdf.parrafo(detalle.tipo_prenda.capitalize(), normal_style),
+                pdf.parrafo(especificaciones, normal_style),
+                pdf.parrafo(str(detalle.cantidad), normal_style),
+                pdf.parrafo(f"Bs. {detalle.precio_unitario:,.2f}", normal_style),
+                pdf.parrafo(f"Bs. {detalle.subtotal:,.2f}", normal_style)
+            ])
+        
+        elements.append(pdf.tabla(productos_data, anchos=[1.2*inch, 2.5*inch, 0.8*inch, 1*inch, 1*inch], estilo=[
+            ('BACKGROUND', (0, 0), (-1, 0), 'grey'),
+            ('TEXTCOLOR', (0, 0), (-1, 0), 'whitesmoke'),
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('ALIGN', (2, 1), (4, -1), 'RIGHT'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 8),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+            ('BACKGROUND', (0, 1), (-1, -1), 'beige'),
+            ('GRID', (0, 0), (-1, -1), 1, 'black')
+        ]))
+    else:
+        # Si no hay detalles, mostrar item genérico
+        productos_data = [
+            [pdf.parrafo(f"<b>{titulo}</b>", normal_style) for titulo in ("Descripción", "Cantidad", "Precio Unit.", "Subtotal")],
+            [pdf.parrafo("Servicio de manufactura", normal_style), pdf.parrafo("1", normal_style), pdf.parrafo(f"Bs. {factura.monto_total:,.2f}", normal_style), pdf.parrafo(f"Bs. {factura.monto_total:,.2f}", normal_style)]
+        ]
+        
+        elements.append(pdf.tabla(productos_data, anchos=[3*inch, 1*inch, 1.5*inch, 1.5*inch], estilo=[
+            ('BACKGROUND', (0, 0), (-1, 0), 'grey'),
+            ('TEXTCOLOR', (0, 0), (-1, 0), 'whitesmoke'),
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('ALIGN', (2, 1), (3, -1), 'RIGHT'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 9),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+            ('BACKGROUND', (0, 1), (-1, -1), 'beige'),
+            ('GRID', (0, 0), (-1, -1), 1, 'black')
+        ]))
+    
+    elements.append(pdf.espacio(1, 20))
+    
+    # Total
+    total_data = [
+        [pdf.parrafo("<b>TOTAL:</b>", normal_style), pdf.parrafo(f"<b>Bs. {factura.monto_total:,.2f}</b>", normal_style)]
+    ]
+    elements.append(pdf.tabla(total_data, anchos=[4*inch, 1.5*inch], estilo=[
+        ('ALIGN', (0, 0), (-1, -1), 'RIGHT'),
+        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), 12),
+        ('BACKGROUND', (0, 0), (-1, -1), 'lightblue'),
+    ]))
+    elements.append(pdf.espacio(1, 30))
+    
+    # Información de pago con Stripe si existe
+    if factura.stripe_payment_intent_id:
+        elements.append(pdf.parrafo("<b>INFORMACIÓN DE PAGO ELECTRÓNICO</b>", heading_style))
+        elements.append(pdf.espacio(1, 10))
+        
+        stripe_info = [fila("ID Transacción:", factura.stripe_payment_intent_id)]
+        
+        if factura.ultimos_digitos_tarjeta:
+            stripe_info.append(fila("Tarjeta:", f"**** **** **** {factura.ultimos_digitos_tarjeta}"))
+        
+        if factura.tipo_tarjeta:
+            stripe_info.append(fila("Tipo:", factura.tipo_tarjeta.capitalize()))
+        
+        if factura.codigo_autorizacion:
+            stripe_info.append(fila("Código Autorización:", factura.codigo_autorizacion))
+        
+        elements.append(pdf.tabla(
+            stripe_info,
+            anchos=[2*inch, 3*inch],
+            estilo=datos_style + [('BACKGROUND', (0, 0), (-1, -1), 'lightgrey')],
+        ))
+        elements.append(pdf.espacio(1, 20))
+    
+    # Observaciones del pedido si existen
+    if pedido and pedido.observaciones:
+        elements.append(pdf.parrafo("<b>OBSERVACIONES</b>", heading_style))
+        elements.append(pdf.espacio(1, 5))
+        elements.append(pdf.parrafo(pedido.observaciones, normal_style))
+        elements.append(pdf.espacio(1, 20))
+    
+    # Pie de página
+    elements.append(pdf.espacio(1, 30))
+    elements.append(pdf.parrafo("<i>Este documento es una factura legal generada electrónicamente</i>", small_style))
+    elements.append(pdf.parrafo(f"<i>Generado el: {datetime.now().strftime('%d/%m/%Y %H:%M')}</i>", small_style))
+    
+    return pdf.documento(
+        elements,
+        pagesize='A4',
+        rightMargin=72,
+        leftMargin=72,
+        topMargin=72,
+        bottomMargin=18
+    )
+
+
 @api_view(['GET'])
 def descargar_factura_pdf(request, id_factura):
     """
     Descargar factura en formato PDF con información completa
+    El PDF se guarda en disco por versión (Facturas/cache.py) y se entrega con ETag
     """
     try:
+        fila = version_factura(id_factura)
+        if fila is None:
+            raise Http404('No Factura matches the given query.')
+        cod_factura, version = fila
+        etag = etag_factura(id_factura, version)
+        nombre_archivo = f"factura_{cod_factura}.pdf"
+        
+        # El cliente ya tiene esta versión
+        if etag in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', '')):
+            response = HttpResponseNotModified()
+            response['ETag'] = etag
+            return response
+        
+        archivo = abrir_pdf(id_factura, version)
+        if archivo is not None:
+            response = FileResponse(archivo, content_type='application/pdf', as_attachment=True, filename=nombre_archivo)
+            response['ETag'] = etag
+            response['Cache-Control'] = 'private, no-cache'
+            response['X-Factura-Cache'] = 'HIT'
+            return response
+        
         factura = get_object_or_404(Factura, id_factura=id_factura)
         
         # Obtener información del pedido
@@ -440,256 +665,20 @@ def descargar_factura_pdf(request, id_factura):
             except (Cliente.DoesNotExist, usurios.DoesNotExist):
                 cliente_info = None
         
-        # Crear el buffer para el PDF
-        buffer = io.BytesIO()
-        
-        # Crear el documento PDF
-        doc = SimpleDocTemplate(
-            buffer,
-            pagesize=A4,
-            rightMargin=72,
-            leftMargin=72,
-            topMargin=72,
-            bottomMargin=18
-        )
-        
-        # Contenido del PDF
-        elements = []
-        
-        # Estilos
-        styles = getSampleStyleSheet()
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=16,
-            spaceAfter=30,
-            alignment=1,  # Centrado
-        )
-        
-        normal_style = styles["Normal"]
-        heading_style = styles["Heading2"]
-        small_style = ParagraphStyle(
-            'Small',
-            parent=styles["Normal"],
-            fontSize=8,
-            textColor=colors.grey
-        )
-        
-        # Título
-        elements.append(Paragraph("FACTURA", title_style))
-        elements.append(Spacer(1, 20))
-        
-        # Información de la empresa
-        empresa_info = [
-            Paragraph("<b>MANUFACTURAPRO S.A.</b>", normal_style),
-            Paragraph("Av. Industrial #123", normal_style),
-            Paragraph("La Paz, Bolivia", normal_style),
-            Paragraph("Tel: +591 2 1234567", normal_style),
-            Paragraph("NIT: 123456789", normal_style),
-        ]
-        
-        for info in empresa_info:
-            elements.append(info)
-        
-        elements.append(Spacer(1, 30))
-        
-        # Información del cliente si existe
-        if cliente_info:
-            elements.append(Paragraph("<b>DATOS DEL CLIENTE</b>", heading_style))
-            elements.append(Spacer(1, 10))
-            
-            cliente_data = [
-                [Paragraph("<b>Nombre:</b>", normal_style), Paragraph(cliente_info['nombre'], normal_style)],
-                [Paragraph("<b>Dirección:</b>", normal_style), Paragraph(cliente_info['direccion'], normal_style)],
-                [Paragraph("<b>Teléfono:</b>", normal_style), Paragraph(cliente_info['telefono'], normal_style)],
-                [Paragraph("<b>Email:</b>", normal_style), Paragraph(cliente_info['email'], normal_style)],
-            ]
-            
-            cliente_table = Table(cliente_data, colWidths=[1.5*inch, 4*inch])
-            cliente_table.setStyle(TableStyle([
-                ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-                ('LEFTPADDING', (0, 0), (-1, -1), 6),
-                ('RIGHTPADDING', (0, 0), (-1, -1), 6),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-                ('BACKGROUND', (0, 0), (-1, -1), colors.lightgrey),
-            ]))
-            
-            elements.append(cliente_table)
-            elements.append(Spacer(1, 20))
-        
-        # Información de la factura
-        elements.append(Paragraph("<b>INFORMACIÓN DE LA FACTURA</b>", heading_style))
-        elements.append(Spacer(1, 10))
-        
-        factura_data = [
-            [Paragraph("<b>N° Factura:</b>", normal_style), Paragraph(factura.cod_factura, normal_style)],
-            [Paragraph("<b>Fecha Emisión:</b>", normal_style), Paragraph(factura.fecha_creacion.strftime("%d/%m/%Y %H:%M"), normal_style)],
-            [Paragraph("<b>Pedido N°:</b>", normal_style), Paragraph(str(factura.id_pedido), normal_style)],
-        ]
-        
-        if pedido:
-            factura_data.append([Paragraph("<b>Código Pedido:</b>", normal_style), Paragraph(pedido.cod_pedido, normal_style)])
-        
-        # Calcular fecha de vencimiento
-        fecha_vencimiento = factura.fecha_creacion + timedelta(days=30)
-        factura_data.append([Paragraph("<b>Fecha Vencimiento:</b>", normal_style), Paragraph(fecha_vencimiento.strftime("%d/%m/%Y"), normal_style)])
-        
-        factura_data.append([Paragraph("<b>Estado:</b>", normal_style), Paragraph(factura.get_estado_pago_display(), normal_style)])
-        
-        if factura.metodo_pago:
-            factura_data.append([Paragraph("<b>Método Pago:</b>", normal_style), Paragraph(factura.metodo_pago.capitalize(), normal_style)])
-        
-        if factura.fecha_pago:
-            factura_data.append([Paragraph("<b>Fecha Pago:</b>", normal_style), Paragraph(factura.fecha_pago.strftime("%d/%m/%Y %H:%M"), normal_style)])
-        
-        # Crear tabla de información
-        info_table = Table(factura_data, colWidths=[2*inch, 3*inch])
-        info_table.setStyle(TableStyle([
-            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-            ('LEFTPADDING', (0, 0), (-1, -1), 6),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 6),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-        ]))
-        
-        elements.append(info_table)
-        elements.append(Spacer(1, 30))
-        
-        # Detalles de los productos/servicios
-        elements.append(Paragraph("<b>DETALLES DEL PEDIDO</b>", heading_style))
-        elements.append(Spacer(1, 10))
-        
-        if detalles_pedido:
-            # Crear tabla de productos
-            productos_data = [
-                [
-                    Paragraph("<b>Producto</b>", normal_style),
-                    Paragraph("<b>Especificaciones</b>", normal_style),
-                    Paragraph("<b>Cantidad</b>", normal_style),
-                    Paragraph("<b>Precio Unit.</b>", normal_style),
-                    Paragraph("<b>Subtotal</b>", normal_style)
-                ]
-            ]
-            
-            for detalle in detalles_pedido:
-                especificaciones = f"{detalle.tipo_prenda.capitalize()}, {detalle.color}, Talla: {detalle.talla}"
-                if detalle.material:
-                    especificaciones += f", Material: {detalle.material}"
-                
-                productos_data.append([
-                    Paragraph(detalle.tipo_prenda.capitalize(), normal_style),
-                    Paragraph(especificaciones, normal_style),
-                    Paragraph(str(detalle.cantidad), normal_style),
-                    Paragraph(f"Bs. {detalle.precio_unitario:,.2f}", normal_style),
-                    Paragraph(f"Bs. {detalle.subtotal:,.2f}", normal_style)
-                ])
-            
-            # Crear tabla de productos
-            productos_table = Table(productos_data, colWidths=[1.2*inch, 2.5*inch, 0.8*inch, 1*inch, 1*inch])
-            productos_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                ('ALIGN', (2, 1), (4, -1), 'RIGHT'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, -1), 8),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black)
-            ]))
-            
-            elements.append(productos_table)
-        else:
-            # Si no hay detalles, mostrar item genérico
-            productos_data = [
-                [Paragraph("<b>Descripción</b>", normal_style), Paragraph("<b>Cantidad</b>", normal_style), Paragraph("<b>Precio Unit.</b>", normal_style), Paragraph("<b>Subtotal</b>", normal_style)],
-                [Paragraph("Servicio de manufactura", normal_style), Paragraph("1", normal_style), Paragraph(f"Bs. {factura.monto_total:,.2f}", normal_style), Paragraph(f"Bs. {factura.monto_total:,.2f}", normal_style)]
-            ]
-            
-            productos_table = Table(productos_data, colWidths=[3*inch, 1*inch, 1.5*inch, 1.5*inch])
-            productos_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                ('ALIGN', (2, 1), (3, -1), 'RIGHT'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, -1), 9),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black)
-            ]))
-            
-            elements.append(productos_table)
-        
-        elements.append(Spacer(1, 20))
-        
-        # Total
-        total_data = [
-            [Paragraph("<b>TOTAL:</b>", normal_style), Paragraph(f"<b>Bs. {factura.monto_total:,.2f}</b>", normal_style)]
-        ]
-        
-        total_table = Table(total_data, colWidths=[4*inch, 1.5*inch])
-        total_table.setStyle(TableStyle([
-            ('ALIGN', (0, 0), (-1, -1), 'RIGHT'),
-            ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 12),
-            ('BACKGROUND', (0, 0), (-1, -1), colors.lightblue),
-        ]))
-        
-        elements.append(total_table)
-        elements.append(Spacer(1, 30))
-        
-        # Información de pago con Stripe si existe
-        if factura.stripe_payment_intent_id:
-            elements.append(Paragraph("<b>INFORMACIÓN DE PAGO ELECTRÓNICO</b>", heading_style))
-            elements.append(Spacer(1, 10))
-            
-            stripe_info = [
-                [Paragraph("<b>ID Transacción:</b>", normal_style), Paragraph(factura.stripe_payment_intent_id, normal_style)],
-            ]
-            
-            if factura.ultimos_digitos_tarjeta:
-                stripe_info.append([Paragraph("<b>Tarjeta:</b>", normal_style), Paragraph(f"**** **** **** {factura.ultimos_digitos_tarjeta}", normal_style)])
-            
-            if factura.tipo_tarjeta:
-                stripe_info.append([Paragraph("<b>Tipo:</b>", normal_style), Paragraph(factura.tipo_tarjeta.capitalize(), normal_style)])
-            
-            if factura.codigo_autorizacion:
-                stripe_info.append([Paragraph("<b>Código Autorización:</b>", normal_style), Paragraph(factura.codigo_autorizacion, normal_style)])
-            
-            stripe_table = Table(stripe_info, colWidths=[2*inch, 3*inch])
-            stripe_table.setStyle(TableStyle([
-                ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-                ('LEFTPADDING', (0, 0), (-1, -1), 6),
-                ('RIGHTPADDING', (0, 0), (-1, -1), 6),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-                ('BACKGROUND', (0, 0), (-1, -1), colors.lightgrey),
-            ]))
-            
-            elements.append(stripe_table)
-            elements.append(Spacer(1, 20))
-        
-        # Observaciones del pedido si existen
-        if pedido and pedido.observaciones:
-            elements.append(Paragraph("<b>OBSERVACIONES</b>", heading_style))
-            elements.append(Spacer(1, 5))
-            elements.append(Paragraph(pedido.observaciones, normal_style))
-            elements.append(Spacer(1, 20))
-        
-        # Pie de página
-        elements.append(Spacer(1, 30))
-        elements.append(Paragraph("<i>Este documento es una factura legal generada electrónicamente</i>", small_style))
-        elements.append(Paragraph(f"<i>Generado el: {datetime.now().strftime('%d/%m/%Y %H:%M')}</i>", small_style))
-        
-        # Construir PDF
-        doc.build(elements)
+        contenido = renderizar_pdf(documento_factura(factura, pedido, detalles_pedido, cliente_info))
+        guardar_pdf(id_factura, version, contenido)
         
         # Preparar respuesta
-        buffer.seek(0)
-        response = HttpResponse(buffer, content_type='application/pdf')
-        response['Content-Disposition'] = f'attachment; filename="factura_{factura.cod_factura}.pdf"'
+        response = HttpResponse(contenido, content_type='application/pdf')
+        response['Content-Disposition'] = f'attachment; filename="{nombre_archivo}"'
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'
+        response['X-Factura-Cache'] = 'MISS'
         
         return response
         
+    except ColaPDFLlena as e:
+        return Response({'error': str(e)}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
     except Exception as e:
         return Response(
             {'error': f'Error al generar PDF: {str(e)}'}, 
@@ -3,13 +3,18 @@ from rest_framework.response import Response
 from rest_framework import status
 from .models import Inventario
 from .serializers import InventarioSerializer, RegistrarInventarioSerializer
+from backwf.pagination import respuesta_paginada
 from Lotes.models import Lote  # 🔹 Importamos el modelo Lote
 from Lotes.models import MateriaPrima 
+from dashboard.contadores import contando
 
 # 🟢 LISTAR INVENTARIO COMPLETO
 @api_view(['GET'])
 def listar_inventario(request):
     inventarios = Inventario.objects.all()
+    paginada = respuesta_paginada(request, inventarios, 'id_inventario', InventarioSerializer)
+    if paginada is not None:
+        return paginada
     serializer = InventarioSerializer(inventarios, many=True)
     return Response(serializer.data, status=status.HTTP_200_OK)
 
@@ -46,15 +51,17 @@ def registrar_inventario(request):
             return Response({'error': f'No existe materia prima con id {lote.id_materia} asociada al lote'}, status=status.HTTP_400_BAD_REQUEST)
 
         # 3️⃣ Crear nuevo registro de inventario
-        Inventario.objects.create(
-            nombre_materia_prima=materia.nombre,
-            cantidad_actual=lote.cantidad,
-            unidad_medida=serializer.validated_data['unidad_medida'],
-            ubicacion=serializer.validated_data['ubicacion'],
-            estado=serializer.validated_data['estado'],
-            fecha_actualizacion=serializer.validated_data['fecha_actualizacion'],
-            id_lote=lote.id_lote
-        )
+        with contando('inventario_critico') as filas:
+            inventario = Inventario.objects.create(
+                nombre_materia_prima=materia.nombre,
+                cantidad_actual=lote.cantidad,
+                unidad_medida=serializer.validated_data['unidad_medida'],
+                ubicacion=serializer.validated_data['ubicacion'],
+                estado=serializer.validated_data['estado'],
+                fecha_actualizacion=serializer.validated_data['fecha_actualizacion'],
+                id_lote=lote.id_lote
+            )
+            filas.append(inventario.id_inventario)
 
         return Response({'mensaje': 'Inventario registrado correctamente'}, status=status.HTTP_201_CREATED)
 
@@ -73,7 +80,8 @@ def actualizar_inventario(request, id_inventario):
     partial = request.method == 'PATCH'
     serializer = InventarioSerializer(inventario, data=request.data, partial=partial)
     if serializer.is_valid():
-        serializer.save()
+        with contando('inventario_critico', [inventario.id_inventario]):
+            serializer.save()
         return Response({'mensaje': 'Inventario actualizado correctamente'}, status=status.HTTP_200_OK)
 
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -87,5 +95,6 @@ def eliminar_inventario(request, id_inventario):
     except Inventario.DoesNotExist:
         return Response({'error': 'Registro de inventario no encontrado'}, status=status.HTTP_404_NOT_FOUND)
 
-    inventario.delete()
+    with contando('inventario_critico', [inventario.id_inventario]):
+        inventario.delete()
     return Response({'mensaje': 'Inventario eliminado correctamente'}, status=status.HTTP_204_NO_CONTENT)
@@ -6,6 +6,8 @@ from .models import MateriaPrima, Lote
 from .serializers import MateriaPrimaSerializer, LoteSerializer
 from Inventario.models import Inventario
 from datetime import datetime
+from backwf.pagination import respuesta_paginada
+from dashboard.contadores import contando
 
 
 # ---------- MATERIA PRIMA ----------
@@ -51,6 +53,9 @@ def eliminar_materia_prima(request, id_materia):
 @api_view(['GET'])
 def listar_lotes(request):
     lotes = Lote.objects.all()
+    paginada = respuesta_paginada(request, lotes, 'id_lote', LoteSerializer)
+    if paginada is not None:
+        return paginada
     serializer = LoteSerializer(lotes, many=True)
     return Response(serializer.data)
 
@@ -93,9 +98,10 @@ def insertar_lote(request):
         
         if inventario_existente:
             # ✅ Ya existe: SUMAR la cantidad del nuevo lote
-            inventario_existente.cantidad_actual += lote.cantidad
-            inventario_existente.fecha_actualizacion = datetime.now()
-            inventario_existente.save()
+            with contando('inventario_critico', [inventario_existente.id_inventario]):
+                inventario_existente.cantidad_actual += lote.cantidad
+                inventario_existente.fecha_actualizacion = datetime.now()
+                inventario_existente.save()
             
             return Response({
                 'mensaje': 'Lote creado e inventario actualizado correctamente',
@@ -106,15 +112,17 @@ def insertar_lote(request):
             }, status=status.HTTP_201_CREATED)
         else:
             # ✅ No existe: CREAR nuevo inventario
-            Inventario.objects.create(
-                nombre_materia_prima=nombre_materia,
-                cantidad_actual=lote.cantidad,
-                unidad_medida=unidad_medida,
-                ubicacion='Almacén Principal',
-                estado='Disponible',
-                fecha_actualizacion=datetime.now(),
-                id_lote=lote.id_lote  # Referencia al primer lote
-            )
+            with contando('inventario_critico') as filas:
+                inventario = Inventario.objects.create(
+                    nombre_materia_prima=nombre_materia,
+                    cantidad_actual=lote.cantidad,
+                    unidad_medida=unidad_medida,
+                    ubicacion='Almacén Principal',
+                    estado='Disponible',
+                    fecha_actualizacion=datetime.now(),
+                    id_lote=lote.id_lote  # Referencia al primer lote
+                )
+                filas.append(inventario.id_inventario)
             
             return Response({
                 'mensaje': 'Lote e inventario creados correctamente',
@@ -168,11 +176,12 @@ def actualizar_lote(request, id_lote):
         inventario = Inventario.objects.filter(nombre_materia_prima=nombre_materia).first()
         
         if inventario:
-            inventario.cantidad_actual += diferencia
-            if inventario.cantidad_actual < 0:
-                inventario.cantidad_actual = 0
-            inventario.fecha_actualizacion = datetime.now()
-            inventario.save()
+            with contando('inventario_critico', [inventario.id_inventario]):
+                inventario.cantidad_actual += diferencia
+                if inventario.cantidad_actual < 0:
+                    inventario.cantidad_actual = 0
+                inventario.fecha_actualizacion = datetime.now()
+                inventario.save()
             
             return Response({
                 'mensaje': 'Lote e inventario actualizados correctamente',
@@ -210,11 +219,12 @@ def eliminar_lote(request, id_lote):
         # Buscar inventario y restar cantidad
         inventario = Inventario.objects.filter(nombre_materia_prima=nombre_materia).first()
         if inventario:
-            inventario.cantidad_actual -= cantidad_lote
-            if inventario.cantidad_actual < 0:
-                inventario.cantidad_actual = 0
-            inventario.fecha_actualizacion = datetime.now()
-            inventario.save()
+            with contando('inventario_critico', [inventario.id_inventario]):
+                inventario.cantidad_actual -= cantidad_lote
+                if inventario.cantidad_actual < 0:
+                    inventario.cantidad_actual = 0
+                inventario.fecha_actualizacion = datetime.now()
+                inventario.save()
             inventario_ajustado = True
         else:
             inventario_ajustado = False
@@ -16,6 +16,8 @@ from personal.models import personal
 from Trazabilidad.models import TrazabilidadLote
 from django.db import transaction
 from datetime import datetime
+from backwf.loaders import obtener_loader
+from dashboard.contadores import contando
 
 # ============================================================
 # 🟢 CRUD NOTA SALIDA (CABECERA)
@@ -98,10 +100,11 @@ def crear_nota_salida_con_detalles(request):
                 lote.save()
                 
                 # 🔹 Descontar del INVENTARIO total
-                inventario_item.cantidad_actual -= cantidad_a_consumir
-                if inventario_item.cantidad_actual < 0:
-                    inventario_item.cantidad_actual = 0
-                inventario_item.save()
+                with contando('inventario_critico', [inventario_item.id_inventario]):
+                    inventario_item.cantidad_actual -= cantidad_a_consumir
+                    if inventario_item.cantidad_actual < 0:
+                        inventario_item.cantidad_actual = 0
+                    inventario_item.save()
                 
                 # 🔹 REGISTRAR TRAZABILIDAD DE LOTE
                 # Obtener información del personal
@@ -133,7 +136,10 @@ def crear_nota_salida_con_detalles(request):
 
 @api_view(['GET'])
 def listar_notas_salida(request):
-    notas = NotaSalida.objects.all()
+    notas = list(NotaSalida.objects.all())
+    
+    # Resolver todo el personal de la lista con una sola consulta
+    personas = obtener_loader(request, personal).load_many(n.id_personal for n in notas)
     
     # Enriquecer cada nota con información del personal
     notas_data = []
@@ -147,11 +153,11 @@ def listar_notas_salida(request):
         }
         
         # Obtener información del personal
-        try:
-            persona = personal.objects.get(id=nota.id_personal)
+        persona = personas.get(nota.id_personal)
+        if persona is not None:
             nota_dict['solicitante'] = persona.nombre_completo
             nota_dict['area'] = persona.rol
-        except personal.DoesNotExist:
+        else:
             nota_dict['solicitante'] = 'N/A'
             nota_dict['area'] = 'N/A'
         
@@ -317,8 +323,9 @@ def registrar_detalle_salida(request, id_salida):
         # ✅ Actualizar inventario restando la cantidad
         try:
             inventario = Inventario.objects.get(id_lote=lote.id_lote)
-            inventario.cantidad_actual -= cantidad_salida
-            inventario.save()
+            with contando('inventario_critico', [inventario.id_inventario]):
+                inventario.cantidad_actual -= cantidad_salida
+                inventario.save()
         except Inventario.DoesNotExist:
             pass  # Si no existe, no se hace nada
 
@@ -20,8 +20,20 @@ from Trazabilidad.serializers import TrazabilidadSerializer
 from NotaSalida.models import NotaSalida, DetalleNotaSalida
 from Inventario.models import Inventario
 from personal.models import personal
+from dashboard.contadores import contando
+from dashboard.eventos import emitir
 from datetime import date, datetime, time
 
+
+def emitir_orden(orden, accion, id_orden=None):
+    """Evento 'orden' para el canal SSE del dashboard (en la transacción de la escritura)"""
+    emitir('orden', {
+        'id_orden': id_orden or orden.id_orden,
+        'cod_orden': orden.cod_orden,
+        'estado': orden.estado,
+        'accion': accion,
+    })
+
 # 🟢 LISTAR TODAS LAS ÓRDENES
 @api_view(['GET'])
 @jwt_required
@@ -53,7 +65,10 @@ def obtener_orden_produccion(request, id_orden):
 def insertar_orden_produccion(request):
     serializer = InsertarOrdenProduccionSerializers(data=request.data)
     if serializer.is_valid():
-        OrdenProduccion.objects.create(**serializer.validated_data)
+        with contando('ordenes_activas') as filas:
+            orden = OrdenProduccion.objects.create(**serializer.validated_data)
+            filas.append(orden.id_orden)
+            emitir_orden(orden, 'creada')
         return Response({'mensaje': 'Orden de producción registrada correctamente'}, status=status.HTTP_201_CREATED)
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -76,18 +91,21 @@ def crear_orden_con_materias(request):
     
     # ... (el resto de la lógica de la función permanece igual)
     # 1️⃣ Crear la orden de producción
-    orden = OrdenProduccion.objects.create(
-        cod_orden=data['cod_orden'],
-        fecha_inicio=data['fecha_inicio'],
-        fecha_fin=data['fecha_fin'],
-        fecha_entrega=data['fecha_entrega'],
-        estado='En Proceso',
-        producto_modelo=data['producto_modelo'],
-        color=data['color'],
-        talla=data['talla'],
-        cantidad_total=data['cantidad_total'],
-        id_personal=data['id_personal']
-    )
+    with contando('ordenes_activas') as filas:
+        orden = OrdenProduccion.objects.create(
+            cod_orden=data['cod_orden'],
+            fecha_inicio=data['fecha_inicio'],
+            fecha_fin=data['fecha_fin'],
+            fecha_entrega=data['fecha_entrega'],
+            estado='En Proceso',
+            producto_modelo=data['producto_modelo'],
+            color=data['color'],
+            talla=data['talla'],
+            cantidad_total=data['cantidad_total'],
+            id_personal=data['id_personal']
+        )
+        filas.append(orden.id_orden)
+        emitir_orden(orden, 'creada')
     
     # 2️⃣ Obtener información del personal responsable
     try:
@@ -154,8 +172,9 @@ def crear_orden_con_materias(request):
                 unidad_medida=unidad
             )
             
-            inv_item.cantidad_actual -= cantidad_a_consumir
-            inv_item.save()
+            with contando('inventario_critico', [inv_item.id_inventario]):
+                inv_item.cantidad_actual -= cantidad_a_consumir
+                inv_item.save()
             
             lotes_consumidos.append({
                 'id_lote': inv_item.id_inventario,
@@ -205,9 +224,11 @@ def actualizar_orden_produccion(request, id_orden):
 
     serializer = InsertarOrdenProduccionSerializers(data=request.data)
     if serializer.is_valid():
-        for campo, valor in serializer.validated_data.items():
-            setattr(orden, campo, valor)
-        orden.save()
+        with contando('ordenes_activas', [orden.id_orden]):
+            for campo, valor in serializer.validated_data.items():
+                setattr(orden, campo, valor)
+            orden.save()
+            emitir_orden(orden, 'actualizada')
         return Response({'mensaje': 'Orden de producción actualizada correctamente'}, status=status.HTTP_200_OK)
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -222,7 +243,9 @@ def eliminar_orden_produccion(request, id_orden):
     except OrdenProduccion.DoesNotExist:
         return Response({'error': 'Orden de producción no encontrada'}, status=status.HTTP_404_NOT_FOUND)
 
-    orden.delete()
+    with contando('ordenes_activas', [orden.id_orden]):
+        orden.delete()
+        emitir_orden(orden, 'eliminada', id_orden=id_orden)
     return Response({'mensaje': 'Orden de producción eliminada correctamente'}, status=status.HTTP_204_NO_CONTENT)
 
 # 🟣 OBTENER TRAZABILIDAD DE UNA ORDEN DE PRODUCCIÓN
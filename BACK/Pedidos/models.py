@@ -1,4 +1,21 @@
 from django.db import models
+from django.db.models import Exists, OuterRef
+
+
+class PedidoQuerySet(models.QuerySet):
+    def con_estado_factura(self):
+        """
+        Anota `factura_pagada` con un EXISTS correlacionado sobre facturas
+        completadas, para que los listados resuelvan el estado de facturación
+        en la misma consulta en lugar de una consulta por pedido.
+        """
+        from Facturas.models import Factura
+        pagadas = Factura.objects.filter(
+            id_pedido=OuterRef('id_pedido'),
+            estado_pago='completado'
+        )
+        return self.annotate(factura_pagada=Exists(pagadas))
+
 
 # Create your models here.
 class Pedido(models.Model):
@@ -21,6 +38,8 @@ class Pedido(models.Model):
     observaciones = models.TextField(blank=True)
     fecha_creacion = models.DateField()
     
+    objects = PedidoQuerySet.as_manager()
+    
     class Meta:
         db_table = 'pedidos'
         managed = False
@@ -30,8 +49,11 @@ class Pedido(models.Model):
     
     def tiene_factura_pagada(self):
         """Verifica si el pedido tiene una factura con estado completado"""
-        from Facturas.models import Factura
-        return Factura.objects.filter(id_pedido=self.id_pedido, estado_pago='completado').exists()
+        # Reutiliza la anotación de con_estado_factura() (o el resultado previo)
+        if not hasattr(self, 'factura_pagada'):
+            from Facturas.models import Factura
+            self.factura_pagada = Factura.objects.filter(id_pedido=self.id_pedido, estado_pago='completado').exists()
+        return self.factura_pagada
     
     def puede_modificarse(self):
         """Verifica si el pedido puede modificarse (no tiene factura pagada)"""
@@ -7,6 +7,8 @@ from datetime import date
 import uuid
 from .models import Pedido, DetallePedido
 from .serializers import PedidoSerializer, PedidoUpdateSerializer, DetallePedidoSerializer, DetallePedidoReadSerializer
+from backwf.pagination import respuesta_paginada
+from Facturas.cache import invalidar_pedido
 from Precios.models import Precios  # Importamos el modelo de precios
 
 # ========== CRUD PEDIDOS ==========
@@ -44,7 +46,10 @@ def listar_pedidos_todos(request):
     Listar todos los pedidos
     """
     try:
-        pedidos = Pedido.objects.all().order_by('-fecha_creacion')
+        pedidos = Pedido.objects.con_estado_factura().order_by('-fecha_creacion')
+        paginada = respuesta_paginada(request, pedidos, '-fecha_creacion', PedidoSerializer)
+        if paginada is not None:
+            return paginada
         serializer = PedidoSerializer(pedidos, many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
     except Exception as e:
@@ -56,7 +61,7 @@ def obtener_pedido(request, id_pedido):
     Obtener un pedido específico por ID
     """
     try:
-        pedido = Pedido.objects.get(id_pedido=id_pedido)
+        pedido = Pedido.objects.con_estado_factura().get(id_pedido=id_pedido)
         serializer = PedidoSerializer(pedido)
         return Response(serializer.data, status=status.HTTP_200_OK)
     except Pedido.DoesNotExist:
@@ -84,6 +89,7 @@ def actualizar_pedido(request, id_pedido):
         
         if serializer.is_valid():
             serializer.save()
+            invalidar_pedido(id_pedido)
             return Response(serializer.data, status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         
@@ -324,6 +330,9 @@ def actualizar_total_pedido(id_pedido):
         pedido.total = total
         pedido.save()
         
+        # Los detalles y el total salen en el PDF de la factura
+        invalidar_pedido(id_pedido)
+        
     except Exception as e:
         print(f"Error actualizando total del pedido: {e}")
 
@@ -335,7 +344,7 @@ def obtener_pedido_con_detalles(request, id_pedido):
     Obtener un pedido con todos sus detalles para facturación
     """
     try:
-        pedido = Pedido.objects.get(id_pedido=id_pedido)
+        pedido = Pedido.objects.con_estado_factura().get(id_pedido=id_pedido)
         detalles = DetallePedido.objects.filter(id_pedido=id_pedido)
         
         pedido_data = PedidoSerializer(pedido).data
@@ -398,16 +407,9 @@ def listar_pedidos_facturables(request):
     Listar pedidos que pueden ser facturados (sin factura pagada, no cancelados)
     """
     try:
-        from Facturas.models import Factura
-        
-        # Obtener IDs de pedidos con facturas pagadas
-        pedidos_con_factura_pagada = Factura.objects.filter(
-            estado_pago='completado'
-        ).values_list('id_pedido', flat=True)
-        
-        # Filtrar pedidos facturables
-        pedidos = Pedido.objects.exclude(
-            id_pedido__in=pedidos_con_factura_pagada
+        # Filtrar pedidos facturables (sin factura pagada) en una sola consulta
+        pedidos = Pedido.objects.con_estado_factura().filter(
+            factura_pagada=False
         ).exclude(
             estado__in=['cancelado']
         ).filter(
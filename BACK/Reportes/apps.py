@@ -4,3 +4,17 @@ from django.apps import AppConfig
 class ReportesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'Reportes'
+
+    def ready(self):
+        """
+        Programa la pregeneración nocturna de reportes y la recuperación de
+        los jobs interrumpidos por el reinicio en el scheduler de BR
+        """
+        from BR.scheduler import programador_habilitado
+        from .jobs import programar_recuperacion_jobs
+        from .pregeneracion import REPORTES_PREGENERACION_ACTIVA, programar_pregeneracion
+        if not programador_habilitado():
+            return
+        programar_recuperacion_jobs()
+        if REPORTES_PREGENERACION_ACTIVA:
+            programar_pregeneracion()
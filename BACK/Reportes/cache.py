@@ -0,0 +1,360 @@
+"""
+Caché en disco de los resultados de reportes (JSON, PDF y Excel).
+
+La clave combina tipo de reporte, filtros normalizados, formato y una
+marca de agua de los datos: máximo id, última fecha_actualizacion (donde
+existe) y los contadores de inserción/actualización/borrado de
+pg_stat_user_tables de cada tabla fuente. Si cambia algún dato, cambia
+la marca y la entrada vieja deja de usarse (sale por LRU o TTL).
+
+Las entradas viven en REPORTES_CACHE_DIR, con tope de tamaño
+(REPORTES_CACHE_MAX_MB, se expulsa lo menos usado) y TTL
+(REPORTES_CACHE_TTL). El cálculo es single-flight: dentro del proceso
+con locks por franja de claves y entre workers con flock sobre un .lock,
+así varias peticiones idénticas solo generan el reporte una vez.
+
+Las respuestas csv/jsonl no se cachean. El Excel sale en streaming desde
+un temporal con Content-Length: se guarda si no pasa de
+REPORTES_CACHE_ENTRADA_MAX_MB.
+Antes del caché se busca un reporte pregenerado por la corrida nocturna
+(Reportes/pregeneracion.py) con los mismos filtros y la misma marca.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.db import connection
+from django.http import HttpResponse
+
+from backwf.cache import TTLCache
+
+try:
+    import fcntl
+except ImportError:  # Windows: solo single-flight dentro del proceso
+    fcntl = None
+
+REPORTES_CACHE_ACTIVO = getattr(settings, 'REPORTES_CACHE_ACTIVO', True)
+REPORTES_CACHE_DIR = getattr(settings, 'REPORTES_CACHE_DIR', os.path.join(settings.BASE_DIR, 'reportes_cache'))
+REPORTES_CACHE_MAX_MB = getattr(settings, 'REPORTES_CACHE_MAX_MB', 200)
+REPORTES_CACHE_TTL = getattr(settings, 'REPORTES_CACHE_TTL', 600)
+# Excel más grandes que esto se envían sin pasar por el caché
+REPORTES_CACHE_ENTRADA_MAX_MB = getattr(settings, 'REPORTES_CACHE_ENTRADA_MAX_MB', 20)
+# La marca de agua se reutiliza unos segundos para no consultarla en cada petición
+REPORTES_CACHE_MARCA_TTL = getattr(settings, 'REPORTES_CACHE_MARCA_TTL', 2)
+
+# Se incrementa cuando cambia el formato de algún reporte para descartar lo cacheado
+VERSION_CACHE = 1
+
+FORMATOS_CACHEABLES = ('json', 'pdf', 'excel')
+PARAMETROS_IGNORADOS = ('formato', 'cache')
+
+# tabla -> (columna id, columna de última actualización o None). Las tablas
+# de cada reporte son las `fuentes` de su definición (Reportes/definiciones.py)
+TABLAS = {
+    'nota_salida': ('id_salida', None),
+    'detalle_nota_salida': ('id_detalle', None),
+    'lotes': ('id_lote', None),
+    'personal': ('id', None),
+    'orden_produccion': ('id_orden', None),
+    'inventario': ('id_inventario', 'fecha_actualizacion'),
+    'clientes': ('id', None),
+    'pedidos': ('id_pedido', None),
+    'bitacora': ('id_bitacora', None),
+    'bitacora_resumen_diario': (None, None),
+}
+
+_marcas = TTLCache(ttl=REPORTES_CACHE_MARCA_TTL, maxsize=64)
+
+
+def marca_de_agua(tipo, reutilizar=True):
+    """Marca de los datos de las tablas fuente del reporte (una consulta)."""
+    if not reutilizar or REPORTES_CACHE_MARCA_TTL <= 0:
+        return _calcular_marca(tipo)
+    return _marcas.get_or_compute(tipo, lambda: _calcular_marca(tipo))
+
+
+def fuentes(tipo):
+    """Tablas de las que depende el reporte, según su definición"""
+    # Import diferido: motor importa este módulo
+    from .motor import vistas
+    return tuple(vistas()[tipo].definicion.fuentes)
+
+
+def _calcular_marca(tipo):
+    tablas = fuentes(tipo)
+    columnas = []
+    for tabla in tablas:
+        columna_id, columna_fecha = TABLAS[tabla]
+        columnas.append(f"(SELECT MAX({columna_id}) FROM {tabla})" if columna_id else "NULL")
+        columnas.append(f"(SELECT MAX({columna_fecha}) FROM {tabla})" if columna_fecha else "NULL")
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT {', '.join(columnas)}")
+        maximos = cursor.fetchone()
+        # Las tablas particionadas (bitacora_AAAA_MM) suman sus particiones
+        cursor.execute("""
+            SELECT t.tabla, SUM(s.n_tup_ins + s.n_tup_upd + s.n_tup_del)
+            FROM unnest(%s::text[]) AS t(tabla)
+            JOIN pg_stat_user_tables s
+              ON s.relname = t.tabla OR s.relname LIKE t.tabla || '\\_%%'
+            GROUP BY t.tabla
+        """, [list(tablas)])
+        cambios = dict(cursor.fetchall())
+    return [
+        [tabla, str(maximos[2 * i]), str(maximos[2 * i + 1]), int(cambios.get(tabla) or 0)]
+        for i, tabla in enumerate(tablas)
+    ]
+
+
+def filtros_normalizados(parametros):
+    """Parámetros de la petición sin vacíos ni los que no afectan al resultado, ordenados."""
+    return sorted(
+        (clave, valor)
+        for clave, valor in parametros.items()
+        if clave not in PARAMETROS_IGNORADOS and valor not in (None, '')
+    )
+
+
+def clave_reporte(tipo, parametros, formato):
+    contenido = json.dumps(
+        [VERSION_CACHE, tipo, filtros_normalizados(parametros), formato, marca_de_agua(tipo)],
+        separators=(',', ':'),
+    )
+    return hashlib.sha256(contenido.encode('utf-8')).hexdigest()
+
+
+class CacheDiscoReportes:
+    """LRU acotado en disco con TTL; la fecha de modificación del archivo marca el último uso."""
+
+    def __init__(self, directorio, max_bytes, ttl):
+        self.directorio = directorio
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        # Locks por franja de claves: acotados y sin limpieza
+        self._locks = [threading.Lock() for _ in range(64)]
+        self.hits = 0
+        self.misses = 0
+        self.expulsadas = 0
+
+    def _ruta(self, clave, extension='bin'):
+        return os.path.join(self.directorio, f'{clave}.{extension}')
+
+    def obtener(self, clave):
+        """(metadatos, contenido) o None si no existe o venció."""
+        ruta = self._ruta(clave)
+        try:
+            with open(ruta, 'rb') as archivo:
+                metadatos = json.loads(archivo.readline())
+                if time.time() - metadatos['creado'] > self.ttl:
+                    raise FileNotFoundError
+                contenido = archivo.read()
+            os.utime(ruta)  # último uso para el LRU
+        except (FileNotFoundError, ValueError, KeyError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return metadatos, contenido
+
+    def guardar(self, clave, metadatos, contenido):
+        os.makedirs(self.directorio, exist_ok=True)
+        metadatos = dict(metadatos, creado=time.time())
+        # Escritura atómica: otro worker nunca lee un archivo a medias
+        descriptor, temporal = tempfile.mkstemp(dir=self.directorio, suffix='.tmp')
+        try:
+            with os.fdopen(descriptor, 'wb') as archivo:
+                archivo.write(json.dumps(metadatos).encode('utf-8') + b'\n')
+                archivo.write(contenido)
+            os.replace(temporal, self._ruta(clave))
+        except Exception:
+            if os.path.exists(temporal):
+                os.remove(temporal)
+            raise
+        self.recortar()
+
+    def recortar(self):
+        """Borra las entradas vencidas y, si se pasa del tope, las menos usadas."""
+        entradas = []
+        total = 0
+        ahora = time.time()
+        try:
+            nombres = os.listdir(self.directorio)
+        except FileNotFoundError:
+            return
+        for nombre in nombres:
+            if not nombre.endswith(('.bin', '.lock')):
+                continue
+            ruta = os.path.join(self.directorio, nombre)
+            try:
+                info = os.stat(ruta)
+            except FileNotFoundError:
+                continue
+            if nombre.endswith('.lock'):
+                if ahora - info.st_mtime > self.ttl:
+                    self._borrar_archivo(ruta)
+                continue
+            # mtime se renueva en cada uso; una entrada sin usos por más del TTL ya venció
+            if ahora - info.st_mtime > self.ttl:
+                self._borrar(ruta)
+                continue
+            entradas.append((info.st_mtime, info.st_size, ruta))
+            total += info.st_size
+        if total <= self.max_bytes:
+            return
+        # Se deja margen (90 %) para no recortar en cada escritura
+        for _, tamanio, ruta in sorted(entradas):
+            if total <= self.max_bytes * 0.9:
+                break
+            self._borrar(ruta)
+            total -= tamanio
+
+    def _borrar(self, ruta):
+        if self._borrar_archivo(ruta):
+            self.expulsadas += 1
+
+    def _borrar_archivo(self, ruta):
+        try:
+            os.remove(ruta)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def limpiar(self):
+        borradas = 0
+        for nombre in os.listdir(self.directorio) if os.path.isdir(self.directorio) else []:
+            if nombre.endswith(('.bin', '.tmp', '.lock')):
+                try:
+                    os.remove(os.path.join(self.directorio, nombre))
+                    borradas += 1
+                except FileNotFoundError:
+                    pass
+        return borradas
+
+    def obtener_o_calcular(self, clave, funcion):
+        """
+        Devuelve (metadatos, contenido, estado) con estado 'HIT' o 'MISS'.
+        `funcion()` devuelve (metadatos, contenido) o None si el resultado no
+        se debe cachear; en ese caso devuelve (None, respuesta, 'BYPASS').
+        """
+        entrada = self.obtener(clave)
+        if entrada is not None:
+            return entrada + ('HIT',)
+
+        with self._locks[int(clave[:8], 16) % len(self._locks)]:
+            archivo_lock = None
+            try:
+                if fcntl is not None:
+                    os.makedirs(self.directorio, exist_ok=True)
+                    archivo_lock = open(self._ruta(clave, 'lock'), 'w')
+                    fcntl.flock(archivo_lock, fcntl.LOCK_EX)
+                # Otro hilo u otro worker pudo haberlo calculado mientras se esperaba
+                entrada = self.obtener(clave)
+                if entrada is not None:
+                    return entrada + ('HIT',)
+                resultado = funcion()
+                if not isinstance(resultado, tuple):
+                    return None, resultado, 'BYPASS'
+                metadatos, contenido = resultado
+                try:
+                    self.guardar(clave, metadatos, contenido)
+                except OSError as e:
+                    # Sin espacio o sin permisos: se responde igual, sin cachear
+                    print(f"Error al guardar reporte en caché: {str(e)}")
+                return metadatos, contenido, 'MISS'
+            finally:
+                # El .lock no se borra aquí (otro worker puede estar esperando en él);
+                # recortar() elimina los viejos
+                if archivo_lock is not None:
+                    fcntl.flock(archivo_lock, fcntl.LOCK_UN)
+                    archivo_lock.close()
+
+    def estadisticas(self):
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / total, 4) if total else 0.0,
+            'expulsadas': self.expulsadas,
+            'max_bytes': self.max_bytes,
+            'ttl': self.ttl,
+            'directorio': self.directorio,
+        }
+
+
+cache_reportes = CacheDiscoReportes(
+    REPORTES_CACHE_DIR,
+    REPORTES_CACHE_MAX_MB * 1024 * 1024,
+    REPORTES_CACHE_TTL,
+)
+
+
+def _contenido_cacheable(respuesta):
+    """(metadatos, bytes) de una respuesta de reporte, o None si no se puede cachear."""
+    if respuesta.status_code != 200:
+        return None
+    if getattr(respuesta, 'streaming', False):
+        # Solo el Excel (archivo ya armado, con Content-Length) y si no es muy grande
+        tamanio = respuesta.get('Content-Length')
+        if tamanio is None or int(tamanio) > REPORTES_CACHE_ENTRADA_MAX_MB * 1024 * 1024:
+            return None
+        return {
+            'content_type': respuesta.get('Content-Type'),
+            'content_disposition': respuesta.get('Content-Disposition'),
+        }, b''.join(respuesta.streaming_content)
+    if hasattr(respuesta, 'data') and not getattr(respuesta, 'is_rendered', True):
+        # Response de DRF aún sin renderizar: se guarda el JSON
+        from rest_framework.renderers import JSONRenderer
+        return {'content_type': 'application/json'}, JSONRenderer().render(respuesta.data)
+    return {
+        'content_type': respuesta.get('Content-Type'),
+        'content_disposition': respuesta.get('Content-Disposition'),
+    }, respuesta.content
+
+
+def cachear_reporte(tipo):
+    """
+    Decorador para el get() de una vista de reporte. cache=0 en la query
+    string fuerza a generar el reporte sin leer ni escribir el caché.
+    """
+    def decorador(get):
+        @wraps(get)
+        def envoltura(self, request, *args, **kwargs):
+            formato = request.query_params.get('formato', 'json')
+            if (
+                not REPORTES_CACHE_ACTIVO
+                or formato not in FORMATOS_CACHEABLES
+                or request.query_params.get('cache') == '0'
+            ):
+                return get(self, request, *args, **kwargs)
+
+            # Import diferido: pregeneracion importa este módulo
+            from .pregeneracion import respuesta_pregenerada
+            pregenerada = respuesta_pregenerada(tipo, request.query_params, formato)
+            if pregenerada is not None:
+                return pregenerada
+
+            try:
+                clave = clave_reporte(tipo, request.query_params, formato)
+            except Exception as e:
+                print(f"Error al calcular la clave de caché del reporte {tipo}: {str(e)}")
+                return get(self, request, *args, **kwargs)
+
+            def generar():
+                respuesta = get(self, request, *args, **kwargs)
+                return _contenido_cacheable(respuesta) or respuesta
+
+            metadatos, contenido, estado = cache_reportes.obtener_o_calcular(clave, generar)
+            if estado == 'BYPASS':
+                return contenido
+
+            respuesta = HttpResponse(contenido, content_type=metadatos['content_type'])
+            if metadatos.get('content_disposition'):
+                respuesta['Content-Disposition'] = metadatos['content_disposition']
+            respuesta['X-Reporte-Cache'] = estado
+            respuesta['Age'] = str(int(time.time() - metadatos['creado'])) if estado == 'HIT' else '0'
+            return respuesta
+        return envoltura
+    return decorador
@@ -0,0 +1,504 @@
+"""
+Definiciones declarativas de los reportes que usan el motor (Reportes/motor.py):
+consulta, estadísticas, columnas de detalle y el diseño del PDF y del Excel.
+"""
+from datetime import datetime
+
+from .estadisticas import (
+    estadisticas_bitacora, estadisticas_clientes, estadisticas_inventario, estadisticas_pedidos,
+    estadisticas_personal, estadisticas_produccion, estadisticas_ventas, filtro_fechas,
+)
+from .excel_streaming import Columna
+from .motor import Campo, DefinicionReporte, Grafico, Indicador, Tabla, conteos
+from .vectorizado import convertir_filas
+
+VERDE = ('#10B981', '#D1FAE5')
+AMBAR = ('#F59E0B', '#FEF3C7')
+ROJO = ('#EF4444', '#FEE2E2')
+
+
+class ReporteVentas(DefinicionReporte):
+    tipo = 'ventas'
+    archivo = 'Reporte_Ventas'
+    titulo = 'REPORTE DE VENTAS'
+    hoja_detalle = ('Detalle Ventas', 'DETALLE COMPLETO DE VENTAS')
+    clave_listado = 'ventas'
+    campos = """
+        ns.id_salida,
+        ns.fecha_salida,
+        COALESCE(p.nombre_completo, 'Sin Asignar') as responsable,
+        dns.nombre_materia_prima as producto,
+        COALESCE(l.codigo_lote, 'Sin Lote') as lote_asociado,
+        dns.cantidad,
+        dns.unidad_medida,
+        ns.motivo,
+        ns.estado,
+        0.00 as precio_total
+    """
+    origen = """
+        FROM nota_salida ns
+        INNER JOIN detalle_nota_salida dns ON ns.id_salida = dns.id_salida
+        LEFT JOIN lotes l ON dns.id_lote = l.id_lote
+        LEFT JOIN personal p ON ns.id_personal = p.id
+    """
+    orden = 'ns.fecha_salida DESC, ns.id_salida'
+    fechas = ('ns.fecha_salida', 'ns.fecha_salida')
+    conversiones = {'cantidad': 'numero', 'precio_total': 'numero', 'fecha_salida': 'fecha'}
+    estadisticas = staticmethod(estadisticas_ventas)
+    detalle = (
+        Campo('id_salida', 'ns.id_salida', Columna('ID', 10, 'entero')),
+        Campo('fecha_salida', "to_char(ns.fecha_salida, 'YYYY-MM-DD')", Columna('Fecha', 14)),
+        Campo('producto', 'dns.nombre_materia_prima', Columna('Producto', 35)),
+        Campo('lote_asociado', "COALESCE(l.codigo_lote, 'Sin Lote')", Columna('Lote', 18)),
+        Campo('cantidad', 'dns.cantidad', Columna('Cantidad', 14, 'numero')),
+        Campo('precio_total', '0.00', Columna('Total (Bs.)', 18, 'moneda')),
+        Campo('responsable', "COALESCE(p.nombre_completo, 'Sin Asignar')", Columna('Responsable', 28)),
+        Campo('estado', 'ns.estado', Columna('Estado', 16)),
+    )
+    fuentes = ('nota_salida', 'detalle_nota_salida', 'lotes', 'personal')
+    indicadores = (
+        Indicador('Total Ventas', 'total_ventas'),
+        Indicador('Cantidad Total Vendida', 'cantidad_total', 2, *VERDE),
+        Indicador('Monto Total (Bs.)', 'monto_total', 2, *AMBAR),
+        Indicador('Promedio por Venta', 'promedio_cantidad', 2, *ROJO),
+    )
+    graficos = (
+        Grafico(
+            'TOP 5 PRODUCTOS MÁS VENDIDOS', 'barras',
+            lambda data: [(prod, info['cantidad']) for prod, info in data['estadisticas']['top_productos'][:5]],
+        ),
+    )
+    tablas = (
+        Tabla(
+            'TOP 5 PRODUCTOS MÁS VENDIDOS', ['Producto', 'Cantidad', 'Ventas'],
+            lambda data: [(prod, info['cantidad'], info['ventas']) for prod, info in data['estadisticas']['top_productos']],
+        ),
+        Tabla('VENTAS POR RESPONSABLE', ['Responsable', 'Cantidad'], conteos('por_responsable', ordenar=True)),
+        Tabla('DISTRIBUCIÓN POR ESTADO', ['Estado', 'Cantidad', '%'], conteos('por_estado', porcentaje=True), VERDE[0]),
+    )
+    detalle_pdf = ('id_salida', 'fecha_salida', 'producto', 'responsable', 'cantidad', 'estado')
+
+
+class ReporteProduccion(DefinicionReporte):
+    tipo = 'produccion'
+    archivo = 'Reporte_Produccion'
+    titulo = 'REPORTE DE PRODUCCIÓN'
+    hoja_detalle = ('Detalle de Órdenes', 'DETALLE DE ÓRDENES DE PRODUCCIÓN')
+    clave_listado = 'ordenes'
+    campos = """
+        op.id_orden,
+        op.cod_orden,
+        op.fecha_inicio,
+        op.fecha_fin,
+        op.fecha_entrega,
+        op.estado,
+        op.producto_modelo,
+        op.color,
+        op.talla,
+        op.cantidad_total,
+        COALESCE(p.nombre_completo, 'Sin Asignar') as responsable,
+        CASE
+            WHEN op.fecha_fin < CURRENT_DATE AND op.estado != 'Completada' THEN 'Retrasada'
+            WHEN op.fecha_fin >= CURRENT_DATE THEN 'En Tiempo'
+            ELSE 'Completada'
+        END as cumplimiento
+    """
+    origen = """
+        FROM orden_produccion op
+        LEFT JOIN personal p ON op.id_personal = p.id
+    """
+    orden = 'op.fecha_inicio DESC'
+    fechas = ('op.fecha_inicio', 'op.fecha_fin')
+    conversiones = {'fecha_inicio': 'fecha', 'fecha_fin': 'fecha', 'fecha_entrega': 'fecha'}
+    estadisticas = staticmethod(estadisticas_produccion)
+    detalle = (
+        Campo('cod_orden', 'op.cod_orden', Columna('Código', 15)),
+        Campo('producto_modelo', 'op.producto_modelo', Columna('Producto', 30)),
+        Campo('color', 'op.color', Columna('Color', 12)),
+        Campo('talla', 'op.talla', Columna('Talla', 10)),
+        Campo('cantidad_total', 'op.cantidad_total', Columna('Cantidad', 12, 'entero')),
+        Campo('estado', 'op.estado', Columna('Estado', 15)),
+        Campo('fecha_inicio', "to_char(op.fecha_inicio, 'YYYY-MM-DD')", Columna('F. Inicio', 12)),
+        Campo('fecha_fin', "to_char(op.fecha_fin, 'YYYY-MM-DD')", Columna('F. Fin', 12)),
+        Campo('responsable', "COALESCE(p.nombre_completo, 'Sin Asignar')", Columna('Responsable', 25)),
+    )
+    fuentes = ('orden_produccion', 'personal')
+    indicadores = (
+        Indicador('Total Órdenes', 'total_ordenes'),
+        Indicador('Completadas', 'completadas', None, *VERDE),
+        Indicador('En Proceso', 'en_proceso', None, *AMBAR),
+        Indicador('Retrasadas', 'retrasadas', None, *ROJO),
+        Indicador('Cantidad Total Producida', 'cantidad_total_producida'),
+        Indicador('Tasa de Completadas (%)', 'tasa_completadas', 1, *VERDE),
+    )
+    graficos = (
+        Grafico('DISTRIBUCIÓN POR ESTADO', 'barras', conteos('por_estado')),
+    )
+    tablas = (
+        Tabla(
+            'TOP PRODUCTOS', ['Producto', 'Cantidad', 'Órdenes'],
+            lambda data: sorted(
+                ((prod, info['cantidad'], info['ordenes']) for prod, info in data['estadisticas']['por_producto'].items()),
+                key=lambda fila: fila[1], reverse=True,
+            )[:10],
+        ),
+        Tabla('ÓRDENES POR ESTADO', ['Estado', 'Cantidad', '%'], conteos('por_estado', porcentaje=True), VERDE[0]),
+    )
+    detalle_pdf = ('cod_orden', 'producto_modelo', 'cantidad_total', 'estado', 'fecha_inicio', 'fecha_fin')
+
+
+class ReporteClientes(DefinicionReporte):
+    tipo = 'clientes'
+    archivo = 'Reporte_Clientes'
+    titulo = 'REPORTE DE CLIENTES'
+    hoja_detalle = ('Clientes', 'DETALLE DE CLIENTES')
+    clave_listado = 'clientes'
+    campos = """
+        id,
+        nombre_completo,
+        direccion,
+        telefono,
+        fecha_nacimiento,
+        estado
+    """
+    origen = "FROM clientes"
+    orden = 'nombre_completo'
+    conversiones = {'fecha_nacimiento': 'fecha'}
+    estadisticas = staticmethod(estadisticas_clientes)
+    detalle = (
+        Campo('nombre_completo', 'nombre_completo', Columna('Nombre', 30)),
+        Campo('telefono', 'telefono', Columna('Teléfono', 15)),
+        Campo('direccion', 'direccion', Columna('Dirección', 35)),
+        Campo('fecha_nacimiento', "to_char(fecha_nacimiento, 'YYYY-MM-DD')", Columna('F. Nacimiento', 14)),
+        Campo('estado', 'estado', Columna('Estado', 12)),
+    )
+    fuentes = ('clientes',)
+    indicadores = (
+        Indicador('Total Clientes', 'total_clientes'),
+        Indicador('Activos', 'activos', None, *VERDE),
+        Indicador('Inactivos', 'inactivos', None, *ROJO),
+    )
+    graficos = (
+        Grafico('DISTRIBUCIÓN POR ESTADO', 'torta', conteos('por_estado')),
+    )
+    tablas = (
+        Tabla('CLIENTES POR ESTADO', ['Estado', 'Cantidad', '%'], conteos('por_estado', porcentaje=True)),
+    )
+    detalle_pdf = ('nombre_completo', 'telefono', 'direccion', 'estado')
+    filas_pdf = 20
+
+
+class ReporteBitacora(DefinicionReporte):
+    tipo = 'bitacora'
+    archivo = 'Reporte_Bitacora'
+    titulo = 'REPORTE DE BITÁCORA'
+    hoja_detalle = ('Bitácora', 'DETALLE DE BITÁCORA')
+    clave_listado = 'actividades'
+    campos = """
+        username,
+        ip,
+        fecha_hora,
+        accion,
+        descripcion
+    """
+    origen = "FROM bitacora"
+    orden = 'fecha_hora DESC'
+    fechas = ('fecha_hora', 'fecha_hora')
+    fecha_fin_inclusiva = True
+    conversiones = {'fecha_hora': 'fecha_hora'}
+    # Las estadísticas salen del resumen diario (bitacora_resumen_diario)
+    estadisticas = staticmethod(estadisticas_bitacora)
+    # El listado json se limita a las actividades más recientes
+    limite_defecto = 500
+    limite_maximo = 10000
+    detalle = (
+        Campo('username', 'username', Columna('Usuario', 20)),
+        Campo('ip', 'ip', Columna('IP', 15)),
+        Campo('fecha_hora', "to_char(fecha_hora, 'YYYY-MM-DD HH24:MI:SS')", Columna('Fecha/Hora', 20)),
+        Campo('accion', 'accion', Columna('Acción', 15)),
+        Campo('descripcion', 'descripcion', Columna('Descripción', 50)),
+    )
+    fuentes = ('bitacora', 'bitacora_resumen_diario')
+    indicadores = (
+        Indicador('Total Actividades', 'total_actividades'),
+        Indicador('Usuarios Activos', 'usuarios_activos', None, *VERDE),
+    )
+    graficos = (
+        Grafico('ACTIVIDADES POR ACCIÓN', 'barras', conteos('por_accion', limite=8, ordenar=True)),
+        Grafico('DISTRIBUCIÓN PORCENTUAL DE ACCIONES', 'torta', conteos('por_accion', limite=8, ordenar=True)),
+    )
+    tablas = (
+        Tabla('ACTIVIDADES POR ACCIÓN', ['Acción', 'Cantidad', '%'], conteos('por_accion', ordenar=True, porcentaje=True)),
+        Tabla('ACTIVIDADES POR USUARIO', ['Usuario', 'Cantidad'], conteos('por_usuario', ordenar=True), VERDE[0]),
+    )
+    detalle_pdf = ('username', 'ip', 'fecha_hora', 'accion')
+    filas_pdf = 30
+
+
+class ReportePersonal(DefinicionReporte):
+    tipo = 'personal'
+    archivo = 'Reporte_Personal'
+    titulo = 'REPORTE DE PERSONAL'
+    hoja_detalle = ('Personal', 'DETALLE DE PERSONAL')
+    clave_listado = 'empleados'
+    campos = """
+        id,
+        nombre_completo,
+        telefono,
+        '' as ci,
+        rol,
+        direccion,
+        fecha_nacimiento as fecha_contratacion,
+        estado
+    """
+    origen = "FROM personal"
+    orden = 'nombre_completo'
+    conversiones = {'fecha_contratacion': 'fecha'}
+    estadisticas = staticmethod(estadisticas_personal)
+    detalle = (
+        Campo('nombre_completo', 'nombre_completo', Columna('Nombre', 30)),
+        Campo('telefono', 'telefono', Columna('Teléfono', 15)),
+        Campo('rol', 'rol', Columna('Rol', 20)),
+        Campo('direccion', 'direccion', Columna('Dirección', 30)),
+        Campo('estado', 'estado', Columna('Estado', 12)),
+    )
+    fuentes = ('personal',)
+    indicadores = (
+        Indicador('Total Empleados', 'total_empleados'),
+        Indicador('Activos', 'activos', None, *VERDE),
+        Indicador('Inactivos', 'inactivos', None, *ROJO),
+    )
+    graficos = (
+        Grafico('DISTRIBUCIÓN POR ROL', 'barras', conteos('por_rol'), VERDE[0]),
+        Grafico(
+            'EMPLEADOS ACTIVOS VS INACTIVOS', 'torta',
+            lambda data: [('Activos', data['estadisticas']['activos']), ('Inactivos', data['estadisticas']['inactivos'])],
+        ),
+    )
+    tablas = (
+        Tabla('EMPLEADOS POR ROL', ['Rol', 'Cantidad', '%'], conteos('por_rol', porcentaje=True)),
+    )
+    detalle_pdf = ('nombre_completo', 'telefono', 'rol', 'estado')
+    filas_pdf = 20
+
+
+class ReportePedidos(DefinicionReporte):
+    tipo = 'pedidos'
+    archivo = 'Reporte_Pedidos'
+    titulo = 'REPORTE DE PEDIDOS'
+    hoja_detalle = ('Pedidos', 'DETALLE DE PEDIDOS')
+    clave_listado = 'pedidos'
+    campos = """
+        p.id_pedido as id,
+        p.cod_pedido as codigo_pedido,
+        c.nombre_completo as cliente,
+        p.fecha_pedido,
+        p.fecha_entrega_prometida as fecha_entrega,
+        p.estado,
+        p.total
+    """
+    origen = """
+        FROM pedidos p
+        LEFT JOIN clientes c ON p.id_cliente = c.id
+    """
+    orden = 'p.fecha_pedido DESC'
+    fechas = ('p.fecha_pedido', 'p.fecha_pedido')
+    conversiones = {'fecha_pedido': 'fecha_hora', 'fecha_entrega': 'fecha', 'total': 'numero'}
+    estadisticas = staticmethod(estadisticas_pedidos)
+    detalle = (
+        Campo('codigo_pedido', 'p.cod_pedido', Columna('Código', 15)),
+        Campo('cliente', 'c.nombre_completo', Columna('Cliente', 30)),
+        Campo('fecha_pedido', "to_char(p.fecha_pedido, 'YYYY-MM-DD')", Columna('F. Pedido', 12)),
+        Campo('fecha_entrega', "to_char(p.fecha_entrega_prometida, 'YYYY-MM-DD')", Columna('F. Entrega', 12)),
+        Campo('estado', 'p.estado', Columna('Estado', 15)),
+        Campo('total', 'COALESCE(p.total, 0)', Columna('Total (Bs.)', 15, 'moneda')),
+    )
+    fuentes = ('pedidos', 'clientes')
+    indicadores = (
+        Indicador('Total Pedidos', 'total_pedidos'),
+        Indicador('Pendientes', 'pendientes', None, *AMBAR),
+        Indicador('Completados', 'completados', None, *VERDE),
+        Indicador('Cancelados', 'cancelados', None, *ROJO),
+        Indicador('Monto Total (Bs.)', 'monto_total', 2),
+        Indicador('Promedio (Bs.)', 'promedio', 2),
+    )
+    graficos = (
+        Grafico('DISTRIBUCIÓN POR ESTADO', 'barras', conteos('por_estado'), VERDE[0]),
+        Grafico('DISTRIBUCIÓN PORCENTUAL DE PEDIDOS', 'torta', conteos('por_estado')),
+    )
+    tablas = (
+        Tabla('PEDIDOS POR ESTADO', ['Estado', 'Cantidad', '%'], conteos('por_estado', porcentaje=True)),
+    )
+    detalle_pdf = ('codigo_pedido', 'cliente', 'fecha_pedido', 'estado', 'total')
+    filas_pdf = 20
+
+
+class ReporteInventario(DefinicionReporte):
+    """
+    Stock de materias primas, productos terminados y consumo de materiales:
+    tres listados agregados (chicos) en lugar de una consulta de detalle,
+    así que reemplaza datos(), consulta_streaming(), hojas() y tablas_pdf().
+    """
+    tipo = 'inventario-consumo'
+    archivo = 'Reporte_Inventario'
+    titulo = 'REPORTE DE INVENTARIO Y CONSUMO'
+    fechas = ('ns.fecha_salida', 'ns.fecha_salida')
+    # Cifras de stock y consumo en SQL; materiales_criticos sale del listado
+    estadisticas = staticmethod(estadisticas_inventario)
+    fuentes = ('inventario', 'orden_produccion', 'nota_salida', 'detalle_nota_salida')
+    # Decimal -> float por columna de cada sección
+    conversiones = {
+        'stock': {'stock_total': 'numero', 'stock_minimo': 'numero'},
+        'productos': {},
+        'consumo': {'consumo_total': 'numero'},
+    }
+    indicadores = (
+        Indicador('Total Materias Primas', 'total_materias'),
+        Indicador('Stock Bajo', 'stock_bajo', None, *ROJO),
+        Indicador('Stock Disponible', 'stock_disponible', None, *VERDE),
+        Indicador('Consumo Total', 'consumo_total', 1, *AMBAR),
+    )
+    graficos = (
+        Grafico('DISTRIBUCIÓN POR ESTADO', 'torta', conteos('por_estado')),
+        Grafico(
+            'CONSUMO DE MATERIALES', 'barras',
+            lambda data: [(c['nombre_materia'], c['consumo_total']) for c in data['consumo_materiales']['data'][:10]],
+            VERDE[0],
+        ),
+    )
+    tablas = (
+        Tabla(
+            'MATERIALES EN STOCK CRÍTICO', ['Material', 'Stock Actual', 'Stock Mínimo', 'Unidad'],
+            lambda data: [
+                (m['nombre_materia_prima'], m['stock_total'], m['stock_minimo'], m['unidad_medida'])
+                for m in data['estadisticas'].get('materiales_criticos', [])
+            ],
+            ROJO[0],
+        ),
+    )
+    pagina_pdf = 'A4'
+
+    def consultas(self, filtros):
+        """sección -> (query, params) de cada listado del reporte"""
+        where, params = filtro_fechas(*self.fechas, filtros.get('fecha_inicio'), filtros.get('fecha_fin'))
+        return {
+            # Stock de materias primas
+            'stock': ("""
+                SELECT
+                    i.nombre_materia_prima,
+                    SUM(i.cantidad_actual) as stock_total,
+                    i.unidad_medida,
+                    i.estado,
+                    SUM(i.stock_minimo) as stock_minimo
+                FROM inventario i
+                GROUP BY i.nombre_materia_prima, i.unidad_medida, i.estado
+                ORDER BY i.nombre_materia_prima
+            """, []),
+            # Stock de productos terminados (órdenes completadas)
+            'productos': ("""
+                SELECT
+                    op.producto_modelo,
+                    op.color,
+                    op.talla,
+                    SUM(op.cantidad_total) as cantidad
+                FROM orden_produccion op
+                WHERE op.estado = 'Completada'
+                GROUP BY op.producto_modelo, op.color, op.talla
+                ORDER BY op.producto_modelo
+            """, []),
+            # Consumo de materiales (notas de salida)
+            'consumo': (f"""
+                SELECT
+                    dns.nombre_materia_prima as nombre_materia,
+                    SUM(dns.cantidad) as consumo_total,
+                    dns.unidad_medida
+                FROM detalle_nota_salida dns
+                INNER JOIN nota_salida ns ON dns.id_salida = ns.id_salida
+                WHERE 1=1 {where}
+                GROUP BY dns.nombre_materia_prima, dns.unidad_medida
+                ORDER BY consumo_total DESC
+            """, params),
+        }
+
+    def consulta_streaming(self, request, filtros):
+        # csv/jsonl de una sola sección: seccion=stock|productos|consumo
+        consultas = self.consultas(filtros)
+        seccion = request.query_params.get('seccion', 'stock')
+        if seccion not in consultas:
+            raise ValueError(f'seccion inválida, use: {", ".join(consultas)}')
+        return (f'{self.archivo}_{seccion}', *consultas[seccion])
+
+    def datos(self, cursor, filtros, limite=None, con_listado=True):
+        # Los listados son agregados chicos: se cargan también para el Excel
+        # (gráfica de consumo) y de ellos salen los materiales críticos
+        secciones = {}
+        for seccion, (query, params) in self.consultas(filtros).items():
+            cursor.execute(query, params)
+            columnas = [col[0] for col in cursor.description]
+            secciones[seccion] = convertir_filas(columnas, cursor.fetchall(), self.conversiones[seccion])
+        estadisticas = self.calcular_estadisticas(cursor, filtros)
+        estadisticas['materiales_criticos'] = [
+            material for material in secciones['stock']
+            if material['stock_total'] is not None and material['stock_minimo'] is not None
+            and material['stock_total'] < material['stock_minimo']
+        ][:5]
+
+        return {
+            'fecha_generacion': datetime.now().isoformat(),
+            'stock_materias_primas': secciones['stock'],
+            'stock_productos_terminados': [
+                {
+                    'producto': f"{p['producto_modelo']} - {p['color']} - {p['talla']}",
+                    'cantidad': p['cantidad']
+                }
+                for p in secciones['productos']
+            ],
+            'consumo_materiales': {
+                'filtros': {
+                    'fecha_inicio': filtros.get('fecha_inicio'),
+                    'fecha_fin': filtros.get('fecha_fin')
+                },
+                'data': secciones['consumo']
+            },
+            'estadisticas': estadisticas,
+        }
+
+    def hojas(self, filtros):
+        consultas = self.consultas(filtros)
+        return [
+            (
+                'Stock Materias Primas', 'STOCK DE MATERIAS PRIMAS',
+                [
+                    Columna('Materia Prima', 35),
+                    Columna('Stock Total', 15, 'numero'),
+                    Columna('Unidad', 12),
+                    Columna('Estado', 15),
+                    Columna('Stock Mínimo', 15, 'numero'),
+                ],
+                *consultas['stock'],
+            ),
+            (
+                'Consumo Materiales', 'CONSUMO DE MATERIALES',
+                [Columna('Material', 35), Columna('Consumo Total', 15, 'numero'), Columna('Unidad', 12)],
+                *consultas['consumo'],
+            ),
+        ]
+
+    def tablas_pdf(self, data):
+        return [
+            Tabla(
+                'STOCK DE MATERIAS PRIMAS', ['Materia Prima', 'Stock Total', 'Unidad', 'Estado'],
+                lambda data: [
+                    (item['nombre_materia_prima'], item['stock_total'], item['unidad_medida'], item['estado'])
+                    for item in data['stock_materias_primas'][:15]
+                ],
+            ),
+            Tabla(
+                'CONSUMO DE MATERIALES', ['Material', 'Consumo Total', 'Unidad'],
+                lambda data: [
+                    (item['nombre_materia'], item['consumo_total'], item['unidad_medida'])
+                    for item in data['consumo_materiales']['data'][:10]
+                ],
+                VERDE[0],
+            ),
+        ]
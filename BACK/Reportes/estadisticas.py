@@ -0,0 +1,472 @@
+"""
+Estadísticas de los reportes calculadas en SQL.
+
+Cada reporte obtenía todas las filas de detalle y luego recorría la lista
+varias veces en Python para sacar totales y agrupaciones. Aquí cada
+reporte resuelve sus estadísticas en una sola consulta con GROUPING SETS
+y FILTER; el listado de filas queda como consulta aparte.
+
+Las agrupaciones conservan el orden de aparición del listado (MIN del
+número de fila) para que el JSON sea el mismo que producía el cálculo en
+Python, que se mantiene en las funciones *_python para poder comparar
+ambos caminos (comando comparar_estadisticas_reportes).
+"""
+
+
+def _orden_aparicion(grupos):
+    """[(orden, clave, valor)] -> dict en orden de primera aparición"""
+    return {clave: valor for _, clave, valor in sorted(grupos, key=lambda g: g[0])}
+
+
+def filtro_fechas(columna_desde, columna_hasta, fecha_inicio, fecha_fin):
+    where = ""
+    params = []
+    if fecha_inicio:
+        where += f" AND {columna_desde} >= %s"
+        params.append(fecha_inicio)
+    if fecha_fin:
+        where += f" AND {columna_hasta} <= %s"
+        params.append(fecha_fin)
+    return where, params
+
+
+# ---------- VENTAS ----------
+
+def estadisticas_ventas(cursor, fecha_inicio=None, fecha_fin=None):
+    where, params = filtro_fechas('ns.fecha_salida', 'ns.fecha_salida', fecha_inicio, fecha_fin)
+    cursor.execute(f"""
+        WITH base AS (
+            SELECT
+                COALESCE(p.nombre_completo, 'Sin Asignar') as responsable,
+                dns.nombre_materia_prima as producto,
+                dns.cantidad,
+                ns.estado,
+                0.00 as precio_total,
+                ROW_NUMBER() OVER (ORDER BY ns.fecha_salida DESC, ns.id_salida) as rn
+            FROM nota_salida ns
+            INNER JOIN detalle_nota_salida dns ON ns.id_salida = dns.id_salida
+            LEFT JOIN personal p ON ns.id_personal = p.id
+            WHERE 1=1 {where}
+        )
+        SELECT
+            GROUPING(producto), GROUPING(responsable), GROUPING(estado),
+            producto, responsable, estado,
+            COUNT(*), SUM(cantidad), SUM(precio_total), MIN(rn)
+        FROM base
+        GROUP BY GROUPING SETS ((), (producto), (responsable), (estado))
+    """, params)
+
+    total_ventas = 0
+    cantidad_total = 0
+    monto_total = 0
+    productos, responsables, estados = [], [], []
+    for g_prod, g_resp, g_est, prod, resp, est, n, cantidad, monto, orden in cursor.fetchall():
+        if g_prod and g_resp and g_est:
+            total_ventas = n
+            if n:
+                cantidad_total = float(cantidad)
+                monto_total = float(monto)
+        elif not g_prod:
+            productos.append((orden, prod, {'cantidad': float(cantidad), 'ventas': n}))
+        elif not g_resp:
+            responsables.append((orden, resp, n))
+        else:
+            estados.append((orden, est, n))
+
+    productos = _orden_aparicion(productos)
+    top_productos = sorted(productos.items(), key=lambda x: x[1]['cantidad'], reverse=True)[:5]
+
+    return {
+        'total_ventas': total_ventas,
+        'cantidad_total': cantidad_total,
+        'monto_total': monto_total,
+        'promedio_cantidad': cantidad_total / total_ventas if total_ventas > 0 else 0,
+        'top_productos': top_productos,
+        'por_responsable': _orden_aparicion(responsables),
+        'por_estado': _orden_aparicion(estados),
+    }
+
+
+def estadisticas_ventas_python(ventas):
+    total_ventas = len(ventas)
+    cantidad_total = sum(v.get('cantidad', 0) for v in ventas)
+    monto_total = sum(v.get('precio_total', 0) for v in ventas)
+
+    productos = {}
+    for v in ventas:
+        prod = v.get('producto', 'Desconocido')
+        if prod not in productos:
+            productos[prod] = {'cantidad': 0, 'ventas': 0}
+        productos[prod]['cantidad'] += v.get('cantidad', 0)
+        productos[prod]['ventas'] += 1
+    top_productos = sorted(productos.items(), key=lambda x: x[1]['cantidad'], reverse=True)[:5]
+
+    responsables = {}
+    for v in ventas:
+        resp = v.get('responsable', 'Sin Asignar')
+        responsables[resp] = responsables.get(resp, 0) + 1
+
+    estados = {}
+    for v in ventas:
+        est = v.get('estado', 'Desconocido')
+        estados[est] = estados.get(est, 0) + 1
+
+    return {
+        'total_ventas': total_ventas,
+        'cantidad_total': cantidad_total,
+        'monto_total': monto_total,
+        'promedio_cantidad': cantidad_total / total_ventas if total_ventas > 0 else 0,
+        'top_productos': top_productos,
+        'por_responsable': responsables,
+        'por_estado': estados,
+    }
+
+
+# ---------- PRODUCCIÓN ----------
+
+def estadisticas_produccion(cursor, fecha_inicio=None, fecha_fin=None):
+    where, params = filtro_fechas('op.fecha_inicio', 'op.fecha_fin', fecha_inicio, fecha_fin)
+    cursor.execute(f"""
+        WITH base AS (
+            SELECT
+                op.estado,
+                op.producto_modelo,
+                op.cantidad_total,
+                CASE
+                    WHEN op.fecha_fin < CURRENT_DATE AND op.estado != 'Completada' THEN 'Retrasada'
+                    WHEN op.fecha_fin >= CURRENT_DATE THEN 'En Tiempo'
+                    ELSE 'Completada'
+                END as cumplimiento,
+                ROW_NUMBER() OVER (ORDER BY op.fecha_inicio DESC) as rn
+            FROM orden_produccion op
+            WHERE 1=1 {where}
+        )
+        SELECT
+            GROUPING(producto_modelo), GROUPING(estado),
+            producto_modelo, estado,
+            COUNT(*),
+            SUM(cantidad_total),
+            COUNT(*) FILTER (WHERE estado = 'Completada'),
+            COUNT(*) FILTER (WHERE estado = 'En Proceso'),
+            COUNT(*) FILTER (WHERE cumplimiento = 'Retrasada'),
+            MIN(rn)
+        FROM base
+        GROUP BY GROUPING SETS ((), (producto_modelo), (estado))
+    """, params)
+
+    total_ordenes = completadas = en_proceso = retrasadas = cantidad_total = 0
+    por_producto, por_estado = [], []
+    for g_prod, g_est, prod, est, n, cantidad, n_comp, n_proc, n_retr, orden in cursor.fetchall():
+        if g_prod and g_est:
+            total_ordenes = n
+            completadas = n_comp
+            en_proceso = n_proc
+            retrasadas = n_retr
+            cantidad_total = cantidad or 0
+        elif not g_prod:
+            por_producto.append((orden, prod, {'cantidad': cantidad, 'ordenes': n}))
+        else:
+            por_estado.append((orden, est, n))
+
+    return {
+        'total_ordenes': total_ordenes,
+        'completadas': completadas,
+        'en_proceso': en_proceso,
+        'retrasadas': retrasadas,
+        'cantidad_total_producida': cantidad_total,
+        'tasa_completadas': (completadas / total_ordenes * 100) if total_ordenes > 0 else 0,
+        'por_producto': _orden_aparicion(por_producto),
+        'por_estado': _orden_aparicion(por_estado),
+    }
+
+
+def estadisticas_produccion_python(ordenes):
+    total_ordenes = len(ordenes)
+    completadas = sum(1 for o in ordenes if o['estado'] == 'Completada')
+    en_proceso = sum(1 for o in ordenes if o['estado'] == 'En Proceso')
+    retrasadas = sum(1 for o in ordenes if o['cumplimiento'] == 'Retrasada')
+    cantidad_total = sum(o.get('cantidad_total', 0) for o in ordenes)
+
+    por_producto = {}
+    for o in ordenes:
+        prod = o.get('producto_modelo', 'Desconocido')
+        if prod not in por_producto:
+            por_producto[prod] = {'cantidad': 0, 'ordenes': 0}
+        por_producto[prod]['cantidad'] += o.get('cantidad_total', 0)
+        por_producto[prod]['ordenes'] += 1
+
+    por_estado = {}
+    for o in ordenes:
+        est = o.get('estado', 'Desconocido')
+        por_estado[est] = por_estado.get(est, 0) + 1
+
+    return {
+        'total_ordenes': total_ordenes,
+        'completadas': completadas,
+        'en_proceso': en_proceso,
+        'retrasadas': retrasadas,
+        'cantidad_total_producida': cantidad_total,
+        'tasa_completadas': (completadas / total_ordenes * 100) if total_ordenes > 0 else 0,
+        'por_producto': por_producto,
+        'por_estado': por_estado,
+    }
+
+
+# ---------- PEDIDOS ----------
+
+def estadisticas_pedidos(cursor, fecha_inicio=None, fecha_fin=None):
+    where, params = filtro_fechas('p.fecha_pedido', 'p.fecha_pedido', fecha_inicio, fecha_fin)
+    cursor.execute(f"""
+        WITH base AS (
+            SELECT
+                p.estado,
+                p.total,
+                ROW_NUMBER() OVER (ORDER BY p.fecha_pedido DESC) as rn
+            FROM pedidos p
+            WHERE 1=1 {where}
+        )
+        SELECT
+            GROUPING(estado),
+            estado,
+            COUNT(*),
+            COUNT(*) FILTER (WHERE estado = 'Pendiente'),
+            COUNT(*) FILTER (WHERE estado = 'Completado'),
+            COUNT(*) FILTER (WHERE estado = 'Cancelado'),
+            SUM(total),
+            MIN(rn)
+        FROM base
+        GROUP BY GROUPING SETS ((), (estado))
+    """, params)
+
+    total_pedidos = pendientes = completados = cancelados = 0
+    monto_total = 0
+    por_estado = []
+    for g_est, est, n, n_pend, n_comp, n_canc, monto, orden in cursor.fetchall():
+        if g_est:
+            total_pedidos = n
+            pendientes = n_pend
+            completados = n_comp
+            cancelados = n_canc
+            if n:
+                monto_total = float(monto or 0)
+        else:
+            por_estado.append((orden, est, n))
+
+    return {
+        'total_pedidos': total_pedidos,
+        'pendientes': pendientes,
+        'completados': completados,
+        'cancelados': cancelados,
+        'monto_total': monto_total,
+        'promedio': (monto_total / total_pedidos) if total_pedidos > 0 else 0,
+        'por_estado': _orden_aparicion(por_estado),
+    }
+
+
+def estadisticas_pedidos_python(pedidos):
+    total_pedidos = len(pedidos)
+    pendientes = sum(1 for p in pedidos if p.get('estado') == 'Pendiente')
+    completados = sum(1 for p in pedidos if p.get('estado') == 'Completado')
+    cancelados = sum(1 for p in pedidos if p.get('estado') == 'Cancelado')
+    monto_total = sum(float(p.get('total') or 0) for p in pedidos)
+
+    por_estado = {}
+    for p in pedidos:
+        est = p.get('estado', 'Desconocido')
+        por_estado[est] = por_estado.get(est, 0) + 1
+
+    return {
+        'total_pedidos': total_pedidos,
+        'pendientes': pendientes,
+        'completados': completados,
+        'cancelados': cancelados,
+        'monto_total': monto_total,
+        'promedio': (monto_total / total_pedidos) if total_pedidos > 0 else 0,
+        'por_estado': por_estado,
+    }
+
+
+# ---------- PERSONAL ----------
+
+def estadisticas_personal(cursor):
+    cursor.execute("""
+        WITH base AS (
+            SELECT rol, estado, ROW_NUMBER() OVER (ORDER BY nombre_completo) as rn
+            FROM personal
+        )
+        SELECT
+            GROUPING(rol),
+            rol,
+            COUNT(*),
+            COUNT(*) FILTER (WHERE estado = 'Activo'),
+            MIN(rn)
+        FROM base
+        GROUP BY GROUPING SETS ((), (rol))
+    """)
+
+    total = activos = 0
+    por_rol = []
+    for g_rol, rol, n, n_activos, orden in cursor.fetchall():
+        if g_rol:
+            total = n
+            activos = n_activos
+        else:
+            por_rol.append((orden, rol, n))
+
+    return {
+        'total_empleados': total,
+        'activos': activos,
+        'inactivos': total - activos,
+        'por_rol': _orden_aparicion(por_rol),
+    }
+
+
+def estadisticas_personal_python(empleados):
+    total = len(empleados)
+    activos = sum(1 for e in empleados if e.get('estado') == 'Activo')
+
+    por_rol = {}
+    for e in empleados:
+        rol = e.get('rol', 'Sin rol')
+        por_rol[rol] = por_rol.get(rol, 0) + 1
+
+    return {
+        'total_empleados': total,
+        'activos': activos,
+        'inactivos': total - activos,
+        'por_rol': por_rol,
+    }
+
+
+# ---------- CLIENTES ----------
+
+def estadisticas_clientes(cursor):
+    cursor.execute("""
+        WITH base AS (
+            SELECT estado, ROW_NUMBER() OVER (ORDER BY nombre_completo) as rn
+            FROM clientes
+        )
+        SELECT
+            GROUPING(estado),
+            estado,
+            COUNT(*),
+            COUNT(*) FILTER (WHERE estado = 'Activo'),
+            MIN(rn)
+        FROM base
+        GROUP BY GROUPING SETS ((), (estado))
+    """)
+
+    total = activos = 0
+    por_estado = []
+    for g_est, est, n, n_activos, orden in cursor.fetchall():
+        if g_est:
+            total = n
+            activos = n_activos
+        else:
+            por_estado.append((orden, est, n))
+
+    return {
+        'total_clientes': total,
+        'activos': activos,
+        'inactivos': total - activos,
+        'por_estado': _orden_aparicion(por_estado),
+    }
+
+
+def estadisticas_clientes_python(clientes):
+    total = len(clientes)
+    activos = sum(1 for c in clientes if c.get('estado') == 'Activo')
+
+    por_estado = {}
+    for c in clientes:
+        est = c.get('estado', 'Desconocido')
+        por_estado[est] = por_estado.get(est, 0) + 1
+
+    return {
+        'total_clientes': total,
+        'activos': activos,
+        'inactivos': total - activos,
+        'por_estado': por_estado,
+    }
+
+
+# ---------- INVENTARIO ----------
+
+def estadisticas_inventario(cursor, fecha_inicio=None, fecha_fin=None):
+    """Mismas cifras que el reporte de inventario salvo materiales_criticos (que son filas)."""
+    cursor.execute("""
+        WITH stock AS (
+            SELECT
+                i.estado,
+                SUM(i.cantidad_actual) as stock_total,
+                SUM(i.stock_minimo) as stock_minimo,
+                ROW_NUMBER() OVER (ORDER BY i.nombre_materia_prima) as rn
+            FROM inventario i
+            GROUP BY i.nombre_materia_prima, i.unidad_medida, i.estado
+        )
+        SELECT
+            GROUPING(estado),
+            estado,
+            COUNT(*),
+            COUNT(*) FILTER (WHERE stock_total < stock_minimo),
+            COUNT(*) FILTER (WHERE estado = 'Disponible'),
+            MIN(rn)
+        FROM stock
+        GROUP BY GROUPING SETS ((), (estado))
+    """)
+
+    total_materias = stock_bajo = stock_disponible = 0
+    por_estado = []
+    for g_est, est, n, n_bajo, n_disponible, orden in cursor.fetchall():
+        if g_est:
+            total_materias = n
+            stock_bajo = n_bajo
+            stock_disponible = n_disponible
+        else:
+            por_estado.append((orden, est, n))
+
+    where, params = filtro_fechas('ns.fecha_salida', 'ns.fecha_salida', fecha_inicio, fecha_fin)
+    cursor.execute(f"""
+        SELECT SUM(dns.cantidad)
+        FROM detalle_nota_salida dns
+        INNER JOIN nota_salida ns ON dns.id_salida = ns.id_salida
+        WHERE 1=1 {where}
+    """, params)
+    consumo_total = cursor.fetchone()[0]
+
+    return {
+        'total_materias': total_materias,
+        'stock_bajo': stock_bajo,
+        'stock_disponible': stock_disponible,
+        'consumo_total': float(consumo_total) if consumo_total is not None else 0,
+        'por_estado': _orden_aparicion(por_estado),
+    }
+
+
+# ---------- BITÁCORA ----------
+
+def estadisticas_bitacora(cursor, fecha_inicio=None, fecha_fin=None):
+    """Estadísticas del reporte de bitácora desde el resumen diario (día, usuario, acción)."""
+    where, params = filtro_fechas('dia', 'dia', fecha_inicio, fecha_fin)
+    cursor.execute(f"""
+        SELECT username, accion, SUM(cantidad)
+        FROM bitacora_resumen_diario
+        WHERE 1=1 {where}
+        GROUP BY username, accion
+    """, params)
+
+    por_usuario = {}
+    por_accion = {}
+    total_actividades = 0
+    for usr, acc, cantidad in cursor.fetchall():
+        cantidad = int(cantidad)
+        por_usuario[usr] = por_usuario.get(usr, 0) + cantidad
+        por_accion[acc] = por_accion.get(acc, 0) + cantidad
+        total_actividades += cantidad
+
+    return {
+        'total_actividades': total_actividades,
+        'usuarios_activos': len(por_usuario),
+        'por_usuario': por_usuario,
+        'por_accion': por_accion,
+    }
@@ -0,0 +1,240 @@
+"""
+Exportación a Excel de los reportes.
+
+Todos los reportes usan el Workbook write-only de openpyxl: los estilos
+se registran una vez como estilos con nombre, las filas de detalle salen
+de un cursor del lado del servidor y se escriben directo al archivo
+temporal de la hoja, sin límite de filas. Así el pico de memoria no
+crece con el tamaño del reporte (antes se armaba un Workbook completo en
+memoria con Font/Fill/Border celda por celda).
+
+El .xlsx es un zip que openpyxl solo puede cerrar al final, así que el
+archivo se arma en un temporal y la respuesta (StreamingHttpResponse)
+lo envía por bloques y lo borra al terminar.
+"""
+import os
+import tempfile
+from collections import namedtuple
+from copy import copy
+
+from django.db import connection, transaction
+from django.http import StreamingHttpResponse
+
+from . import progreso
+
+try:
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.chart import BarChart, PieChart, Reference
+    from openpyxl.styles import Alignment, Border, Font, NamedStyle, PatternFill, Side
+    from openpyxl.utils import get_column_letter
+    OPENPYXL_AVAILABLE = True
+except ImportError:
+    OPENPYXL_AVAILABLE = False
+
+CONTENT_TYPE_XLSX = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+TAMANIO_LOTE_CURSOR = 2000
+TAMANIO_BLOQUE_RESPUESTA = 64 * 1024
+# Filas que ocupa una gráfica en la hoja Gráficos (alto por defecto de openpyxl)
+FILAS_GRAFICO = 16
+
+# tipo de columna -> formato numérico
+FORMATOS_COLUMNA = {
+    'texto': 'General',
+    'numero': '#,##0.##',
+    'entero': '0',
+    'moneda': '#,##0.00',
+}
+
+Columna = namedtuple('Columna', ['titulo', 'ancho', 'tipo'], defaults=['texto'])
+
+
+def filas_servidor(query, params, tamanio_lote=TAMANIO_LOTE_CURSOR):
+    """Itera las filas de la consulta con un cursor del lado del servidor."""
+    with transaction.atomic():
+        cursor = connection.chunked_cursor()
+        try:
+            cursor.execute(query, params)
+            while True:
+                lote = cursor.fetchmany(tamanio_lote)
+                if not lote:
+                    break
+                progreso.filas(len(lote))
+                yield from lote
+        finally:
+            cursor.close()
+
+
+def _estilos_nombrados():
+    borde = Side(style='thin', color='CCCCCC')
+    bordes = Border(left=borde, right=borde, top=borde, bottom=borde)
+    estilos = [
+        NamedStyle(
+            name='rep_titulo',
+            font=Font(bold=True, size=18, color='4F46E5'),
+        ),
+        NamedStyle(
+            name='rep_subtitulo',
+            font=Font(italic=True, size=10, color='666666'),
+        ),
+        NamedStyle(
+            name='rep_seccion',
+            font=Font(bold=True, size=12, color='FFFFFF'),
+            fill=PatternFill(start_color='6366F1', end_color='6366F1', fill_type='solid'),
+        ),
+        NamedStyle(
+            name='rep_encabezado',
+            font=Font(bold=True, size=11, color='FFFFFF'),
+            fill=PatternFill(start_color='4F46E5', end_color='4F46E5', fill_type='solid'),
+            alignment=Alignment(horizontal='center', vertical='center'),
+            border=bordes,
+        ),
+        NamedStyle(
+            name='rep_etiqueta',
+            font=Font(bold=True),
+            fill=PatternFill(start_color='EEF2FF', end_color='EEF2FF', fill_type='solid'),
+            border=bordes,
+        ),
+        NamedStyle(
+            name='rep_valor',
+            font=Font(bold=True, color='1E293B'),
+            alignment=Alignment(horizontal='center'),
+            border=bordes,
+        ),
+    ]
+    # Celdas de detalle: un estilo por tipo de columna y por color de fila alternado
+    for tipo, formato in FORMATOS_COLUMNA.items():
+        for par, color in (('par', 'F5F5F5'), ('impar', 'FFFFFF')):
+            estilos.append(NamedStyle(
+                name=f'rep_{tipo}_{par}',
+                fill=PatternFill(start_color=color, end_color=color, fill_type='solid'),
+                border=bordes,
+                number_format=formato,
+            ))
+    return estilos
+
+
+class LibroStreaming:
+    """Workbook write-only con los estilos del reporte ya registrados."""
+
+    def __init__(self):
+        self.wb = Workbook(write_only=True)
+        for estilo in _estilos_nombrados():
+            self.wb.add_named_style(estilo)
+        self._plantillas = {}
+
+    def _celda(self, ws, valor, estilo):
+        # Se copia el StyleArray de una celda plantilla en lugar de resolver
+        # el estilo con nombre en cada celda
+        plantilla = self._plantillas.get(estilo)
+        if plantilla is None:
+            plantilla = WriteOnlyCell(ws)
+            plantilla.style = estilo
+            self._plantillas[estilo] = plantilla
+        celda = WriteOnlyCell(ws, value=valor)
+        celda._style = copy(plantilla._style)
+        return celda
+
+    def hoja_resumen(self, titulo, subtitulo, kpis, tablas=()):
+        """
+        kpis: [(etiqueta, valor)]
+        tablas: [(titulo, encabezados, filas)] con agrupaciones ya calculadas
+        """
+        ws = self.wb.create_sheet('Resumen')
+        ws.column_dimensions['A'].width = 40
+        for letra in 'BCD':
+            ws.column_dimensions[letra].width = 18
+        ws.append([self._celda(ws, titulo, 'rep_titulo')])
+        ws.append([self._celda(ws, subtitulo, 'rep_subtitulo')])
+        ws.append([])
+        for etiqueta, valor in kpis:
+            ws.append([self._celda(ws, etiqueta, 'rep_etiqueta'), self._celda(ws, valor, 'rep_valor')])
+        for titulo_tabla, encabezados, filas in tablas:
+            ws.append([])
+            ws.append([self._celda(ws, titulo_tabla, 'rep_seccion')])
+            ws.append([self._celda(ws, encabezado, 'rep_encabezado') for encabezado in encabezados])
+            for fila in filas:
+                ws.append([self._celda(ws, valor, 'rep_valor') for valor in fila])
+        return ws
+
+    def hoja_detalle(self, nombre, titulo, columnas, filas):
+        """Escribe las filas (iterable de tuplas en el orden de `columnas`); devuelve cuántas."""
+        ws = self.wb.create_sheet(nombre)
+        for indice, columna in enumerate(columnas):
+            ws.column_dimensions[get_column_letter(indice + 1)].width = columna.ancho
+        ws.freeze_panes = 'A3'
+        ws.append([self._celda(ws, titulo, 'rep_titulo')])
+        ws.append([self._celda(ws, columna.titulo, 'rep_encabezado') for columna in columnas])
+
+        estilos = [
+            (f'rep_{columna.tipo}_par', f'rep_{columna.tipo}_impar')
+            for columna in columnas
+        ]
+        total = 0
+        for total, fila in enumerate(filas, 1):
+            paridad = total % 2
+            ws.append([
+                self._celda(ws, valor, estilos[i][paridad])
+                for i, valor in enumerate(fila)
+            ])
+        return total
+
+    def hoja_graficos(self, graficos):
+        """
+        graficos: [(titulo, 'barras' | 'torta', [(categoría, valor)])]
+        Los datos de cada gráfica se escriben en la hoja (las series apuntan
+        a esas celdas) y la gráfica se ancla a su derecha.
+        """
+        ws = self.wb.create_sheet('Gráficos')
+        ws.column_dimensions['A'].width = 30
+        ws.column_dimensions['B'].width = 14
+        fila = 1
+        for titulo, clase, valores in graficos:
+            if not valores:
+                continue
+            ws.append([self._celda(ws, titulo, 'rep_seccion')])
+            ws.append([self._celda(ws, 'Categoría', 'rep_encabezado'), self._celda(ws, 'Valor', 'rep_encabezado')])
+            for categoria, valor in valores:
+                ws.append([self._celda(ws, categoria, 'rep_etiqueta'), self._celda(ws, valor, 'rep_valor')])
+            ultima = fila + 1 + len(valores)
+            grafica = PieChart() if clase == 'torta' else BarChart()
+            grafica.title = titulo
+            grafica.add_data(Reference(ws, min_col=2, min_row=fila + 1, max_row=ultima), titles_from_data=True)
+            grafica.set_categories(Reference(ws, min_col=1, min_row=fila + 2, max_row=ultima))
+            if clase != 'torta':
+                grafica.legend = None
+            ws.add_chart(grafica, f'D{fila}')
+            # Filas vacías hasta el final de la gráfica antes de la siguiente
+            usadas = len(valores) + 2
+            for _ in range(max(FILAS_GRAFICO - usadas, 1)):
+                ws.append([])
+            fila += max(FILAS_GRAFICO, usadas + 1)
+        return ws
+
+    def respuesta(self, nombre_archivo):
+        """Cierra el libro en un temporal y lo envía por bloques."""
+        descriptor, ruta = tempfile.mkstemp(suffix='.xlsx', prefix='reporte_')
+        os.close(descriptor)
+        try:
+            self.wb.save(ruta)
+        except Exception:
+            os.remove(ruta)
+            raise
+
+        def contenido():
+            try:
+                with open(ruta, 'rb') as archivo:
+                    while True:
+                        bloque = archivo.read(TAMANIO_BLOQUE_RESPUESTA)
+                        if not bloque:
+                            break
+                        yield bloque
+            finally:
+                os.remove(ruta)
+
+        response = StreamingHttpResponse(contenido(), content_type=CONTENT_TYPE_XLSX)
+        response['Content-Length'] = str(os.path.getsize(ruta))
+        response['Content-Disposition'] = f'attachment; filename="{nombre_archivo}"'
+        return response
+
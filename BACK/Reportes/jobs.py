@@ -0,0 +1,426 @@
+"""
+Generación asíncrona de reportes.
+
+Los reportes grandes (PDF/Excel) tardaban decenas de segundos dentro del
+GET. Ahora se puede enviar un job (tipo, filtros, formato): se registra en
+reporte_jobs y se ejecuta en un pool de procesos (spawn) de
+REPORTES_MAX_CONCURRENCIA hijos, reutilizando las mismas vistas de
+Reportes, para no competir por el GIL con las peticiones del worker. El
+archivo resultante queda en disco (REPORTES_JOBS_DIR) hasta que expira
+(REPORTES_JOBS_TTL_HORAS).
+
+- Progreso: el hijo informa la etapa (consulta, detalle, render,
+  escritura) y, en Excel/csv/jsonl, la fracción de filas leídas del
+  cursor sobre el total contado antes de empezar (Reportes/progreso.py).
+  Se guarda por una conexión aparte: el cursor del servidor mantiene
+  abierta la transacción de la conexión principal.
+- Mientras genera, el hijo tiene un advisory lock de sesión con la clave
+  del job. Un job "en_proceso" sin ese lock quedó huérfano (servidor
+  reiniciado, hijo muerto) y se marca como error; al arrancar el servidor
+  (recuperar_jobs) además se reenvían los pendientes, que solo vivían en
+  la cola del pool.
+
+El estado vive en la tabla reporte_jobs, así cualquier worker puede
+responder a la consulta de estado o a la descarga. El módulo no importa
+modelos ni vistas al cargarse: los hijos lo importan antes de
+django.setup().
+"""
+import json
+import multiprocessing
+import os
+import re
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection, connections
+from django.http import HttpRequest, QueryDict
+from django.utils import timezone
+
+from . import progreso
+from .streaming import FORMATOS_STREAMING
+
+REPORTES_JOBS_DIR = getattr(settings, 'REPORTES_JOBS_DIR', os.path.join(settings.BASE_DIR, 'reportes_generados'))
+REPORTES_MAX_CONCURRENCIA = getattr(settings, 'REPORTES_MAX_CONCURRENCIA', 2)
+REPORTES_MAX_PENDIENTES = getattr(settings, 'REPORTES_MAX_PENDIENTES', 20)
+REPORTES_JOBS_TTL_HORAS = getattr(settings, 'REPORTES_JOBS_TTL_HORAS', 24)
+# Jobs que siguen "en proceso" pasado este tiempo se consideran perdidos (worker reiniciado)
+REPORTES_JOB_TIMEOUT_MINUTOS = getattr(settings, 'REPORTES_JOB_TIMEOUT_MINUTOS', 60)
+
+FORMATOS = {
+    'pdf': ('application/pdf', 'pdf'),
+    'excel': ('application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', 'xlsx'),
+    'json': ('application/json', 'json'),
+    'csv': ('text/csv; charset=utf-8', 'csv'),
+    'jsonl': ('application/x-ndjson; charset=utf-8', 'jsonl'),
+}
+
+ACTIVOS = ('pendiente', 'en_proceso')
+LOCK_JOB = 'reporte_job:'
+
+# etapa -> progreso mínimo al empezarla; las filas leídas llevan 'detalle' hasta 90
+ETAPAS = {'consulta': 5, 'detalle': 20, 'render': 70, 'escritura': 90}
+# Segundos mínimos entre dos escrituras del progreso
+INTERVALO_AVANCE = 1.0
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+class LimiteJobsExcedido(Exception):
+    pass
+
+
+def _peticion(filtros, formato):
+    peticion = HttpRequest()
+    peticion.method = 'GET'
+    peticion.META['SERVER_NAME'] = 'localhost'
+    peticion.META['SERVER_PORT'] = '80'
+    parametros = QueryDict(mutable=True)
+    for clave, valor in (filtros or {}).items():
+        if valor is not None and valor != '':
+            parametros[clave] = str(valor)
+    parametros['formato'] = formato
+    peticion.GET = parametros
+    return peticion
+
+
+def ejecutar_vista_reporte(tipo, filtros, formato):
+    """Ejecuta la vista del reporte fuera de una petición HTTP y devuelve la respuesta."""
+    from .motor import vistas
+
+    respuesta = vistas()[tipo].as_view()(_peticion(filtros, formato))
+    if hasattr(respuesta, 'render') and not getattr(respuesta, 'is_rendered', True):
+        respuesta.render()
+    return respuesta
+
+
+def _nombre_archivo(respuesta, tipo, extension):
+    disposicion = respuesta.get('Content-Disposition', '') if hasattr(respuesta, 'get') else ''
+    encontrado = re.search(r'filename="?([^";]+)"?', disposicion)
+    if encontrado:
+        return encontrado.group(1)
+    return f'Reporte_{tipo}_{timezone.now():%Y%m%d_%H%M%S}.{extension}'
+
+
+# ======= PROCESO HIJO =======
+
+def _preparar_hijo():
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backwf.settings')
+    import django
+    django.setup()
+    # El job ya corre fuera del worker web: el PDF se construye en este mismo proceso
+    settings.PDF_PROCESOS = 0
+
+
+class _Avance:
+    """Observador de Reportes.progreso en el hijo: guarda etapa y progreso del job."""
+
+    def __init__(self, conexion, id_job, total_filas=0):
+        self.conexion = conexion
+        self.id_job = id_job
+        self.total_filas = total_filas
+        self.filas = 0
+        self.etapa = 'consulta'
+        self.progreso = ETAPAS['consulta']
+        self._guardado = time.monotonic()
+
+    def __call__(self, etapa=None, filas=0):
+        if filas:
+            self.filas += filas
+            etapa = etapa or 'detalle'
+        cambio = etapa is not None and etapa != self.etapa
+        if cambio:
+            self.etapa = etapa
+            self.progreso = max(self.progreso, ETAPAS[etapa])
+        if filas and self.total_filas:
+            fraccion = min(1.0, self.filas / self.total_filas)
+            tramo = ETAPAS['escritura'] - ETAPAS['detalle']
+            self.progreso = max(self.progreso, ETAPAS['detalle'] + int(fraccion * tramo))
+        if cambio or time.monotonic() - self._guardado >= INTERVALO_AVANCE:
+            self._guardado = time.monotonic()
+            with self.conexion.cursor() as cursor:
+                cursor.execute(
+                    "UPDATE reporte_jobs SET progreso = %s, etapa = %s WHERE id_job = %s",
+                    [self.progreso, self.etapa, self.id_job]
+                )
+
+
+def _contar_filas(tipo, filtros, formato):
+    """Filas que leerán los cursores del servidor (Excel, csv, jsonl); 0 si el formato no las lee."""
+    from rest_framework.request import Request
+
+    from .motor import vistas
+
+    definicion = vistas()[tipo].definicion
+    peticion = Request(_peticion(filtros, formato))
+    filtros_reporte = definicion.filtros(peticion)
+    try:
+        if formato == 'excel':
+            consultas = [(query, params) for *_, query, params in definicion.hojas(filtros_reporte)]
+        elif formato in FORMATOS_STREAMING:
+            consultas = [definicion.consulta_streaming(peticion, filtros_reporte)[1:]]
+        else:
+            return 0
+    except ValueError:
+        return 0  # parámetros inválidos: la vista responde el error
+    total = 0
+    with connection.cursor() as cursor:
+        for query, params in consultas:
+            cursor.execute(f"SELECT COUNT(*) FROM ({query}) filas", params)
+            total += cursor.fetchone()[0]
+    return total
+
+
+def ejecutar_job(id_job):
+    """Genera el archivo del job (corre en un proceso del pool)"""
+    close_old_connections()
+    # Conexión propia del job: lock y progreso no dependen de la transacción de la principal
+    conexion = connections.create_connection('default')
+    tomado = False
+    try:
+        with conexion.cursor() as cursor:
+            cursor.execute("SELECT pg_try_advisory_lock(hashtext(%s))", [LOCK_JOB + id_job])
+            if not cursor.fetchone()[0]:
+                return  # otro hijo ya lo está generando
+            cursor.execute("""
+                UPDATE reporte_jobs
+                SET estado = 'en_proceso', progreso = %s, etapa = 'consulta', fecha_inicio = now()
+                WHERE id_job = %s AND estado = 'pendiente'
+                RETURNING tipo, formato, filtros
+            """, [ETAPAS['consulta'], id_job])
+            fila = cursor.fetchone()
+        if not fila:
+            return  # ya generado, vencido o enviado dos veces
+        tomado = True
+        tipo, formato, filtros = fila
+        if isinstance(filtros, str):
+            filtros = json.loads(filtros)
+
+        avance = _Avance(conexion, id_job, _contar_filas(tipo, filtros, formato))
+        progreso.observar(avance)
+        respuesta = ejecutar_vista_reporte(tipo, filtros, formato)
+        if respuesta.status_code >= 400:
+            contenido = getattr(respuesta, 'data', None) or respuesta.content.decode('utf-8', 'ignore')
+            raise RuntimeError(str(contenido)[:1000])
+        # csv/jsonl leen el cursor mientras se escriben: su avance lo dan las filas
+        if formato not in FORMATOS_STREAMING:
+            avance(etapa='escritura')
+
+        content_type, extension = FORMATOS[formato]
+        os.makedirs(REPORTES_JOBS_DIR, exist_ok=True)
+        ruta = os.path.join(REPORTES_JOBS_DIR, f'{id_job}.{extension}')
+        with open(ruta, 'wb') as archivo:
+            if getattr(respuesta, 'streaming', False):
+                for parte in respuesta.streaming_content:
+                    archivo.write(parte)
+            else:
+                archivo.write(respuesta.content)
+
+        with conexion.cursor() as cursor:
+            cursor.execute("""
+                UPDATE reporte_jobs
+                SET estado = 'completado', progreso = 100, etapa = '', archivo = %s, nombre_archivo = %s,
+                    content_type = %s, tamanio = %s, fecha_fin = now(),
+                    expira_en = now() + make_interval(hours => %s)
+                WHERE id_job = %s
+            """, [
+                ruta, _nombre_archivo(respuesta, tipo, extension), respuesta.get('Content-Type', content_type),
+                os.path.getsize(ruta), REPORTES_JOBS_TTL_HORAS, id_job,
+            ])
+    except Exception as e:
+        print(f"Error al generar reporte {id_job}: {str(e)}")
+        if tomado:
+            try:
+                with conexion.cursor() as cursor:
+                    cursor.execute(
+                        "UPDATE reporte_jobs SET estado = 'error', etapa = '', mensaje = %s, fecha_fin = now() WHERE id_job = %s",
+                        [str(e), id_job]
+                    )
+            except Exception as error:
+                print(f"Error al marcar el job {id_job}: {str(error)}")
+    finally:
+        progreso.observar(None)
+        # Cerrar la conexión del job libera también el advisory lock
+        conexion.close()
+        connection.close()
+
+
+# ======= WORKER WEB =======
+
+def _obtener_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn: los hijos no heredan hilos ni conexiones del worker de Django
+            _pool = ProcessPoolExecutor(
+                max_workers=REPORTES_MAX_CONCURRENCIA,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_preparar_hijo,
+            )
+        return _pool
+
+
+def _reiniciar_pool(pool):
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _al_terminar(id_job, pool, futuro):
+    """El hijo murió sin actualizar el job (memoria, señal): se marca como error"""
+    if futuro.cancelled() or not isinstance(futuro.exception(), BrokenProcessPool):
+        return
+    _reiniciar_pool(pool)
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("""
+                UPDATE reporte_jobs
+                SET estado = 'error', etapa = '', mensaje = 'El proceso de generación terminó inesperadamente', fecha_fin = now()
+                WHERE id_job = %s AND estado IN %s
+            """, [id_job, ACTIVOS])
+    except Exception as e:
+        print(f"Error al marcar el job {id_job}: {str(e)}")
+    finally:
+        connection.close()
+
+
+def _enviar(id_job):
+    for intento in range(2):
+        pool = _obtener_pool()
+        try:
+            futuro = pool.submit(ejecutar_job, id_job)
+            futuro.add_done_callback(lambda f, pool=pool: _al_terminar(id_job, pool, f))
+            return
+        except BrokenProcessPool:
+            _reiniciar_pool(pool)
+            if intento:
+                raise
+
+
+def crear_job(tipo, formato, filtros):
+    """Registra el job y lo envía al pool. Lanza ValueError o LimiteJobsExcedido."""
+    from .models import ReporteJob
+    from .motor import vistas
+
+    if tipo not in vistas():
+        raise ValueError(f"Tipo de reporte inválido: {tipo}")
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato inválido: {formato}")
+    if not isinstance(filtros, dict):
+        raise ValueError("filtros debe ser un objeto")
+
+    limpiar_jobs()
+    if ReporteJob.objects.filter(estado__in=ACTIVOS).count() >= REPORTES_MAX_PENDIENTES:
+        raise LimiteJobsExcedido('Hay demasiados reportes en cola, intente más tarde')
+
+    job = ReporteJob.objects.create(
+        id_job=uuid.uuid4(),
+        tipo=tipo,
+        formato=formato,
+        filtros=filtros,
+        estado='pendiente',
+        progreso=0,
+        fecha_creacion=timezone.now(),
+    )
+    try:
+        _enviar(str(job.id_job))
+    except Exception as e:
+        ReporteJob.objects.filter(id_job=job.id_job).update(
+            estado='error', mensaje=f'No se pudo enviar el reporte: {str(e)}', fecha_fin=timezone.now()
+        )
+        raise
+    return job
+
+
+def marcar_huerfanos():
+    """Marca como error los jobs en proceso cuyo hijo ya no tiene el lock (servidor reiniciado, proceso muerto)."""
+    with connection.cursor() as cursor:
+        # MATERIALIZED: el lock solo se prueba sobre los jobs en proceso
+        cursor.execute("""
+            WITH en_proceso AS MATERIALIZED (
+                SELECT id_job FROM reporte_jobs WHERE estado = 'en_proceso'
+            )
+            UPDATE reporte_jobs
+            SET estado = 'error', etapa = '', fecha_fin = now(),
+                mensaje = 'La generación se interrumpió (servidor reiniciado o proceso terminado)'
+            WHERE estado = 'en_proceso' AND id_job IN (
+                SELECT id_job FROM en_proceso
+                WHERE pg_try_advisory_xact_lock(hashtext(%s || id_job::text))
+            )
+        """, [LOCK_JOB])
+        return cursor.rowcount
+
+
+def recuperar_jobs():
+    """
+    Al arrancar el servidor: cierra los jobs que quedaron en proceso y
+    reenvía los pendientes, que solo estaban en la cola del pool anterior.
+    """
+    close_old_connections()
+    try:
+        _, colgados = limpiar_jobs()
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT id_job FROM reporte_jobs WHERE estado = 'pendiente' ORDER BY fecha_creacion")
+            pendientes = [str(fila[0]) for fila in cursor.fetchall()]
+        for id_job in pendientes:
+            _enviar(id_job)
+        if colgados or pendientes:
+            print(f"Reportes: {colgados} jobs interrumpidos marcados como error, {len(pendientes)} pendientes reenviados")
+    except Exception as e:
+        print(f"Error al recuperar los jobs de reportes: {str(e)}")
+    finally:
+        connection.close()
+
+
+def programar_recuperacion_jobs():
+    """recuperar_jobs apenas arranca el scheduler de BR (no en el arranque de Django)"""
+    from BR.scheduler import scheduler
+
+    scheduler.add_job(recuperar_jobs, id='reportes_recuperar_jobs', replace_existing=True)
+
+
+def limpiar_jobs():
+    """Elimina artefactos vencidos y marca como error los jobs colgados o huérfanos."""
+    from .models import ReporteJob
+
+    ahora = timezone.now()
+    vencidos = ReporteJob.objects.filter(estado='completado', expira_en__lt=ahora)
+    for job in vencidos:
+        if job.archivo and os.path.exists(job.archivo):
+            try:
+                os.remove(job.archivo)
+            except OSError as e:
+                print(f"No se pudo eliminar {job.archivo}: {str(e)}")
+    expirados = vencidos.update(estado='expirado', archivo='')
+
+    colgados = ReporteJob.objects.filter(
+        estado__in=ACTIVOS,
+        fecha_creacion__lt=ahora - timedelta(minutes=REPORTES_JOB_TIMEOUT_MINUTOS),
+    ).update(estado='error', etapa='', mensaje='Tiempo de generación excedido', fecha_fin=ahora)
+    return expirados, colgados + marcar_huerfanos()
+
+
+def serializar_job(job):
+    return {
+        'id_job': str(job.id_job),
+        'tipo': job.tipo,
+        'formato': job.formato,
+        'filtros': job.filtros,
+        'estado': job.estado,
+        'progreso': job.progreso,
+        'etapa': job.etapa,
+        'mensaje': job.mensaje,
+        'nombre_archivo': job.nombre_archivo,
+        'tamanio': job.tamanio,
+        'fecha_creacion': job.fecha_creacion,
+        'fecha_inicio': job.fecha_inicio,
+        'fecha_fin': job.fecha_fin,
+        'expira_en': job.expira_en,
+    }
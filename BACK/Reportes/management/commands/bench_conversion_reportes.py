@@ -0,0 +1,137 @@
+import gc
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+
+from Reportes.definiciones import ReporteBitacora, ReporteVentas
+from Reportes.management.commands.comparar_estadisticas_reportes import diferencias
+from Reportes.vectorizado import convertir_filas
+
+COLUMNAS_VENTAS = [
+    'id_salida', 'fecha_salida', 'responsable', 'producto', 'lote_asociado',
+    'cantidad', 'unidad_medida', 'motivo', 'estado', 'precio_total',
+]
+COLUMNAS_BITACORA = ['username', 'ip', 'fecha_hora', 'accion', 'descripcion']
+
+
+def _filas_ventas(filas):
+    """Filas con los tipos que devuelve el cursor del listado de ventas (Decimal, date)."""
+    inicio = date(2025, 1, 1)
+    return [
+        (
+            i + 1,
+            inicio + timedelta(days=i % 365),
+            f'Empleado {i % 40}' if i % 97 else 'Sin Asignar',
+            f'Tela algodón {i % 120}',
+            f'L-{i % 900:04d}',
+            Decimal(i % 50) + Decimal('0.25'),
+            'metros',
+            'Producción',
+            'Completado' if i % 7 else 'Pendiente',
+            Decimal('0.00'),
+        )
+        for i in range(filas)
+    ]
+
+
+def _filas_bitacora(filas):
+    """Filas del listado de bitácora (timestamp sin zona, con y sin microsegundos)."""
+    inicio = datetime(2025, 1, 1, 8, 0, 0)
+    return [
+        (
+            f'usuario{i % 25}',
+            f'10.0.0.{i % 250}',
+            inicio + timedelta(seconds=i * 7, microseconds=(i % 3) * 1500),
+            'EDITAR' if i % 5 else 'CREAR',
+            f'Registro {i}',
+        )
+        for i in range(filas)
+    ]
+
+
+def _bucles(nombres, conversiones):
+    """Camino anterior: dicts por fila y conversión campo por campo"""
+    valor = {'numero': float, 'fecha': lambda v: v.isoformat(), 'fecha_hora': str}
+
+    def convertir(filas):
+        registros = [dict(zip(nombres, fila)) for fila in filas]
+        for registro in registros:
+            for columna, tipo in conversiones.items():
+                if registro.get(columna) is not None:
+                    registro[columna] = valor[tipo](registro[columna])
+        return registros
+    return convertir
+
+
+def _por_columna(nombres, conversiones):
+    return lambda filas: convertir_filas(nombres, filas, conversiones)
+
+
+# listado -> (filas sintéticas, camino anterior, conversión por columna)
+LISTADOS = {
+    'ventas': (
+        _filas_ventas,
+        _bucles(COLUMNAS_VENTAS, ReporteVentas.conversiones),
+        _por_columna(COLUMNAS_VENTAS, ReporteVentas.conversiones),
+    ),
+    'bitacora': (
+        _filas_bitacora,
+        _bucles(COLUMNAS_BITACORA, ReporteBitacora.conversiones),
+        _por_columna(COLUMNAS_BITACORA, ReporteBitacora.conversiones),
+    ),
+}
+
+
+def _medir(funcion, filas, repeticiones):
+    mejor = None
+    resultado = None
+    for _ in range(repeticiones):
+        gc.collect()
+        inicio = time.perf_counter()
+        resultado = funcion(filas)
+        segundos = time.perf_counter() - inicio
+        mejor = segundos if mejor is None else min(mejor, segundos)
+    return mejor, resultado
+
+
+class Command(BaseCommand):
+    help = 'Mide la conversión de los listados de reportes fila por fila vs por columna (pandas)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--filas',
+            type=int,
+            nargs='+',
+            default=[10000, 100000, 1000000],
+            help='Tamaños a medir (por defecto: 10000 100000 1000000)',
+        )
+        parser.add_argument(
+            '--repeticiones',
+            type=int,
+            default=3,
+            help='Se informa el mejor tiempo de N repeticiones (por defecto: 3)',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write('Conversión de listados: fila por fila vs por columna (sin base de datos)')
+        fallos = 0
+        for listado, (generar, anterior, por_columna) in LISTADOS.items():
+            self.stdout.write(f'  {listado}')
+            for cantidad in options['filas']:
+                filas = generar(cantidad)
+                t_anterior, esperado = _medir(anterior, filas, options['repeticiones'])
+                t_columna, obtenido = _medir(por_columna, filas, options['repeticiones'])
+                encontradas = diferencias(esperado, obtenido, listado)
+                marca = self.style.ERROR(f'✗ {len(encontradas)} diferencias') if encontradas else self.style.SUCCESS('✓ idénticos')
+                self.stdout.write(
+                    f'    {cantidad:>9,} filas   por fila {t_anterior:8.3f} s   por columna {t_columna:8.3f} s   '
+                    f'x{t_anterior / t_columna:.2f}   {marca}'
+                )
+                for diferencia in encontradas[:10]:
+                    self.stdout.write(f'      {diferencia}')
+                fallos += bool(encontradas)
+                del filas, esperado, obtenido
+        if fallos:
+            self.stdout.write(self.style.ERROR(f'✗ {fallos} mediciones con resultados distintos'))
@@ -0,0 +1,131 @@
+import multiprocessing
+import resource
+import sys
+import time
+from datetime import date, timedelta
+from io import BytesIO
+
+from django.core.management.base import BaseCommand
+from openpyxl import Workbook
+from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
+
+from Reportes.excel_streaming import Columna, LibroStreaming
+
+COLUMNAS_VENTAS = [
+    Columna('ID', 10, 'entero'),
+    Columna('Fecha', 14),
+    Columna('Producto', 35),
+    Columna('Lote', 18),
+    Columna('Cantidad', 14, 'numero'),
+    Columna('Total (Bs.)', 18, 'moneda'),
+    Columna('Responsable', 28),
+    Columna('Estado', 16),
+]
+
+
+def _filas_sinteticas(filas):
+    """Filas con la forma del detalle de ventas (sin base de datos)."""
+    inicio = date(2025, 1, 1)
+    for i in range(filas):
+        yield (
+            i + 1,
+            (inicio + timedelta(days=i % 365)).isoformat(),
+            f'Tela algodón {i % 120}',
+            f'L-{i % 900:04d}',
+            float(i % 50) + 0.5,
+            0.0,
+            f'Empleado {i % 40}',
+            'Completado' if i % 7 else 'Pendiente',
+        )
+
+
+def _peak_rss_mb():
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reporta KB, macOS bytes
+    return pico / (1024 * 1024) if sys.platform == 'darwin' else pico / 1024
+
+
+def _modo_completo(filas):
+    """Workbook en memoria con Font/Fill/Border celda por celda (el exportador anterior)."""
+    wb = Workbook()
+    ws = wb.active
+    ws.title = 'Detalle Ventas'
+    ws['A1'] = 'DETALLE COMPLETO DE VENTAS'
+    ws['A1'].font = Font(bold=True, size=16)
+    for col_num, columna in enumerate(COLUMNAS_VENTAS, 1):
+        celda = ws.cell(row=2, column=col_num, value=columna.titulo)
+        celda.font = Font(bold=True, color='FFFFFF')
+        celda.fill = PatternFill(start_color='4F46E5', end_color='4F46E5', fill_type='solid')
+    borde = Side(style='thin', color='CCCCCC')
+    for row_num, fila in enumerate(_filas_sinteticas(filas), 3):
+        color = 'F5F5F5' if row_num % 2 else 'FFFFFF'
+        for col_num, valor in enumerate(fila, 1):
+            celda = ws.cell(row=row_num, column=col_num, value=valor)
+            celda.fill = PatternFill(start_color=color, end_color=color, fill_type='solid')
+            celda.alignment = Alignment(horizontal='center')
+            celda.border = Border(left=borde, right=borde, top=borde, bottom=borde)
+    buffer = BytesIO()
+    wb.save(buffer)
+    return buffer.tell()
+
+
+def _modo_streaming(filas):
+    """LibroStreaming: write-only, estilos con nombre y filas desde un generador."""
+    libro = LibroStreaming()
+    libro.hoja_resumen('REPORTE DE VENTAS', 'benchmark', [('Total Ventas', filas)])
+    libro.hoja_detalle('Detalle Ventas', 'DETALLE COMPLETO DE VENTAS', COLUMNAS_VENTAS, _filas_sinteticas(filas))
+    respuesta = libro.respuesta('bench.xlsx')
+    return sum(len(bloque) for bloque in respuesta.streaming_content)
+
+
+MODOS = {
+    'completo': _modo_completo,
+    'streaming': _modo_streaming,
+}
+
+
+def _ejecutar(modo, filas, resultados):
+    base = _peak_rss_mb()
+    inicio = time.perf_counter()
+    tamanio = MODOS[modo](filas)
+    resultados.put({
+        'segundos': time.perf_counter() - inicio,
+        'pico_mb': _peak_rss_mb(),
+        'base_mb': base,
+        'tamanio_kb': tamanio / 1024,
+    })
+
+
+class Command(BaseCommand):
+    help = 'Mide tiempo y pico de memoria (RSS) de la exportación Excel completa vs streaming'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--filas',
+            type=int,
+            default=100000,
+            help='Filas del detalle (por defecto: 100000)',
+        )
+        parser.add_argument(
+            '--modo',
+            choices=sorted(MODOS),
+            action='append',
+            help='Modo a medir (repetible; por defecto ambos)',
+        )
+
+    def handle(self, *args, **options):
+        filas = options['filas']
+        # Cada modo corre en un proceso propio para que el pico de RSS no se mezcle
+        contexto = multiprocessing.get_context('fork')
+        self.stdout.write(f'Exportación Excel de {filas} filas de detalle')
+        for modo in options['modo'] or ['completo', 'streaming']:
+            resultados = contexto.Queue()
+            proceso = contexto.Process(target=_ejecutar, args=(modo, filas, resultados))
+            proceso.start()
+            resultado = resultados.get()
+            proceso.join()
+            self.stdout.write(
+                f'  {modo:<10} {resultado["segundos"]:8.2f} s   '
+                f'pico RSS {resultado["pico_mb"]:8.1f} MB (+{resultado["pico_mb"] - resultado["base_mb"]:.1f} MB)   '
+                f'archivo {resultado["tamanio_kb"]:,.0f} KB'
+            )
@@ -0,0 +1,91 @@
+import math
+
+from django.core.management.base import BaseCommand
+
+from Reportes.estadisticas import (
+    estadisticas_clientes_python, estadisticas_pedidos_python, estadisticas_personal_python,
+    estadisticas_produccion_python, estadisticas_ventas_python,
+)
+from Reportes.jobs import ejecutar_vista_reporte
+
+# tipo de reporte -> (clave del listado, cálculo anterior en Python)
+REPORTES = {
+    'ventas': ('ventas', estadisticas_ventas_python),
+    'produccion': ('ordenes', estadisticas_produccion_python),
+    'pedidos': ('pedidos', estadisticas_pedidos_python),
+    'personal': ('empleados', estadisticas_personal_python),
+    'clientes': ('clientes', estadisticas_clientes_python),
+}
+
+
+def diferencias(esperado, obtenido, ruta='estadisticas'):
+    """Lista de diferencias entre dos estructuras (orden de claves incluido)."""
+    if isinstance(esperado, float) or isinstance(obtenido, float):
+        try:
+            if math.isclose(float(esperado), float(obtenido), rel_tol=1e-9, abs_tol=1e-9):
+                return []
+        except (TypeError, ValueError):
+            pass
+        return [f'{ruta}: {esperado!r} != {obtenido!r}']
+    if isinstance(esperado, dict) and isinstance(obtenido, dict):
+        if list(esperado) != list(obtenido):
+            return [f'{ruta}: claves {list(esperado)} != {list(obtenido)}']
+        encontradas = []
+        for clave in esperado:
+            encontradas += diferencias(esperado[clave], obtenido[clave], f'{ruta}.{clave}')
+        return encontradas
+    if isinstance(esperado, (list, tuple)) and isinstance(obtenido, (list, tuple)):
+        if len(esperado) != len(obtenido):
+            return [f'{ruta}: {len(esperado)} elementos != {len(obtenido)}']
+        encontradas = []
+        for i, (a, b) in enumerate(zip(esperado, obtenido)):
+            encontradas += diferencias(a, b, f'{ruta}[{i}]')
+        return encontradas
+    if type(esperado) is not type(obtenido) or esperado != obtenido:
+        return [f'{ruta}: {esperado!r} != {obtenido!r}']
+    return []
+
+
+class Command(BaseCommand):
+    help = 'Compara las estadísticas SQL de los reportes con el cálculo anterior en Python'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fecha-inicio', help='YYYY-MM-DD')
+        parser.add_argument('--fecha-fin', help='YYYY-MM-DD')
+        parser.add_argument(
+            '--reporte',
+            choices=sorted(REPORTES),
+            action='append',
+            help='Reporte a comparar (repetible; por defecto todos)',
+        )
+
+    def handle(self, *args, **options):
+        filtros = {'fecha_inicio': options['fecha_inicio'], 'fecha_fin': options['fecha_fin']}
+        fallos = 0
+        for tipo in options['reporte'] or sorted(REPORTES):
+            clave, calculo_python = REPORTES[tipo]
+            try:
+                respuesta = ejecutar_vista_reporte(tipo, filtros, 'json')
+                if respuesta.status_code >= 400:
+                    raise RuntimeError(respuesta.data)
+                # El listado sin límite es el mismo que recorría el cálculo anterior
+                esperado = calculo_python(respuesta.data[clave])
+                encontradas = diferencias(esperado, respuesta.data['estadisticas'])
+            except Exception as e:
+                fallos += 1
+                self.stdout.write(self.style.ERROR(f'✗ {tipo}: error al comparar: {str(e)}'))
+                continue
+
+            filas = len(respuesta.data[clave])
+            if encontradas:
+                fallos += 1
+                self.stdout.write(self.style.ERROR(f'✗ {tipo} ({filas} filas): {len(encontradas)} diferencias'))
+                for diferencia in encontradas[:20]:
+                    self.stdout.write(f'    {diferencia}')
+            else:
+                self.stdout.write(self.style.SUCCESS(f'✓ {tipo} ({filas} filas): estadísticas idénticas'))
+
+        if fallos:
+            self.stdout.write(self.style.ERROR(f'✗ {fallos} reportes con diferencias'))
+        else:
+            self.stdout.write(self.style.SUCCESS('✓ Todas las estadísticas coinciden'))
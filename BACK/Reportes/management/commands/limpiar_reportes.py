@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from Reportes.cache import cache_reportes
+from Reportes.jobs import limpiar_jobs
+from Reportes.pregeneracion import limpiar_artefactos
+
+
+class Command(BaseCommand):
+    help = 'Elimina los archivos de reportes asíncronos y pregenerados vencidos, cierra los jobs colgados y recorta el caché de reportes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--cache',
+            action='store_true',
+            help='Vaciar por completo el caché de reportes en disco',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            expirados, colgados = limpiar_jobs()
+            self.stdout.write(self.style.SUCCESS(f'✓ Reportes expirados: {expirados}, jobs colgados cerrados: {colgados}'))
+            self.stdout.write(self.style.SUCCESS(f'✓ Reportes pregenerados vencidos eliminados: {limpiar_artefactos()}'))
+            if options['cache']:
+                borradas = cache_reportes.limpiar()
+                self.stdout.write(self.style.SUCCESS(f'✓ Caché de reportes vaciado ({borradas} archivos)'))
+            else:
+                cache_reportes.recortar()
+                self.stdout.write(self.style.SUCCESS(f'✓ Caché de reportes recortado ({cache_reportes.expulsadas} entradas expulsadas)'))
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f'✗ Error al limpiar reportes: {str(e)}'))
@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand
+
+from Reportes.jobs import FORMATOS
+from Reportes.pregeneracion import RANGOS, REPORTES_PREGENERACION, ejecutar_programacion
+
+
+class Command(BaseCommand):
+    help = 'Pregenera los reportes de una programación (por defecto la primera de REPORTES_PREGENERACION)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--programacion',
+            choices=[p['id'] for p in REPORTES_PREGENERACION],
+            help='Programación a ejecutar (por defecto la primera)',
+        )
+        parser.add_argument('--reporte', action='append', help='Tipo de reporte (repetible)')
+        parser.add_argument('--rango', choices=sorted(RANGOS), action='append', help='Rango de fechas (repetible)')
+        parser.add_argument('--formato', choices=sorted(FORMATOS), action='append', help='Formato (repetible)')
+
+    def handle(self, *args, **options):
+        id_programacion = options['programacion']
+        if id_programacion is None and REPORTES_PREGENERACION:
+            id_programacion = REPORTES_PREGENERACION[0]['id']
+        try:
+            resultados = ejecutar_programacion(
+                id_programacion,
+                reportes=options['reporte'],
+                rangos=options['rango'],
+                formatos=options['formato'],
+            )
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f'✗ Error al pregenerar reportes: {str(e)}'))
+            return
+
+        if resultados is None:
+            self.stdout.write(self.style.ERROR('✗ Otro proceso ya está pregenerando los reportes'))
+            return
+
+        fallos = 0
+        for tipo, rango, formato, artefacto, error in resultados:
+            if artefacto is None:
+                fallos += 1
+                self.stdout.write(self.style.ERROR(f'✗ {tipo} {rango} {formato}: {error}'))
+            else:
+                self.stdout.write(self.style.SUCCESS(
+                    f'✓ {tipo} {rango} {formato}: {artefacto.tamanio / 1024:.1f} KB en {artefacto.duracion_ms} ms'
+                ))
+        if fallos:
+            self.stdout.write(self.style.ERROR(f'✗ {fallos} de {len(resultados)} reportes con error'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'✓ {len(resultados)} reportes pregenerados'))
@@ -0,0 +1,61 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql="""
+                CREATE TABLE IF NOT EXISTS reporte_jobs (
+                    id_job uuid PRIMARY KEY,
+                    tipo character varying(50) NOT NULL,
+                    formato character varying(10) NOT NULL,
+                    filtros jsonb NOT NULL DEFAULT '{}'::jsonb,
+                    estado character varying(20) NOT NULL DEFAULT 'pendiente',
+                    progreso integer NOT NULL DEFAULT 0,
+                    mensaje text NOT NULL DEFAULT '',
+                    archivo character varying(500) NOT NULL DEFAULT '',
+                    nombre_archivo character varying(255) NOT NULL DEFAULT '',
+                    content_type character varying(150) NOT NULL DEFAULT '',
+                    tamanio bigint NOT NULL DEFAULT 0,
+                    fecha_creacion timestamp with time zone NOT NULL,
+                    fecha_inicio timestamp with time zone,
+                    fecha_fin timestamp with time zone,
+                    expira_en timestamp with time zone
+                );
+                CREATE INDEX IF NOT EXISTS reporte_jobs_estado_idx ON reporte_jobs (estado, fecha_creacion);
+            """,
+            reverse_sql="DROP TABLE IF EXISTS reporte_jobs;",
+            state_operations=[
+                migrations.CreateModel(
+                    name='ReporteJob',
+                    fields=[
+                        ('id_job', models.UUIDField(primary_key=True, serialize=False)),
+                        ('tipo', models.CharField(max_length=50)),
+                        ('formato', models.CharField(max_length=10)),
+                        ('filtros', models.JSONField(default=dict)),
+                        ('estado', models.CharField(choices=[('pendiente', 'Pendiente'), ('en_proceso', 'En proceso'), ('completado', 'Completado'), ('error', 'Error'), ('expirado', 'Expirado')], default='pendiente', max_length=20)),
+                        ('progreso', models.IntegerField(default=0)),
+                        ('mensaje', models.TextField(blank=True, default='')),
+                        ('archivo', models.CharField(blank=True, default='', max_length=500)),
+                        ('nombre_archivo', models.CharField(blank=True, default='', max_length=255)),
+                        ('content_type', models.CharField(blank=True, default='', max_length=150)),
+                        ('tamanio', models.BigIntegerField(default=0)),
+                        ('fecha_creacion', models.DateTimeField()),
+                        ('fecha_inicio', models.DateTimeField(null=True)),
+                        ('fecha_fin', models.DateTimeField(null=True)),
+                        ('expira_en', models.DateTimeField(null=True)),
+                    ],
+                    options={
+                        'db_table': 'reporte_jobs',
+                        'managed': False,
+                    },
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,62 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Reportes', '0001_reportejob'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql="""
+                CREATE TABLE IF NOT EXISTS reporte_artefactos (
+                    id bigserial PRIMARY KEY,
+                    clave character varying(64) NOT NULL UNIQUE,
+                    tipo character varying(50) NOT NULL,
+                    rango character varying(30) NOT NULL,
+                    formato character varying(10) NOT NULL,
+                    filtros jsonb NOT NULL DEFAULT '{}'::jsonb,
+                    marca jsonb NOT NULL DEFAULT '[]'::jsonb,
+                    archivo character varying(500) NOT NULL DEFAULT '',
+                    content_type character varying(150) NOT NULL DEFAULT '',
+                    content_disposition character varying(300) NOT NULL DEFAULT '',
+                    tamanio bigint NOT NULL DEFAULT 0,
+                    duracion_ms integer NOT NULL DEFAULT 0,
+                    generado_en timestamp with time zone,
+                    error text NOT NULL DEFAULT '',
+                    hits integer NOT NULL DEFAULT 0,
+                    ultimo_uso timestamp with time zone
+                );
+                CREATE INDEX IF NOT EXISTS reporte_artefactos_tipo_idx ON reporte_artefactos (tipo, rango, formato);
+            """,
+            reverse_sql="DROP TABLE IF EXISTS reporte_artefactos;",
+            state_operations=[
+                migrations.CreateModel(
+                    name='ReporteArtefacto',
+                    fields=[
+                        ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                        ('clave', models.CharField(max_length=64, unique=True)),
+                        ('tipo', models.CharField(max_length=50)),
+                        ('rango', models.CharField(max_length=30)),
+                        ('formato', models.CharField(max_length=10)),
+                        ('filtros', models.JSONField(default=dict)),
+                        ('marca', models.JSONField(default=list)),
+                        ('archivo', models.CharField(blank=True, default='', max_length=500)),
+                        ('content_type', models.CharField(blank=True, default='', max_length=150)),
+                        ('content_disposition', models.CharField(blank=True, default='', max_length=300)),
+                        ('tamanio', models.BigIntegerField(default=0)),
+                        ('duracion_ms', models.IntegerField(default=0)),
+                        ('generado_en', models.DateTimeField(null=True)),
+                        ('error', models.TextField(blank=True, default='')),
+                        ('hits', models.IntegerField(default=0)),
+                        ('ultimo_uso', models.DateTimeField(null=True)),
+                    ],
+                    options={
+                        'db_table': 'reporte_artefactos',
+                        'managed': False,
+                    },
+                ),
+            ],
+        ),
+    ]
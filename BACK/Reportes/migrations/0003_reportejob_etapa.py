@@ -0,0 +1,22 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Reportes', '0002_reporteartefacto'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql="ALTER TABLE reporte_jobs ADD COLUMN IF NOT EXISTS etapa character varying(20) NOT NULL DEFAULT '';",
+            reverse_sql="ALTER TABLE reporte_jobs DROP COLUMN IF EXISTS etapa;",
+            state_operations=[
+                migrations.AddField(
+                    model_name='reportejob',
+                    name='etapa',
+                    field=models.CharField(blank=True, default='', max_length=20),
+                ),
+            ],
+        ),
+    ]
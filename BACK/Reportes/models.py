@@ -2,3 +2,58 @@ from django.db import models
 
 # No necesitamos modelos específicos para reportes
 # Usaremos los modelos existentes de otros módulos
+
+
+class ReporteJob(models.Model):
+    """Generación asíncrona de un reporte (ver Reportes/jobs.py)"""
+    ESTADOS = [
+        ('pendiente', 'Pendiente'),
+        ('en_proceso', 'En proceso'),
+        ('completado', 'Completado'),
+        ('error', 'Error'),
+        ('expirado', 'Expirado'),
+    ]
+
+    id_job = models.UUIDField(primary_key=True)
+    tipo = models.CharField(max_length=50)
+    formato = models.CharField(max_length=10)
+    filtros = models.JSONField(default=dict)
+    estado = models.CharField(max_length=20, choices=ESTADOS, default='pendiente')
+    progreso = models.IntegerField(default=0)
+    etapa = models.CharField(max_length=20, blank=True, default='')
+    mensaje = models.TextField(blank=True, default='')
+    archivo = models.CharField(max_length=500, blank=True, default='')
+    nombre_archivo = models.CharField(max_length=255, blank=True, default='')
+    content_type = models.CharField(max_length=150, blank=True, default='')
+    tamanio = models.BigIntegerField(default=0)
+    fecha_creacion = models.DateTimeField()
+    fecha_inicio = models.DateTimeField(null=True)
+    fecha_fin = models.DateTimeField(null=True)
+    expira_en = models.DateTimeField(null=True)
+
+    class Meta:
+        db_table = 'reporte_jobs'
+        managed = False
+
+
+class ReporteArtefacto(models.Model):
+    """Reporte pregenerado por la programación nocturna (ver Reportes/pregeneracion.py)"""
+    clave = models.CharField(max_length=64, unique=True)
+    tipo = models.CharField(max_length=50)
+    rango = models.CharField(max_length=30)
+    formato = models.CharField(max_length=10)
+    filtros = models.JSONField(default=dict)
+    marca = models.JSONField(default=list)
+    archivo = models.CharField(max_length=500, blank=True, default='')
+    content_type = models.CharField(max_length=150, blank=True, default='')
+    content_disposition = models.CharField(max_length=300, blank=True, default='')
+    tamanio = models.BigIntegerField(default=0)
+    duracion_ms = models.IntegerField(default=0)
+    generado_en = models.DateTimeField(null=True)
+    error = models.TextField(blank=True, default='')
+    hits = models.IntegerField(default=0)
+    ultimo_uso = models.DateTimeField(null=True)
+
+    class Meta:
+        db_table = 'reporte_artefactos'
+        managed = False
@@ -0,0 +1,447 @@
+"""
+Motor de reportes declarativos.
+
+Cada reporte se describe con una DefinicionReporte (consulta, filtros,
+conversiones, estadísticas, columnas de detalle y el diseño: indicadores,
+gráficas y tablas del resumen) y su vista hereda de ReporteView, que
+ejecuta el mismo flujo y arma el PDF y el Excel para todos:
+
+1. filtros y `limite` desde la query string
+2. csv/jsonl: filas en streaming desde un cursor del servidor
+3. estadísticas agregadas en SQL sobre todo el rango filtrado
+4. Excel: libro write-only; el detalle se escribe desde el cursor
+5. listado en una sola consulta, convertido por columna
+6. json, o el PDF con el diseño de la definición
+
+Todo pasa por el caché de reportes en disco (cachear_reporte).
+"""
+from collections import namedtuple
+from datetime import datetime
+from importlib import import_module
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.http import HttpResponse
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from backwf import pdf
+from backwf.pdf import ColaPDFLlena, renderizar_pdf
+
+from . import progreso
+from .cache import TABLAS, cachear_reporte
+from .estadisticas import filtro_fechas
+from .excel_streaming import OPENPYXL_AVAILABLE, LibroStreaming, filas_servidor
+from .streaming import FORMATOS_STREAMING, respuesta_filas
+from .vectorizado import convertir_filas
+
+# El PDF se construye en el pool de backwf.pdf; aquí solo constantes
+try:
+    from reportlab.lib.enums import TA_CENTER
+    from reportlab.lib.units import inch
+    REPORTLAB_AVAILABLE = True
+except ImportError:
+    REPORTLAB_AVAILABLE = False
+
+# Columna del detalle: clave en el listado json, expresión SQL para el Excel
+# en streaming y Columna (título, ancho, tipo) de excel_streaming
+Campo = namedtuple('Campo', ['clave', 'expresion', 'columna'])
+
+# Tarjeta del PDF y fila del resumen Excel: estadisticas[clave], redondeado a `decimales`
+Indicador = namedtuple('Indicador', ['etiqueta', 'clave', 'decimales', 'color', 'fondo'], defaults=[None, '#4F46E5', '#EEF2FF'])
+
+# Tabla del resumen: filas(data) -> [tupla en el orden de `encabezados`]
+Tabla = namedtuple('Tabla', ['titulo', 'encabezados', 'filas', 'color'], defaults=['#4F46E5'])
+
+# Gráfica 'barras' | 'torta': valores(data) -> [(categoría, valor)]
+Grafico = namedtuple('Grafico', ['titulo', 'clase', 'valores', 'color'], defaults=['#4F46E5'])
+
+# Colores de las porciones de las tortas del PDF
+PALETA = ['#4F46E5', '#10B981', '#EF4444', '#F59E0B', '#06B6D4', '#8B5CF6', '#EC4899', '#64748B']
+
+# Largo máximo del texto de una celda en las tablas del PDF
+TEXTO_PDF = 25
+
+# tipo de reporte -> vista (se llena al declarar cada subclase de ReporteView)
+VISTAS = {}
+
+
+def vistas():
+    """tipo de reporte -> vista (mismos nombres que en Reportes/urls.py)"""
+    # Las vistas se registran solas al importar el módulo
+    import_module('Reportes.views')
+    return VISTAS
+
+
+def calcular(funcion, *args):
+    """Ejecuta una función de Reportes.estadisticas con su propio cursor"""
+    with connection.cursor() as cursor:
+        return funcion(cursor, *args)
+
+
+def conteos(clave, limite=None, ordenar=False, porcentaje=False):
+    """
+    filas(data) de una agrupación {valor: cantidad} de las estadísticas:
+    (valor, cantidad) o (valor, cantidad, %), de mayor a menor si `ordenar`.
+    """
+    def filas(data):
+        grupos = data['estadisticas'].get(clave) or {}
+        items = list(grupos.items())
+        if ordenar:
+            items.sort(key=lambda item: item[1], reverse=True)
+        total = sum(grupos.values())
+        resultado = []
+        for valor, cantidad in items[:limite]:
+            fila = ('Sin dato' if valor is None else str(valor), cantidad)
+            if porcentaje:
+                fila += (round(cantidad / total * 100, 1) if total else 0,)
+            resultado.append(fila)
+        return resultado
+    return filas
+
+
+def valor_indicador(indicador, estadisticas):
+    valor = estadisticas.get(indicador.clave) or 0
+    return valor if indicador.decimales is None else round(valor, indicador.decimales)
+
+
+def _texto(valor):
+    if valor is None:
+        return ''
+    if isinstance(valor, float):
+        return f'{valor:,.2f}'
+    return str(valor)[:TEXTO_PDF]
+
+
+def _estilo_tabla(color):
+    return [
+        ('BACKGROUND', (0, 0), (-1, 0), color),
+        ('TEXTCOLOR', (0, 0), (-1, 0), 'whitesmoke'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 9),
+        ('FONTSIZE', (0, 1), (-1, -1), 8),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('TOPPADDING', (0, 0), (-1, 0), 8),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), ['white', '#F9FAFB']),
+        ('GRID', (0, 0), (-1, -1), 0.5, '#D1D5DB'),
+    ]
+
+
+def _tarjetas(indicadores, estadisticas):
+    """Tarjetas de indicadores, de a 4 por fila (de a 3 si así quedan parejas)"""
+    por_fila = 3 if len(indicadores) % 4 and not len(indicadores) % 3 else 4
+    celdas = []
+    for indicador in indicadores:
+        valor = valor_indicador(indicador, estadisticas)
+        texto = f'{valor:,.{indicador.decimales}f}' if indicador.decimales is not None else str(valor)
+        celdas.append(pdf.parrafo(
+            f"<para align=center><b><font size=18 color='{indicador.color}'>{texto}</font></b>"
+            f"<br/><font size=9 color='gray'>{indicador.etiqueta}</font></para>",
+            'Normal'
+        ))
+    filas = [celdas[i:i + por_fila] for i in range(0, len(celdas), por_fila)]
+    filas[-1] += [''] * (por_fila - len(filas[-1]))
+    estilo = [
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('TOPPADDING', (0, 0), (-1, -1), 12),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
+        ('GRID', (0, 0), (-1, -1), 3, 'white'),
+    ]
+    for i, indicador in enumerate(indicadores):
+        estilo.append(('BACKGROUND', (i % por_fila, i // por_fila), (i % por_fila, i // por_fila), indicador.fondo))
+    return pdf.tabla(filas, anchos=[6.8*inch / por_fila] * por_fila, estilo=estilo)
+
+
+def _grafico_pdf(grafico, valores):
+    if grafico.clase == 'torta':
+        atributos = {
+            'x': 140,
+            'y': 15,
+            'width': 130,
+            'height': 130,
+            'data': [valor for _, valor in valores],
+            'labels': [str(categoria)[:15] for categoria, _ in valores],
+            'slices.strokeWidth': 0.5,
+        }
+        for i in range(len(valores)):
+            atributos[f'slices[{i}].fillColor'] = PALETA[i % len(PALETA)]
+        return pdf.grafico(400, 170, 'torta', atributos)
+    return pdf.grafico(450, 200, 'barras', {
+        'x': 50,
+        'y': 50,
+        'height': 130,
+        'width': 350,
+        'data': [[valor for _, valor in valores]],
+        'categoryAxis.categoryNames': [str(categoria)[:12] for categoria, _ in valores],
+        'categoryAxis.labels.boxAnchor': 'ne',
+        'categoryAxis.labels.angle': 30,
+        'categoryAxis.labels.fontSize': 7,
+        'valueAxis.valueMin': 0,
+        'bars[0].fillColor': grafico.color,
+    })
+
+
+class DefinicionReporte:
+    """
+    Descripción declarativa de un reporte. Las subclases fijan atributos;
+    los reportes que no salen de una sola consulta (inventario) reemplazan
+    datos(), consulta_streaming(), hojas() y tablas_pdf().
+    """
+    tipo = None                 # clave del reporte (caché, jobs)
+    archivo = None              # prefijo del nombre de archivo: Reporte_Ventas
+    titulo = None               # título del resumen Excel y del PDF
+    hoja_detalle = ('Detalle', 'DETALLE')
+    clave_listado = None        # clave del listado en el json
+    campos = ''                 # columnas SELECT del listado
+    origen = ''                 # FROM ... JOIN ...
+    orden = ''                  # ORDER BY
+    fechas = None               # (columna_desde, columna_hasta) para fecha_inicio/fecha_fin
+    fecha_fin_inclusiva = False  # fecha_fin cubre todo el día (columnas timestamp)
+    conversiones = {}           # columna del listado -> 'numero' | 'fecha' | 'fecha_hora'
+    estadisticas = None         # función de Reportes.estadisticas
+    limite_defecto = None
+    limite_maximo = None
+    detalle = ()                # [Campo] hoja de detalle del Excel y tabla del PDF
+    fuentes = ()                # tablas de las que depende (marca de agua del caché)
+    # Diseño del resumen (PDF y Excel)
+    indicadores = ()            # [Indicador]
+    graficos = ()               # [Grafico] en el PDF y en la hoja Gráficos del Excel
+    tablas = ()                 # [Tabla]
+    detalle_pdf = ()            # claves de `detalle` en la tabla del PDF (vacío: todas)
+    filas_pdf = 50              # filas del detalle en el PDF
+    pagina_pdf = 'letter'
+
+    def filtros(self, request):
+        if not self.fechas:
+            return {}
+        return {
+            'fecha_inicio': request.query_params.get('fecha_inicio'),
+            'fecha_fin': request.query_params.get('fecha_fin'),
+        }
+
+    def leer_limite(self, request, por_defecto):
+        """`limite` de la query string acotado a limite_maximo. Lanza ValueError."""
+        valor = request.query_params.get('limite')
+        if valor is None or valor == '':
+            return por_defecto
+        limite = max(0, int(valor))
+        if self.limite_maximo is not None:
+            limite = min(limite, self.limite_maximo)
+        return limite
+
+    def consulta(self, campos, filtros, limite=None):
+        """(query, params) con los filtros de fecha, el orden y el límite"""
+        where, params = "", []
+        if self.fechas:
+            fecha_fin = filtros.get('fecha_fin')
+            if fecha_fin and self.fecha_fin_inclusiva:
+                fecha_fin += ' 23:59:59'
+            where, params = filtro_fechas(*self.fechas, filtros.get('fecha_inicio'), fecha_fin)
+        query = f"SELECT {campos} {self.origen} WHERE 1=1 {where}"
+        if self.orden:
+            query += f" ORDER BY {self.orden}"
+        if limite is not None:
+            query += " LIMIT %s"
+            params.append(limite)
+        return query, params
+
+    def consulta_listado(self, filtros, limite=None):
+        return self.consulta(self.campos, filtros, limite)
+
+    def consulta_detalle(self, filtros, limite=None):
+        return self.consulta(', '.join(campo.expresion for campo in self.detalle), filtros, limite)
+
+    def consulta_streaming(self, request, filtros):
+        """(nombre de archivo, query, params) para csv/jsonl. Lanza ValueError."""
+        query, params = self.consulta_listado(filtros, self.leer_limite(request, None))
+        return self.archivo, query, params
+
+    def calcular_estadisticas(self, cursor, filtros):
+        if self.fechas:
+            return self.estadisticas(cursor, filtros.get('fecha_inicio'), filtros.get('fecha_fin'))
+        return self.estadisticas(cursor)
+
+    def listado(self, cursor, filtros, limite=None):
+        query, params = self.consulta_listado(filtros, limite)
+        cursor.execute(query, params)
+        nombres = [col[0] for col in cursor.description]
+        return convertir_filas(nombres, cursor.fetchall(), self.conversiones)
+
+    def datos(self, cursor, filtros, limite=None, con_listado=True):
+        """
+        Datos del reporte (el json): estadísticas agregadas en SQL sobre
+        todo el rango y el listado. El Excel pide con_listado=False porque
+        escribe el detalle desde el cursor.
+        """
+        estadisticas = self.calcular_estadisticas(cursor, filtros)
+        data = {'fecha_generacion': datetime.now().isoformat()}
+        if con_listado:
+            data[self.clave_listado] = self.listado(cursor, filtros, limite)
+        data['estadisticas'] = estadisticas
+        if self.fechas or self.limite_defecto is not None:
+            data['filtros'] = dict(filtros)
+            if self.limite_defecto is not None:
+                data['filtros']['limite'] = limite
+        return data
+
+    def hojas(self, filtros):
+        """Hojas de detalle del Excel: [(nombre, título, [Columna], query, params)]"""
+        query, params = self.consulta_detalle(filtros)
+        return [(*self.hoja_detalle, [campo.columna for campo in self.detalle], query, params)]
+
+    def tablas_pdf(self, data):
+        """Tablas del PDF después del resumen: las primeras filas_pdf filas del detalle"""
+        campos = [campo for campo in self.detalle if not self.detalle_pdf or campo.clave in self.detalle_pdf]
+        if not campos:
+            return []
+        filas = [
+            tuple(fila.get(campo.clave) for campo in campos)
+            for fila in data[self.clave_listado][:self.filas_pdf]
+        ]
+        return [Tabla(self.hoja_detalle[1], [campo.columna.titulo for campo in campos], lambda data: filas)]
+
+    def nombre_archivo(self, extension, con_hora=False):
+        marca = datetime.now().strftime('%Y%m%d_%H%M%S' if con_hora else '%Y%m%d')
+        return f'{self.archivo}_{marca}.{extension}'
+
+
+class ReporteView(APIView):
+    """
+    Vista de un reporte declarativo: las subclases solo fijan `definicion`;
+    el PDF y el Excel se arman aquí con el diseño de la definición.
+    """
+    definicion = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if cls.definicion is not None:
+            desconocidas = set(cls.definicion.fuentes) - set(TABLAS)
+            if desconocidas:
+                raise ImproperlyConfigured(
+                    f'Reporte {cls.definicion.tipo}: fuentes sin entrada en Reportes.cache.TABLAS: {sorted(desconocidas)}'
+                )
+            VISTAS[cls.definicion.tipo] = cls
+
+    def get(self, request):
+        return cachear_reporte(self.definicion.tipo)(ReporteView.generar)(self, request)
+
+    def generar(self, request):
+        definicion = self.definicion
+        filtros = definicion.filtros(request)
+        formato = request.query_params.get('formato', 'json')
+
+        try:
+            # limite_defecto solo acota el json; PDF y Excel llevan todo el rango
+            por_defecto = definicion.limite_defecto if formato == 'json' else None
+            limite = definicion.leer_limite(request, por_defecto)
+        except ValueError:
+            return Response({'error': 'limite debe ser un número entero'}, status=400)
+
+        try:
+            # csv/jsonl: filas en streaming, solo se limita si se pasa `limite`
+            if formato in FORMATOS_STREAMING:
+                try:
+                    nombre, query, params = definicion.consulta_streaming(request, filtros)
+                except ValueError as e:
+                    return Response({'error': str(e)}, status=400)
+                return respuesta_filas(
+                    request, nombre, query, params,
+                    lambda: calcular(definicion.calcular_estadisticas, filtros)
+                )
+
+            with connection.cursor() as cursor:
+                data = definicion.datos(cursor, filtros, limite, con_listado=formato != 'excel')
+
+            if formato == 'pdf':
+                return self.exportar_pdf(data)
+            elif formato == 'excel':
+                return self.exportar_excel(data, filtros)
+            else:
+                return Response(data, status=status.HTTP_200_OK)
+
+        except ColaPDFLlena as e:
+            return Response({'error': str(e)}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+        except Exception as e:
+            return Response(
+                {'error': f'Error al generar reporte: {str(e)}'},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+    def exportar_excel(self, data, filtros):
+        """Excel write-only: resumen, gráficas y detalle completo desde el cursor"""
+        if not OPENPYXL_AVAILABLE:
+            return Response({'error': 'openpyxl no disponible'}, status=500)
+
+        definicion = self.definicion
+        estadisticas = data['estadisticas']
+        libro = LibroStreaming()
+        libro.hoja_resumen(
+            definicion.titulo,
+            f'Generado el: {datetime.now().strftime("%d/%m/%Y %H:%M")}',
+            [(indicador.etiqueta, valor_indicador(indicador, estadisticas)) for indicador in definicion.indicadores],
+            [(tabla.titulo, tabla.encabezados, tabla.filas(data)) for tabla in definicion.tablas],
+        )
+        graficos = [(grafico.titulo, grafico.clase, grafico.valores(data)) for grafico in definicion.graficos]
+        if any(valores for _, _, valores in graficos):
+            libro.hoja_graficos(graficos)
+        for nombre, titulo, columnas, query, params in definicion.hojas(filtros):
+            libro.hoja_detalle(nombre, titulo, columnas, filas_servidor(query, params))
+        return libro.respuesta(definicion.nombre_archivo('xlsx'))
+
+    def exportar_pdf(self, data):
+        """PDF: tarjetas de indicadores, gráficas, tablas del resumen y las primeras filas del detalle"""
+        if not REPORTLAB_AVAILABLE:
+            return Response({'error': 'ReportLab no disponible'}, status=500)
+
+        definicion = self.definicion
+        estadisticas = data['estadisticas']
+        title_style = pdf.estilo(
+            'CustomTitle', parent='Heading1', fontSize=16, spaceAfter=6,
+            textColor='#4F46E5', alignment=TA_CENTER, fontName='Helvetica-Bold'
+        )
+        subtitle_style = pdf.estilo(
+            'Subtitle', parent='Normal', fontSize=9,
+            textColor='#6B7280', alignment=TA_CENTER, spaceAfter=12
+        )
+        seccion_style = pdf.estilo('Seccion', parent='Heading2', fontSize=12, textColor='#4F46E5', spaceAfter=8)
+        footer_style = pdf.estilo('Footer', parent='Normal', fontSize=8, textColor='grey', alignment=TA_CENTER)
+
+        elements = [
+            pdf.parrafo(definicion.titulo, title_style),
+            pdf.parrafo(f"Generado el {datetime.now().strftime('%d/%m/%Y a las %H:%M')}", subtitle_style),
+        ]
+        if definicion.indicadores:
+            elements += [_tarjetas(definicion.indicadores, estadisticas), pdf.espacio(1, 0.3*inch)]
+
+        for grafico in definicion.graficos:
+            valores = grafico.valores(data)
+            if valores:
+                elements += [pdf.parrafo(grafico.titulo, seccion_style), _grafico_pdf(grafico, valores), pdf.espacio(1, 0.2*inch)]
+
+        for tabla in [*definicion.tablas, *definicion.tablas_pdf(data)]:
+            filas = tabla.filas(data)
+            if not filas:
+                continue
+            contenido = [list(tabla.encabezados)] + [[_texto(valor) for valor in fila] for fila in filas]
+            elements += [
+                pdf.parrafo(tabla.titulo, seccion_style),
+                pdf.tabla(contenido, estilo=_estilo_tabla(tabla.color), repeatRows=1),
+                pdf.espacio(1, 0.2*inch),
+            ]
+
+        elements += [
+            pdf.espacio(1, 0.2*inch),
+            pdf.parrafo(f"TextilTech © {datetime.now().year} - Reporte generado automáticamente", footer_style),
+        ]
+        progreso.etapa('render')
+        contenido = renderizar_pdf(pdf.documento(
+            elements, pagesize=definicion.pagina_pdf,
+            leftMargin=40, rightMargin=40, topMargin=0.5*inch, bottomMargin=0.5*inch
+        ))
+
+        response = HttpResponse(contenido, content_type='application/pdf')
+        response['Content-Disposition'] = f'attachment; filename="{definicion.nombre_archivo("pdf", con_hora=True)}"'
+        return response
@@ -0,0 +1,323 @@
+"""
+Pregeneración nocturna de los reportes más pedidos.
+
+Con el scheduler de BR (APScheduler) se programan corridas según
+REPORTES_PREGENERACION: cada entrada indica hora/minuto (UTC), reportes,
+rangos de fechas (ayer, mes_actual, ultimos_30_dias) y formatos. Cada
+combinación se genera con las mismas vistas de Reportes y queda como
+artefacto en disco (REPORTES_PREGENERACION_DIR), registrado en la tabla
+reporte_artefactos con su duración, tamaño y la marca de agua de los
+datos al momento de generarlo.
+
+Al llegar la petición de la mañana, cachear_reporte busca el artefacto
+con el mismo tipo, filtros y formato; si la marca de agua sigue igual
+(nadie tocó los datos) se sirve el archivo sin generar nada. Si los datos
+cambiaron, el artefacto queda "vencido" y se genera como siempre.
+
+Solo el servidor web con PROGRAMADOR_ACTIVO programa las corridas (no los
+comandos de manage.py ni los hijos de los pools de procesos); con varios
+workers cada uno la programa, pero solo la ejecuta el que toma el advisory
+lock de PostgreSQL.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from datetime import timedelta
+
+import pytz
+from apscheduler.triggers.cron import CronTrigger
+from django.conf import settings
+from django.db import close_old_connections, connection
+from django.db.models import F
+from django.http import FileResponse
+from django.utils import timezone
+
+from .cache import VERSION_CACHE, filtros_normalizados, marca_de_agua
+from .jobs import FORMATOS, _nombre_archivo, ejecutar_vista_reporte
+from .models import ReporteArtefacto
+
+REPORTES_PREGENERACION_ACTIVA = getattr(settings, 'REPORTES_PREGENERACION_ACTIVA', True)
+REPORTES_PREGENERACION_DIR = getattr(
+    settings, 'REPORTES_PREGENERACION_DIR', os.path.join(settings.BASE_DIR, 'reportes_pregenerados')
+)
+# Los artefactos más viejos que esto no se sirven y se borran en la limpieza
+REPORTES_PREGENERACION_MAX_HORAS = getattr(settings, 'REPORTES_PREGENERACION_MAX_HORAS', 26)
+REPORTES_PREGENERACION = getattr(settings, 'REPORTES_PREGENERACION', [
+    {
+        'id': 'nocturna',
+        'hora': 2,
+        'minuto': 0,
+        'reportes': ['ventas', 'produccion', 'inventario-consumo', 'pedidos'],
+        'rangos': ['ayer', 'mes_actual', 'ultimos_30_dias'],
+        'formatos': ['json', 'pdf', 'excel'],
+    },
+])
+
+# rango -> (fecha_inicio, fecha_fin) a partir del día de hoy
+RANGOS = {
+    'ayer': lambda hoy: (hoy - timedelta(days=1), hoy - timedelta(days=1)),
+    'mes_actual': lambda hoy: (hoy.replace(day=1), hoy),
+    'ultimos_30_dias': lambda hoy: (hoy - timedelta(days=29), hoy),
+}
+
+# Mismo número para todos los workers: solo uno ejecuta la corrida
+LOCK_PREGENERACION = 'reportes_pregeneracion'
+
+
+def filtros_rango(rango, hoy=None):
+    inicio, fin = RANGOS[rango](hoy or timezone.localdate())
+    return {'fecha_inicio': inicio.isoformat(), 'fecha_fin': fin.isoformat()}
+
+
+def clave_artefacto(tipo, parametros, formato):
+    """Tipo, filtros normalizados y formato (sin marca de agua: se compara aparte)"""
+    contenido = json.dumps(
+        [VERSION_CACHE, tipo, filtros_normalizados(parametros), formato],
+        separators=(',', ':'),
+    )
+    return hashlib.sha256(contenido.encode('utf-8')).hexdigest()
+
+
+def pregenerar(tipo, rango, formato, hoy=None):
+    """Genera un reporte y lo guarda como artefacto. Devuelve el ReporteArtefacto."""
+    filtros = filtros_rango(rango, hoy)
+    clave = clave_artefacto(tipo, filtros, formato)
+    # La marca se toma antes de generar: si los datos cambian mientras tanto,
+    # el artefacto ya nace vencido en lugar de servir datos mezclados
+    marca = marca_de_agua(tipo, reutilizar=False)
+    inicio = time.perf_counter()
+    try:
+        respuesta = ejecutar_vista_reporte(tipo, dict(filtros, cache='0'), formato)
+        if respuesta.status_code >= 400:
+            contenido = getattr(respuesta, 'data', None) or respuesta.content.decode('utf-8', 'ignore')
+            raise RuntimeError(str(contenido)[:1000])
+
+        content_type, extension = FORMATOS[formato]
+        os.makedirs(REPORTES_PREGENERACION_DIR, exist_ok=True)
+        ruta = os.path.join(REPORTES_PREGENERACION_DIR, f'{clave}.{extension}')
+        # Escritura atómica: una petición nunca lee un archivo a medias
+        descriptor, temporal = tempfile.mkstemp(dir=REPORTES_PREGENERACION_DIR, suffix='.tmp')
+        try:
+            with os.fdopen(descriptor, 'wb') as archivo:
+                if getattr(respuesta, 'streaming', False):
+                    for parte in respuesta.streaming_content:
+                        archivo.write(parte)
+                else:
+                    archivo.write(respuesta.content)
+            os.replace(temporal, ruta)
+        except Exception:
+            if os.path.exists(temporal):
+                os.remove(temporal)
+            raise
+    except Exception as e:
+        ReporteArtefacto.objects.update_or_create(
+            clave=clave,
+            defaults={
+                'tipo': tipo, 'rango': rango, 'formato': formato, 'filtros': filtros,
+                'error': str(e), 'duracion_ms': int((time.perf_counter() - inicio) * 1000),
+            },
+        )
+        raise
+
+    nombre = _nombre_archivo(respuesta, tipo, extension)
+    artefacto, _ = ReporteArtefacto.objects.update_or_create(
+        clave=clave,
+        defaults={
+            'tipo': tipo,
+            'rango': rango,
+            'formato': formato,
+            'filtros': filtros,
+            'marca': marca,
+            'archivo': ruta,
+            'content_type': respuesta.get('Content-Type', content_type),
+            'content_disposition': respuesta.get('Content-Disposition') or f'attachment; filename="{nombre}"',
+            'tamanio': os.path.getsize(ruta),
+            'duracion_ms': int((time.perf_counter() - inicio) * 1000),
+            'generado_en': timezone.now(),
+            'error': '',
+        },
+    )
+    return artefacto
+
+
+def ejecutar_programacion(id_programacion=None, reportes=None, rangos=None, formatos=None):
+    """
+    Corre una programación de REPORTES_PREGENERACION (o las combinaciones
+    indicadas). Devuelve [(tipo, rango, formato, artefacto o None, error)]
+    o None si otro worker ya la está ejecutando.
+    """
+    programacion = {}
+    if id_programacion is not None:
+        programacion = next((p for p in REPORTES_PREGENERACION if p['id'] == id_programacion), None)
+        if programacion is None:
+            raise ValueError(f"Programación inválida: {id_programacion}")
+    reportes = reportes or programacion.get('reportes', [])
+    rangos = rangos or programacion.get('rangos', [])
+    formatos = formatos or programacion.get('formatos', [])
+
+    close_old_connections()
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_try_advisory_lock(hashtext(%s))", [LOCK_PREGENERACION])
+            if not cursor.fetchone()[0]:
+                print("Pregeneración de reportes: otro worker ya la está ejecutando")
+                return None
+        try:
+            hoy = timezone.localdate()
+            resultados = []
+            inicio = time.perf_counter()
+            for tipo in reportes:
+                for rango in rangos:
+                    for formato in formatos:
+                        try:
+                            artefacto = pregenerar(tipo, rango, formato, hoy)
+                            resultados.append((tipo, rango, formato, artefacto, None))
+                        except Exception as e:
+                            print(f"Error al pregenerar reporte {tipo}/{rango}/{formato}: {str(e)}")
+                            resultados.append((tipo, rango, formato, None, str(e)))
+            limpiar_artefactos()
+            correctos = sum(1 for resultado in resultados if resultado[3] is not None)
+            print(
+                f"Pregeneración de reportes: {correctos}/{len(resultados)} artefactos "
+                f"en {time.perf_counter() - inicio:.1f} s"
+            )
+            return resultados
+        finally:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT pg_advisory_unlock(hashtext(%s))", [LOCK_PREGENERACION])
+    finally:
+        connection.close()
+
+
+def programar_pregeneracion():
+    """Registra (o reemplaza) las corridas de REPORTES_PREGENERACION en el scheduler de BR."""
+    from BR.scheduler import scheduler
+
+    ids = []
+    for programacion in REPORTES_PREGENERACION:
+        job_id = f"reportes_pregeneracion_{programacion['id']}"
+        trigger = CronTrigger(
+            day_of_week=programacion.get('dias', '*'),
+            hour=programacion.get('hora', 2),
+            minute=programacion.get('minuto', 0),
+            timezone=pytz.UTC,
+        )
+        scheduler.add_job(
+            ejecutar_programacion,
+            trigger,
+            args=[programacion['id']],
+            id=job_id,
+            replace_existing=True,
+            coalesce=True,
+            misfire_grace_time=3600,
+        )
+        ids.append(job_id)
+    return ids
+
+
+def ejecutar_ahora(id_programacion):
+    """Encola una corrida inmediata en el scheduler (no bloquea la petición)."""
+    from BR.scheduler import scheduler
+
+    job_id = f'reportes_pregeneracion_{id_programacion}_manual'
+    if not scheduler.running:
+        # Proceso sin scheduler (PROGRAMADOR_ACTIVO apagado): se corre en un hilo aparte
+        threading.Thread(target=ejecutar_programacion, args=[id_programacion], name=job_id, daemon=True).start()
+        return job_id
+    job = scheduler.add_job(
+        ejecutar_programacion,
+        args=[id_programacion],
+        id=job_id,
+        replace_existing=True,
+    )
+    return job.id
+
+
+def _vigente(artefacto, marca):
+    if artefacto.error or not artefacto.generado_en or not artefacto.archivo:
+        return False
+    if timezone.now() - artefacto.generado_en > timedelta(hours=REPORTES_PREGENERACION_MAX_HORAS):
+        return False
+    return artefacto.marca == marca
+
+
+def respuesta_pregenerada(tipo, parametros, formato):
+    """FileResponse con el artefacto vigente de (tipo, filtros, formato), o None."""
+    if not REPORTES_PREGENERACION_ACTIVA:
+        return None
+    try:
+        artefacto = ReporteArtefacto.objects.filter(clave=clave_artefacto(tipo, parametros, formato)).first()
+        if artefacto is None or not _vigente(artefacto, marca_de_agua(tipo)):
+            return None
+        archivo = open(artefacto.archivo, 'rb')
+    except Exception as e:
+        # Sin tabla, sin archivo o sin base: se genera como siempre
+        print(f"Error al buscar reporte pregenerado {tipo}: {str(e)}")
+        return None
+
+    ReporteArtefacto.objects.filter(pk=artefacto.pk).update(hits=F('hits') + 1, ultimo_uso=timezone.now())
+    respuesta = FileResponse(archivo, content_type=artefacto.content_type)
+    if artefacto.content_disposition:
+        respuesta['Content-Disposition'] = artefacto.content_disposition
+    respuesta['X-Reporte-Cache'] = 'PREGENERADO'
+    respuesta['Age'] = str(int((timezone.now() - artefacto.generado_en).total_seconds()))
+    return respuesta
+
+
+def limpiar_artefactos():
+    """Borra los artefactos (archivo y registro) más viejos que REPORTES_PREGENERACION_MAX_HORAS."""
+    limite = timezone.now() - timedelta(hours=REPORTES_PREGENERACION_MAX_HORAS)
+    viejos = ReporteArtefacto.objects.filter(generado_en__lt=limite)
+    for artefacto in viejos:
+        if artefacto.archivo and os.path.exists(artefacto.archivo):
+            try:
+                os.remove(artefacto.archivo)
+            except OSError as e:
+                print(f"No se pudo eliminar {artefacto.archivo}: {str(e)}")
+    borrados, _ = viejos.delete()
+    # Los que fallaron y nunca se generaron tampoco se conservan
+    ReporteArtefacto.objects.filter(generado_en__isnull=True).delete()
+    return borrados
+
+
+def estado_artefactos():
+    """Artefactos con edad, vigencia (marca de agua igual) y métricas de la última corrida."""
+    marcas = {}
+    ahora = timezone.now()
+    artefactos = []
+    for artefacto in ReporteArtefacto.objects.order_by('tipo', 'rango', 'formato'):
+        if artefacto.tipo not in marcas:
+            try:
+                marcas[artefacto.tipo] = marca_de_agua(artefacto.tipo)
+            except Exception as e:
+                print(f"Error al calcular la marca de agua de {artefacto.tipo}: {str(e)}")
+                marcas[artefacto.tipo] = None
+        artefactos.append({
+            'tipo': artefacto.tipo,
+            'rango': artefacto.rango,
+            'formato': artefacto.formato,
+            'filtros': artefacto.filtros,
+            'tamanio': artefacto.tamanio,
+            'duracion_ms': artefacto.duracion_ms,
+            'generado_en': artefacto.generado_en,
+            'edad_segundos': int((ahora - artefacto.generado_en).total_seconds()) if artefacto.generado_en else None,
+            'vigente': _vigente(artefacto, marcas[artefacto.tipo]),
+            'hits': artefacto.hits,
+            'ultimo_uso': artefacto.ultimo_uso,
+            'error': artefacto.error,
+        })
+    return artefactos
+
+
+def programaciones():
+    """Programaciones configuradas con su próxima ejecución en el scheduler."""
+    from BR.scheduler import scheduler
+
+    resultado = []
+    for programacion in REPORTES_PREGENERACION:
+        job = scheduler.get_job(f"reportes_pregeneracion_{programacion['id']}")
+        resultado.append(dict(programacion, proxima_ejecucion=str(job.next_run_time) if job else None))
+    return resultado
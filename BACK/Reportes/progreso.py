@@ -0,0 +1,25 @@
+"""
+Avance de un reporte que se genera en un job (Reportes/jobs.py).
+
+El motor informa la etapa y los cursores del lado del servidor las filas
+que van leyendo; el proceso hijo del job instala un observador que lo
+convierte en progreso. Fuera de un job no hay observador y las llamadas
+no hacen nada.
+"""
+_observador = None
+
+
+def observar(funcion):
+    """Instala el observador del proceso (None lo quita)"""
+    global _observador
+    _observador = funcion
+
+
+def etapa(nombre):
+    if _observador is not None:
+        _observador(etapa=nombre)
+
+
+def filas(cantidad):
+    if _observador is not None:
+        _observador(filas=cantidad)
@@ -0,0 +1,153 @@
+"""
+Formatos csv y jsonl para los reportes (formato=csv|jsonl).
+
+Pensados para pipelines de datos y rangos de fechas grandes: las filas
+salen de un cursor con nombre (del lado del servidor) y pasan por un
+generador a un StreamingHttpResponse, así la memoria no crece con el
+reporte. Con gzip=1 la respuesta va comprimida (Content-Encoding: gzip).
+
+Al final del stream va un registro de estadísticas:
+- jsonl: {"tipo": "estadisticas", "filas": N, "segundos": ..., "estadisticas": {...}}
+- csv:   una última fila "#estadisticas" con el mismo objeto en JSON
+Si falla a mitad del stream se emite un registro "error" en su lugar, así
+quien consume sabe que el archivo quedó incompleto.
+"""
+import csv
+import datetime
+import json
+import time
+import zlib
+from decimal import Decimal
+
+from django.db import connection, transaction
+from django.http import StreamingHttpResponse
+
+from . import progreso
+
+FORMATOS_STREAMING = {
+    'csv': ('text/csv; charset=utf-8', 'csv'),
+    'jsonl': ('application/x-ndjson; charset=utf-8', 'jsonl'),
+}
+
+TAMANIO_LOTE_CURSOR = 2000
+# Las líneas se juntan en bloques de este tamaño antes de enviarlas
+TAMANIO_BLOQUE = 64 * 1024
+
+
+def _json_default(valor):
+    if isinstance(valor, Decimal):
+        return float(valor)
+    if isinstance(valor, (datetime.date, datetime.datetime, datetime.time)):
+        return valor.isoformat()
+    return str(valor)
+
+
+def _a_json(valor):
+    return json.dumps(valor, default=_json_default, ensure_ascii=False)
+
+
+def cursor_servidor(query, params, tamanio_lote=TAMANIO_LOTE_CURSOR):
+    """
+    Genera primero la tupla de nombres de columna y luego las filas, leídas
+    por lotes desde un cursor con nombre.
+    """
+    with transaction.atomic():
+        cursor = connection.chunked_cursor()
+        try:
+            cursor.execute(query, params)
+            lote = cursor.fetchmany(tamanio_lote)
+            # En un cursor con nombre la descripción está disponible tras el primer fetch
+            yield tuple(col[0] for col in cursor.description)
+            while lote:
+                progreso.filas(len(lote))
+                yield from lote
+                lote = cursor.fetchmany(tamanio_lote)
+        finally:
+            cursor.close()
+
+
+class _Linea:
+    """Destino de csv.writer que devuelve la línea en vez de escribirla."""
+
+    def write(self, valor):
+        return valor
+
+
+def _lineas_csv(registros, resumen):
+    escritor = csv.writer(_Linea())
+    yield escritor.writerow(next(registros))
+    for fila in registros:
+        resumen['filas'] += 1
+        yield escritor.writerow(fila)
+
+
+def _lineas_jsonl(registros, resumen):
+    columnas = next(registros)
+    for fila in registros:
+        resumen['filas'] += 1
+        yield _a_json(dict(zip(columnas, fila))) + '\n'
+
+
+def _con_cierre(lineas, formato, resumen, estadisticas):
+    inicio = time.perf_counter()
+    try:
+        yield from lineas
+        registro = {'tipo': 'estadisticas', **resumen}
+        registro['segundos'] = round(time.perf_counter() - inicio, 3)
+        registro['estadisticas'] = estadisticas() if callable(estadisticas) else estadisticas
+    except Exception as e:
+        print(f"Error en stream de reporte: {str(e)}")
+        registro = {'tipo': 'error', 'error': str(e), **resumen}
+    if formato == 'csv':
+        yield csv.writer(_Linea()).writerow([f"#{registro['tipo']}", _a_json(registro)])
+    else:
+        yield _a_json(registro) + '\n'
+
+
+def _codificar(partes):
+    bloque = []
+    tamanio = 0
+    for parte in partes:
+        bloque.append(parte)
+        tamanio += len(parte)
+        if tamanio >= TAMANIO_BLOQUE:
+            yield ''.join(bloque).encode('utf-8')
+            bloque = []
+            tamanio = 0
+    if bloque:
+        yield ''.join(bloque).encode('utf-8')
+
+
+def _comprimir(partes):
+    # wbits=31: cabecera y cola gzip (no zlib crudo)
+    compresor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for parte in partes:
+        comprimido = compresor.compress(parte)
+        if comprimido:
+            yield comprimido
+    yield compresor.flush()
+
+
+def respuesta_filas(request, nombre, query, params, estadisticas=None):
+    """
+    StreamingHttpResponse csv/jsonl con las filas de `query`.
+    `estadisticas` es un dict o un callable que se evalúa al final del stream.
+    """
+    formato = request.query_params.get('formato')
+    content_type, extension = FORMATOS_STREAMING[formato]
+    resumen = {'filas': 0}
+    registros = cursor_servidor(query, params)
+    lineas = _lineas_csv(registros, resumen) if formato == 'csv' else _lineas_jsonl(registros, resumen)
+    contenido = _codificar(_con_cierre(lineas, formato, resumen, estadisticas))
+
+    comprimir = request.query_params.get('gzip') in ('1', 'true', 'si')
+    if comprimir:
+        contenido = _comprimir(contenido)
+
+    response = StreamingHttpResponse(contenido, content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{nombre}_{datetime.datetime.now():%Y%m%d}.{extension}"'
+    if comprimir:
+        response['Content-Encoding'] = 'gzip'
+    # Que ningún proxy intermedio acumule el stream completo
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -1,3 +1,193 @@
+from datetime import date, timedelta
+
+from django.db import connection
 from django.test import TestCase
 
-# Create your tests here.
+from Reportes.definiciones import (
+    ReporteClientes, ReportePedidos, ReportePersonal, ReporteProduccion, ReporteVentas,
+)
+from Reportes.management.commands.comparar_estadisticas_reportes import REPORTES, diferencias
+
+# Las tablas del negocio no las crean las migraciones (managed=False):
+# se crean aquí solo con las columnas que leen los reportes.
+TABLAS = """
+    CREATE TABLE IF NOT EXISTS personal (
+        id serial PRIMARY KEY,
+        nombre_completo character varying(100) UNIQUE NOT NULL,
+        direccion character varying(255),
+        telefono character varying(15),
+        rol character varying(100),
+        fecha_nacimiento date,
+        id_usuario integer,
+        estado character varying(20)
+    );
+    CREATE TABLE IF NOT EXISTS clientes (
+        id serial PRIMARY KEY,
+        nombre_completo character varying(100) UNIQUE NOT NULL,
+        direccion character varying(255),
+        telefono character varying(15),
+        fecha_nacimiento date,
+        id_usuario integer,
+        estado character varying(20)
+    );
+    CREATE TABLE IF NOT EXISTS lotes (
+        id_lote serial PRIMARY KEY,
+        codigo_lote character varying(100) UNIQUE,
+        fecha_recepcion date,
+        cantidad numeric(10,2),
+        estado character varying(50),
+        id_materia integer
+    );
+    CREATE TABLE IF NOT EXISTS nota_salida (
+        id_salida serial PRIMARY KEY,
+        fecha_salida date,
+        motivo text,
+        estado character varying(50),
+        id_personal integer
+    );
+    CREATE TABLE IF NOT EXISTS detalle_nota_salida (
+        id_detalle serial PRIMARY KEY,
+        id_salida integer,
+        id_lote integer,
+        nombre_materia_prima character varying(255),
+        cantidad numeric(10,2),
+        unidad_medida character varying(50)
+    );
+    CREATE TABLE IF NOT EXISTS orden_produccion (
+        id_orden serial PRIMARY KEY,
+        cod_orden character varying(100) UNIQUE,
+        fecha_inicio date,
+        fecha_fin date,
+        fecha_entrega date,
+        estado character varying(50),
+        producto_modelo character varying(255),
+        color character varying(100),
+        talla character varying(50),
+        cantidad_total integer,
+        id_personal integer
+    );
+    CREATE TABLE IF NOT EXISTS pedidos (
+        id_pedido serial PRIMARY KEY,
+        cod_pedido character varying(100) UNIQUE,
+        fecha_pedido timestamp with time zone,
+        fecha_entrega_prometida date,
+        estado character varying(50),
+        id_cliente integer,
+        total numeric(10,2) DEFAULT 0,
+        observaciones text,
+        fecha_creacion date
+    );
+"""
+
+HOY = date.today()
+
+# Roles y estados nulos, responsables inexistentes y empates de cantidad
+# en los productos (el top 5 debe cortar igual en ambos caminos)
+PERSONAL = [
+    (1, 'Ana Pérez', 'Operario', 'Activo'),
+    (2, 'Bruno Díaz', 'Supervisor', 'Inactivo'),
+    (3, 'Carla Ruiz', 'Operario', 'Activo'),
+    (4, 'Diego Soto', None, 'Activo'),
+    (5, 'Elena Vega', 'Calidad', None),
+]
+CLIENTES = [
+    (1, 'Comercial Andina', 'Activo'),
+    (2, 'Boutique Sol', 'Inactivo'),
+    (3, 'Textiles Norte', 'Activo'),
+    (4, 'Zapata Hnos.', None),
+]
+LOTES = [(1, 'L-0001'), (2, 'L-0002')]
+# (id_salida, fecha_salida, estado, id_personal, [(producto, cantidad, id_lote)])
+NOTAS = [
+    (1, date(2025, 1, 10), 'Completado', 1, [('Tela algodón', '10.50', 1)]),
+    (2, date(2025, 1, 10), 'Pendiente', 2, [('Hilo poliéster', '10.50', None)]),
+    (3, date(2025, 2, 3), 'Completado', None, [('Botones', '5.00', 2), ('Botones', '2.25', 2)]),
+    (4, date(2025, 2, 20), 'Anulado', 99, [('Cierres', '7.25', None)]),
+    (5, date(2025, 3, 1), 'Completado', 3, [('Elástico', '1.00', None)]),
+    (6, date(2025, 3, 15), 'Completado', 1, [('Etiquetas', '3.30', 1)]),
+    (7, date(2025, 4, 2), 'Pendiente', 3, [('Tela algodón', '0.75', 1)]),
+]
+# (id_orden, fecha_inicio, fecha_fin, estado, producto, cantidad_total, id_personal)
+ORDENES = [
+    (1, date(2025, 1, 5), date(2025, 1, 30), 'Completada', 'Polera básica', 120, 1),
+    (2, date(2025, 2, 1), date(2025, 2, 28), 'En Proceso', 'Polera básica', 80, 2),
+    (3, date(2025, 3, 1), HOY + timedelta(days=30), 'En Proceso', 'Buzo deportivo', 45, None),
+    (4, date(2025, 3, 10), date(2025, 3, 20), 'Pendiente', None, 10, 99),
+    (5, date(2025, 4, 1), None, 'Pendiente', 'Camisa', 0, 3),
+]
+# (id_pedido, fecha_pedido, estado, id_cliente, total)
+PEDIDOS = [
+    (1, '2025-01-08 09:30:00+00', 'Completado', 1, '1500.00'),
+    (2, '2025-02-14 16:45:00+00', 'Pendiente', 2, '320.50'),
+    (3, '2025-02-28 23:59:00+00', 'Cancelado', None, None),
+    (4, '2025-03-03 08:00:00+00', 'En Proceso', 3, '0.00'),
+    (5, '2025-04-20 12:00:00+00', 'Pendiente', 99, '75.25'),
+]
+
+FILTROS = [
+    {},
+    {'fecha_inicio': '2025-02-01', 'fecha_fin': '2025-03-31'},
+    {'fecha_inicio': '2026-01-01', 'fecha_fin': '2026-12-31'},
+]
+
+
+class EstadisticasSqlTests(TestCase):
+    """Las estadísticas con GROUPING SETS deben coincidir con el cálculo anterior en Python."""
+
+    @classmethod
+    def setUpTestData(cls):
+        with connection.cursor() as cursor:
+            cursor.execute(TABLAS)
+            cursor.executemany(
+                "INSERT INTO personal (id, nombre_completo, rol, estado) VALUES (%s, %s, %s, %s)",
+                PERSONAL
+            )
+            cursor.executemany(
+                "INSERT INTO clientes (id, nombre_completo, estado) VALUES (%s, %s, %s)",
+                CLIENTES
+            )
+            cursor.executemany("INSERT INTO lotes (id_lote, codigo_lote) VALUES (%s, %s)", LOTES)
+            for id_salida, fecha, estado, id_personal, detalles in NOTAS:
+                cursor.execute(
+                    "INSERT INTO nota_salida (id_salida, fecha_salida, motivo, estado, id_personal) "
+                    "VALUES (%s, %s, 'Producción', %s, %s)",
+                    [id_salida, fecha, estado, id_personal]
+                )
+                cursor.executemany(
+                    "INSERT INTO detalle_nota_salida (id_salida, id_lote, nombre_materia_prima, cantidad, unidad_medida) "
+                    "VALUES (%s, %s, %s, %s, 'metros')",
+                    [(id_salida, id_lote, producto, cantidad) for producto, cantidad, id_lote in detalles]
+                )
+            cursor.executemany(
+                "INSERT INTO orden_produccion (id_orden, cod_orden, fecha_inicio, fecha_fin, estado, "
+                "producto_modelo, cantidad_total, id_personal) VALUES (%s, 'OP-' || %s, %s, %s, %s, %s, %s, %s)",
+                [(o[0], o[0]) + o[1:] for o in ORDENES]
+            )
+            cursor.executemany(
+                "INSERT INTO pedidos (id_pedido, cod_pedido, fecha_pedido, estado, id_cliente, total) "
+                "VALUES (%s, 'PED-' || %s, %s, %s, %s, %s)",
+                [(p[0], p[0]) + p[1:] for p in PEDIDOS]
+            )
+
+    def comparar(self, definicion):
+        _, calculo_python = REPORTES[definicion.tipo]
+        for filtros in FILTROS if definicion.fechas else [{}]:
+            with self.subTest(reporte=definicion.tipo, filtros=filtros), connection.cursor() as cursor:
+                obtenido = definicion.calcular_estadisticas(cursor, filtros)
+                esperado = calculo_python(definicion.listado(cursor, filtros))
+                self.assertEqual(diferencias(esperado, obtenido), [])
+
+    def test_ventas(self):
+        self.comparar(ReporteVentas())
+
+    def test_produccion(self):
+        self.comparar(ReporteProduccion())
+
+    def test_pedidos(self):
+        self.comparar(ReportePedidos())
+
+    def test_personal(self):
+        self.comparar(ReportePersonal())
+
+    def test_clientes(self):
+        self.comparar(ReporteClientes())
@@ -6,7 +6,13 @@ from .views import (
     ReporteClientesView,
     ReporteBitacoraView,
     ReportePersonalView,
-    ReportePedidosView
+    ReportePedidosView,
+    ReporteJobsView,
+    ReporteJobEstadoView,
+    ReporteJobDescargaView,
+    ReporteCacheView,
+    ReportePregeneradosView,
+    ReportePdfView
 )
 
 urlpatterns = [
@@ -17,4 +23,10 @@ urlpatterns = [
     path('bitacora/', ReporteBitacoraView.as_view(), name='reporte-bitacora'),
     path('personal/', ReportePersonalView.as_view(), name='reporte-personal'),
     path('pedidos/', ReportePedidosView.as_view(), name='reporte-pedidos'),
+    path('jobs/', ReporteJobsView.as_view(), name='reporte-jobs'),
+    path('jobs/<uuid:id_job>/', ReporteJobEstadoView.as_view(), name='reporte-job-estado'),
+    path('jobs/<uuid:id_job>/descargar/', ReporteJobDescargaView.as_view(), name='reporte-job-descarga'),
+    path('cache/', ReporteCacheView.as_view(), name='reporte-cache'),
+    path('pregenerados/', ReportePregeneradosView.as_view(), name='reporte-pregenerados'),
+    path('pdf/', ReportePdfView.as_view(), name='reporte-pdf'),
 ]
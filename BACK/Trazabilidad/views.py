@@ -5,12 +5,17 @@ from django.db.models import Q
 from .models import Trazabilidad, TrazabilidadLote
 from .serializers import TrazabilidadSerializer, InsertarTrazabilidadSerializer, TrazabilidadLoteSerializer
 from personal.models import personal   # Importar modelo personal
+from backwf.loaders import obtener_loader
+from backwf.pagination import respuesta_paginada
 
 
 # 🟢 LISTAR TODAS LAS TRAZABILIDADES
 @api_view(['GET'])
 def listar_trazabilidades(request):
-    trazas = Trazabilidad.objects.all()
+    trazas = list(Trazabilidad.objects.all())
+    
+    # Resolver todo el personal de la lista con una sola consulta
+    personas = obtener_loader(request, personal).load_many(t.id_personal for t in trazas)
     
     # Enriquecer con información del personal
     trazas_data = []
@@ -29,11 +34,11 @@ def listar_trazabilidades(request):
         }
         
         # Obtener nombre del personal
-        try:
-            persona = personal.objects.get(id=traza.id_personal)
+        persona = personas.get(traza.id_personal)
+        if persona is not None:
             traza_dict['nombre_personal'] = persona.nombre_completo
             traza_dict['rol_personal'] = persona.rol
-        except personal.DoesNotExist:
+        else:
             traza_dict['nombre_personal'] = 'N/A'
             traza_dict['rol_personal'] = 'N/A'
         
@@ -162,6 +167,10 @@ def listar_trazabilidad_lotes(request):
     # Ordenar por fecha descendente (más reciente primero)
     trazas = trazas.order_by('-fecha_consumo')
     
+    paginada = respuesta_paginada(request, trazas, '-fecha_consumo', TrazabilidadLoteSerializer)
+    if paginada is not None:
+        return paginada
+    
     serializer = TrazabilidadLoteSerializer(trazas, many=True)
     return Response(serializer.data, status=status.HTTP_200_OK)
 
@@ -3,10 +3,13 @@ from rest_framework.response import Response
 from rest_framework import status
 from django.db import IntegrityError, DataError
 from django.shortcuts import get_object_or_404
-from datetime import datetime, date, time
+from datetime import datetime, date
 from .models import asistencia
 from personal.models import personal
 from turnos.models import turnos
+from backwf.loaders import obtener_loader
+from backwf.pagination import CursorInvalido, paginar_keyset, solicita_paginacion
+from dashboard.contadores import contando_asistencia
 
 @api_view(['POST'])
 def agregar_asistencia(request):
@@ -69,7 +72,8 @@ def agregar_asistencia(request):
             id_turno=id_turno
         )
         
-        nueva_asistencia.save()
+        with contando_asistencia([(id_personal, fecha)]):
+            nueva_asistencia.save()
         
         return Response({
             "message": "Asistencia registrada exitosamente.",
@@ -103,26 +107,37 @@ def agregar_asistencia(request):
 @api_view(['GET'])
 def obtener_asistencias(request):
     try:
-        # Obtener todas las asistencias
-        asistencias = asistencia.objects.all()
+        # Obtener todas las asistencias (o solo una página si se pidió cursor)
+        siguiente = None
+        if solicita_paginacion(request):
+            try:
+                asistencias, siguiente = paginar_keyset(request, asistencia.objects.all(), '-id_control')
+            except CursorInvalido as e:
+                return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        else:
+            asistencias = list(asistencia.objects.all())
+        
+        # Resolver personal y turnos de todas las filas (una consulta por tabla)
+        personas = obtener_loader(request, personal).load_many(a.id_personal for a in asistencias)
+        turnos_map = obtener_loader(request, turnos).load_many(a.id_turno for a in asistencias)
         
         # Lista para almacenar los datos formateados
         asistencias_formateadas = []
         
         for asist in asistencias:
-            try:
-                # Obtener el nombre del personal
-                personal_obj = personal.objects.get(id=asist.id_personal)
+            # Obtener el nombre del personal
+            personal_obj = personas.get(asist.id_personal)
+            if personal_obj is not None:
                 nombre_personal = personal_obj.nombre_completo
-            except personal.DoesNotExist:
+            else:
                 nombre_personal = "Personal no encontrado"
             
-            try:
-                # Obtener los datos del turno
-                turno_obj = turnos.objects.get(id=asist.id_turno)
+            # Obtener los datos del turno
+            turno_obj = turnos_map.get(asist.id_turno)
+            if turno_obj is not None:
                 # Formatear el string del turno: "Turno (HH:MM - HH:MM)"
                 turno_str = f"{turno_obj.turno} ({turno_obj.hora_entrada.strftime('%H:%M')} - {turno_obj.hora_salida.strftime('%H:%M')})"
-            except turnos.DoesNotExist:
+            else:
                 turno_str = "Turno no encontrado"
             
             # Crear el objeto formateado
@@ -139,10 +154,13 @@ def obtener_asistencias(request):
             
             asistencias_formateadas.append(asistencia_formateada)
         
-        return Response({
+        respuesta = {
             "asistencias": asistencias_formateadas,
             "total": len(asistencias_formateadas)
-        }, status=status.HTTP_200_OK)
+        }
+        if solicita_paginacion(request):
+            respuesta["next"] = siguiente
+        return Response(respuesta, status=status.HTTP_200_OK)
         
     except Exception as e:
         return Response({
@@ -155,6 +173,7 @@ def actualizar_asistencia(request, id_control):
     try:
         # Buscar la asistencia por ID
         asist = get_object_or_404(asistencia, id_control=id_control)
+        id_personal_anterior, fecha_anterior = asist.id_personal, asist.fecha
         
         # Obtener datos del request
         nombre = request.data.get('nombre')
@@ -197,8 +216,9 @@ def actualizar_asistencia(request, id_control):
                     "error": f"No se encontró un turno activo con el nombre '{turno_nombre}'."
                 }, status=status.HTTP_400_BAD_REQUEST)
         
-        # Guardar cambios
-        asist.save()
+        # Guardar cambios (la asistencia del día cuenta personal distinto por fecha)
+        with contando_asistencia([(id_personal_anterior, fecha_anterior), (asist.id_personal, asist.fecha)]):
+            asist.save()
         
         return Response({
             "message": "Asistencia actualizada exitosamente.",
@@ -227,7 +247,8 @@ def eliminar_asistencia(request, id_control):
         }
         
         # Eliminar la asistencia
-        asist.delete()
+        with contando_asistencia([(asist.id_personal, asist.fecha)]):
+            asist.delete()
         
         return Response({
             "message": "Asistencia eliminada exitosamente.",
@@ -13,4 +13,49 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backwf.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Bajo ASGI, Django 5.2 arma en memoria las respuestas de streaming con
+# iteradores síncronos (csv/jsonl y Excel de Reportes, FileResponse) antes
+# de enviar el primer byte. Por eso el tráfico normal sigue en el servidor
+# WSGI y el servicio ASGI (eventos_application) solo atiende el canal SSE.
+PREFIJO_EVENTOS = '/api/dashboard/eventos/'
+
+
+async def _ciclo_de_vida(receive, send):
+    """Lifespan del servidor ASGI: al apagar cierra el oyente y los streams SSE"""
+    while True:
+        mensaje = await receive()
+        if mensaje['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif mensaje['type'] == 'lifespan.shutdown':
+            from dashboard.eventos import detener_oyente
+            detener_oyente()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def application(scope, receive, send):
+    """Django completo con el ciclo de vida (lifespan) del servidor ASGI"""
+    if scope['type'] == 'lifespan':
+        return await _ciclo_de_vida(receive, send)
+    return await django_application(scope, receive, send)
+
+
+async def eventos_application(scope, receive, send):
+    """
+    Solo el canal SSE del dashboard; cualquier otra ruta responde 404.
+    Ejemplo: uvicorn backwf.asgi:eventos_application --host 0.0.0.0 --port 8001
+    """
+    if scope['type'] == 'http' and not scope['path'].startswith(PREFIJO_EVENTOS):
+        await send({
+            'type': 'http.response.start',
+            'status': 404,
+            'headers': [(b'content-type', b'application/json')],
+        })
+        await send({
+            'type': 'http.response.body',
+            'body': b'{"error": "Este servicio solo atiende /api/dashboard/eventos/"}',
+        })
+        return
+    return await application(scope, receive, send)
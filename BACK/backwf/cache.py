@@ -0,0 +1,101 @@
+"""
+Caché en memoria con expiración (TTL) para datos calientes del proceso.
+
+No reemplaza a un caché compartido: cada worker tiene el suyo, por lo que
+los TTL deben ser cortos y las escrituras conocidas deben invalidar
+explícitamente. ``get_or_compute`` evita que varias peticiones
+concurrentes recalculen la misma clave a la vez (single-flight).
+"""
+import threading
+import time
+from collections import OrderedDict
+
+_SIN_VALOR = object()
+
+
+class TTLCache:
+    """Caché LRU acotado, seguro entre hilos, con TTL por entrada."""
+
+    def __init__(self, ttl=60, maxsize=1024):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._datos = OrderedDict()
+        self._lock = threading.Lock()
+        self._en_curso = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, clave, default=None):
+        with self._lock:
+            entrada = self._datos.get(clave, _SIN_VALOR)
+            if entrada is not _SIN_VALOR:
+                expira, valor = entrada
+                if expira > time.monotonic():
+                    self._datos.move_to_end(clave)
+                    self.hits += 1
+                    return valor
+                del self._datos[clave]
+            self.misses += 1
+            return default
+
+    def set(self, clave, valor, ttl=None):
+        expira = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._datos[clave] = (expira, valor)
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.maxsize:
+                self._datos.popitem(last=False)
+
+    def delete(self, clave):
+        with self._lock:
+            self._datos.pop(clave, None)
+
+    def clear(self):
+        with self._lock:
+            self._datos.clear()
+
+    def get_or_compute(self, clave, funcion, ttl=None):
+        """
+        Devuelve el valor cacheado o lo calcula con ``funcion()``.
+        Si otro hilo ya está calculando la misma clave, espera su resultado.
+        Las excepciones no se cachean.
+        """
+        valor = self.get(clave, _SIN_VALOR)
+        if valor is not _SIN_VALOR:
+            return valor
+
+        with self._lock:
+            evento = self._en_curso.get(clave)
+            lider = evento is None
+            if lider:
+                evento = threading.Event()
+                self._en_curso[clave] = evento
+
+        if not lider:
+            evento.wait()
+            valor = self.get(clave, _SIN_VALOR)
+            if valor is not _SIN_VALOR:
+                return valor
+            # El cálculo del líder falló o expiró: se calcula sin coordinar
+            return funcion()
+
+        try:
+            valor = funcion()
+            self.set(clave, valor, ttl)
+            return valor
+        finally:
+            with self._lock:
+                self._en_curso.pop(clave, None)
+            evento.set()
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / total, 4) if total else 0.0,
+                'size': len(self._datos),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+            }
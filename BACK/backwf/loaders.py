@@ -0,0 +1,76 @@
+"""
+Carga por lotes (estilo dataloader) con mapa de identidad por petición.
+
+Las vistas de listado resolvían el personal/turno de cada fila con un
+``objects.get(...)`` individual (N+1 consultas). Un ``BatchLoader`` junta
+todas las claves pendientes y las resuelve con un único ``IN (...)`` por
+tabla; los objetos ya cargados se reutilizan durante toda la petición.
+
+Uso típico en una vista:
+
+    loader = obtener_loader(request, personal)
+    personas = loader.load_many(n.id_personal for n in notas)
+"""
+
+
+class BatchLoader:
+    """Mapa de identidad que resuelve claves de un modelo en lote."""
+
+    def __init__(self, modelo, campo='id'):
+        self.modelo = modelo
+        self.campo = campo
+        self._cache = {}
+        self._pendientes = set()
+
+    def prime(self, claves):
+        """Registra claves para resolverlas en la próxima consulta."""
+        for clave in claves:
+            if clave is not None and clave not in self._cache:
+                self._pendientes.add(clave)
+
+    def _despachar(self):
+        if not self._pendientes:
+            return
+        claves = self._pendientes
+        self._pendientes = set()
+        filtro = {f'{self.campo}__in': claves}
+        encontrados = {
+            getattr(obj, self.campo): obj
+            for obj in self.modelo.objects.filter(**filtro)
+        }
+        for clave in claves:
+            # Se guarda también None para no volver a consultar claves inexistentes
+            self._cache[clave] = encontrados.get(clave)
+
+    def load(self, clave):
+        """Devuelve el objeto de la clave (o None si no existe)."""
+        if clave is None:
+            return None
+        if clave not in self._cache:
+            self._pendientes.add(clave)
+            self._despachar()
+        return self._cache.get(clave)
+
+    def load_many(self, claves):
+        """Resuelve todas las claves con una sola consulta y devuelve un dict."""
+        claves = list(claves)
+        self.prime(claves)
+        self._despachar()
+        return {clave: self._cache.get(clave) for clave in claves}
+
+
+def obtener_loader(request, modelo, campo='id'):
+    """
+    Obtiene (o crea) el loader del modelo asociado a la petición actual.
+    Se guarda en el HttpRequest subyacente para que la vista DRF, los
+    serializers y el middleware compartan el mismo mapa de identidad.
+    """
+    base = getattr(request, '_request', request)
+    loaders = getattr(base, '_batch_loaders', None)
+    if loaders is None:
+        loaders = {}
+        base._batch_loaders = loaders
+    clave = (modelo, campo)
+    if clave not in loaders:
+        loaders[clave] = BatchLoader(modelo, campo)
+    return loaders[clave]
@@ -0,0 +1,147 @@
+"""
+Paginación por cursor (keyset) para los endpoints de listado.
+
+Es opcional: solo se activa cuando el cliente envía ``cursor`` o
+``page_size`` en la query string; sin ellos los endpoints siguen
+devolviendo la lista completa como siempre.
+
+En lugar de OFFSET se filtra a partir de la última fila entregada
+(``campo < valor OR (campo = valor AND pk < pk)``), por lo que el costo
+de cada página no crece con el historial. El cursor es opaco para el
+cliente (base64 de ``[valor_orden, pk]``). Las fechas van con
+microsegundos: con milisegundos (DjangoJSONEncoder) se saltarían o
+repetirían filas del mismo milisegundo. Si el campo de orden admite NULL,
+esas filas van al final (NULLS LAST) y se recorren por pk; en campos NOT
+NULL se mantiene el orden simple, que aprovecha el índice del campo.
+
+Respuesta paginada: ``{"results": [...], "next": "<cursor>" | null}``
+"""
+import base64
+import datetime
+import json
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F, Q
+from rest_framework import status
+from rest_framework.response import Response
+
+PAGE_SIZE_DEFECTO = getattr(settings, 'KEYSET_PAGE_SIZE', 50)
+PAGE_SIZE_MAXIMO = getattr(settings, 'KEYSET_MAX_PAGE_SIZE', 500)
+
+
+class CursorInvalido(ValueError):
+    pass
+
+
+def solicita_paginacion(request):
+    """True si el cliente pidió paginación por cursor."""
+    return 'cursor' in request.GET or 'page_size' in request.GET
+
+
+class _CursorEncoder(DjangoJSONEncoder):
+    """DjangoJSONEncoder recorta fechas y horas a milisegundos; el cursor necesita el valor exacto"""
+
+    def default(self, o):
+        if isinstance(o, (datetime.datetime, datetime.time)):
+            return o.isoformat()
+        return super().default(o)
+
+
+def _codificar_cursor(valores):
+    crudo = json.dumps(valores, cls=_CursorEncoder).encode()
+    return base64.urlsafe_b64encode(crudo).decode().rstrip('=')
+
+
+def _decodificar_cursor(cursor):
+    try:
+        relleno = '=' * (-len(cursor) % 4)
+        valores = json.loads(base64.urlsafe_b64decode(cursor + relleno))
+    except (ValueError, TypeError):
+        raise CursorInvalido('Cursor inválido')
+    if not isinstance(valores, list) or len(valores) != 2:
+        raise CursorInvalido('Cursor inválido')
+    return valores
+
+
+def _page_size(request):
+    try:
+        tamanio = int(request.GET.get('page_size', PAGE_SIZE_DEFECTO))
+    except (TypeError, ValueError):
+        raise CursorInvalido('page_size debe ser un número entero')
+    return max(1, min(tamanio, PAGE_SIZE_MAXIMO))
+
+
+def paginar_keyset(request, queryset, orden):
+    """
+    Aplica la paginación por cursor a ``queryset``.
+
+    ``orden`` es el campo natural de la tabla con la notación de Django
+    (``'-fecha_hora'`` descendente, ``'id'`` ascendente). La clave primaria
+    se agrega como desempate para que el orden sea total.
+
+    Devuelve ``(filas, siguiente_cursor)``; lanza ``CursorInvalido``.
+    """
+    descendente = orden.startswith('-')
+    campo = orden.lstrip('-')
+    opciones = queryset.model._meta
+    pk = opciones.pk.name
+    tamanio = _page_size(request)
+
+    anulable = campo != pk and opciones.get_field(campo).null
+    if campo == pk:
+        queryset = queryset.order_by(orden)
+    elif anulable:
+        # NULLS LAST también en descendente (Postgres los pone primero por defecto)
+        expresion = F(campo).desc(nulls_last=True) if descendente else F(campo).asc(nulls_last=True)
+        queryset = queryset.order_by(expresion, f'-{pk}' if descendente else pk)
+    else:
+        queryset = queryset.order_by(orden, f'-{pk}' if descendente else pk)
+
+    cursor = request.GET.get('cursor')
+    if cursor:
+        valor, ultimo_pk = _decodificar_cursor(cursor)
+        try:
+            ultimo_pk = opciones.pk.to_python(ultimo_pk)
+            if valor is not None:
+                valor = opciones.get_field(campo).to_python(valor)
+        except ValidationError:
+            raise CursorInvalido('Cursor inválido')
+        if valor is None and campo != pk and not anulable:
+            raise CursorInvalido('Cursor inválido')
+        op = 'lt' if descendente else 'gt'
+        if campo == pk:
+            queryset = queryset.filter(**{f'{pk}__{op}': ultimo_pk})
+        elif valor is None:
+            # Ya en el tramo final de filas sin valor: solo desempata la pk
+            queryset = queryset.filter(**{f'{campo}__isnull': True, f'{pk}__{op}': ultimo_pk})
+        else:
+            condicion = Q(**{f'{campo}__{op}': valor}) | Q(**{campo: valor, f'{pk}__{op}': ultimo_pk})
+            if anulable:
+                condicion |= Q(**{f'{campo}__isnull': True})
+            queryset = queryset.filter(condicion)
+
+    # Se pide una fila extra para saber si existe página siguiente
+    filas = list(queryset[:tamanio + 1])
+    siguiente = None
+    if len(filas) > tamanio:
+        filas = filas[:tamanio]
+        ultima = filas[-1]
+        siguiente = _codificar_cursor([getattr(ultima, campo), getattr(ultima, pk)])
+    return filas, siguiente
+
+
+def respuesta_paginada(request, queryset, orden, serializer_class, **kwargs):
+    """
+    Atajo para vistas de listado con serializer: devuelve la ``Response``
+    paginada, o ``None`` si el cliente no pidió paginación.
+    """
+    if not solicita_paginacion(request):
+        return None
+    try:
+        filas, siguiente = paginar_keyset(request, queryset, orden)
+    except CursorInvalido as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    serializer = serializer_class(filas, many=True, **kwargs)
+    return Response({'results': serializer.data, 'next': siguiente}, status=status.HTTP_200_OK)
@@ -0,0 +1,322 @@
+"""
+Generación de PDF con ReportLab en un pool de procesos.
+
+SimpleDocTemplate.build es Python puro y usa la CPU con el GIL tomado:
+dentro del hilo de la petición frena al resto de peticiones del worker.
+Las vistas arman ahora una especificación serializable del documento
+(párrafos, tablas, gráficas con sus datos) con las funciones de este
+módulo y renderizar_pdf la construye en un proceso hijo, que devuelve
+los bytes.
+
+- El pool (PDF_PROCESOS) acota cuántos PDF se construyen a la vez y las
+  peticiones en espera se acotan con PDF_MAX_PENDIENTES; pasado
+  PDF_ESPERA_MAX segundos sin lugar se lanza ColaPDFLlena.
+- metricas_pdf() informa tiempo en cola, tiempo de render y totales.
+- Con PDF_PROCESOS = 0 se construye en el mismo hilo (desarrollo).
+
+La especificación solo lleva tipos básicos: los colores van como '#RRGGBB'
+o como nombre de reportlab.lib.colors ('whitesmoke'), los estilos de
+párrafo como el nombre de un estilo de getSampleStyleSheet o un dict de
+estilo(), y las medidas en puntos.
+"""
+import multiprocessing
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+
+
+class ColaPDFLlena(Exception):
+    pass
+
+
+# ======= ESPECIFICACIÓN DEL DOCUMENTO =======
+
+def documento(elementos, pagesize='letter', **opciones):
+    """Documento completo; opciones = márgenes de SimpleDocTemplate (leftMargin, topMargin...)"""
+    return {'pagesize': pagesize, 'opciones': opciones, 'elementos': list(elementos)}
+
+
+def estilo(nombre, parent='Normal', **propiedades):
+    """ParagraphStyle derivado de un estilo de getSampleStyleSheet"""
+    return {'nombre': nombre, 'parent': parent, 'propiedades': propiedades}
+
+
+def parrafo(texto, estilo='Normal'):
+    return {'tipo': 'parrafo', 'texto': texto, 'estilo': estilo}
+
+
+def espacio(ancho, alto):
+    return {'tipo': 'espacio', 'ancho': ancho, 'alto': alto}
+
+
+def salto():
+    return {'tipo': 'salto'}
+
+
+def tabla(filas, anchos=None, estilo=(), **opciones):
+    """
+    Tabla; las celdas son texto o parrafo(). estilo = comandos de TableStyle
+    con colores como texto; opciones = argumentos de Table (repeatRows...).
+    """
+    return {'tipo': 'tabla', 'filas': filas, 'anchos': anchos, 'estilo': list(estilo), 'opciones': opciones}
+
+
+def grafico(ancho, alto, clase, atributos):
+    """
+    Gráfica de reportlab.graphics: clase 'barras' (VerticalBarChart),
+    'torta' (Pie) o 'lineas' (HorizontalLineChart). atributos =
+    {ruta: valor} como se asignarían sobre el objeto, p. ej.
+    {'x': 50, 'categoryAxis.labels.angle': 45, 'bars[0].fillColor': '#4F46E5'}.
+    """
+    return {'tipo': 'grafico', 'ancho': ancho, 'alto': alto, 'clase': clase, 'atributos': atributos}
+
+
+# ======= CONSTRUCCIÓN (en el proceso hijo) =======
+
+def _color(valor):
+    from reportlab.lib import colors
+    if isinstance(valor, str):
+        if valor.startswith('#'):
+            return colors.HexColor(valor)
+        color = getattr(colors, valor, None)
+        if isinstance(color, colors.Color):
+            return color
+    return valor
+
+
+def _colores(valor):
+    if isinstance(valor, (list, tuple)):
+        return [_colores(v) for v in valor]
+    return _color(valor)
+
+
+def _estilo_parrafo(especificacion, hoja, creados):
+    from reportlab.lib.styles import ParagraphStyle
+    if isinstance(especificacion, str):
+        return hoja[especificacion]
+    nombre = especificacion['nombre']
+    if nombre not in creados:
+        propiedades = {
+            clave: _color(valor) if clave.endswith('Color') else valor
+            for clave, valor in especificacion['propiedades'].items()
+        }
+        creados[nombre] = ParagraphStyle(nombre, parent=hoja[especificacion['parent']], **propiedades)
+    return creados[nombre]
+
+
+def _asignar(objeto, ruta, valor):
+    """objeto.a.b[2].c = valor a partir de 'a.b[2].c'"""
+    partes = ruta.split('.')
+    for parte in partes[:-1]:
+        nombre, _, indice = parte.partition('[')
+        objeto = getattr(objeto, nombre)
+        if indice:
+            objeto = objeto[int(indice.rstrip(']'))]
+    setattr(objeto, partes[-1], _color(valor) if partes[-1].endswith('Color') else valor)
+
+
+def _grafico(elemento):
+    from reportlab.graphics.charts.barcharts import VerticalBarChart
+    from reportlab.graphics.charts.linecharts import HorizontalLineChart
+    from reportlab.graphics.charts.piecharts import Pie
+    from reportlab.graphics.shapes import Drawing
+
+    clases = {'barras': VerticalBarChart, 'torta': Pie, 'lineas': HorizontalLineChart}
+    grafica = clases[elemento['clase']]()
+    # data primero: bars[i] y slices[i] dependen de la cantidad de series/porciones
+    atributos = sorted(elemento['atributos'].items(), key=lambda item: item[0] != 'data')
+    for ruta, valor in atributos:
+        _asignar(grafica, ruta, valor)
+    drawing = Drawing(elemento['ancho'], elemento['alto'])
+    drawing.add(grafica)
+    return drawing
+
+
+def construir_pdf(especificacion):
+    """Bytes del PDF de una especificación de documento()"""
+    from reportlab.lib import pagesizes
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import PageBreak, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+    hoja = getSampleStyleSheet()
+    creados = {}
+
+    def flowable(elemento):
+        if not isinstance(elemento, dict):
+            return elemento
+        tipo = elemento['tipo']
+        if tipo == 'parrafo':
+            return Paragraph(elemento['texto'], _estilo_parrafo(elemento['estilo'], hoja, creados))
+        if tipo == 'espacio':
+            return Spacer(elemento['ancho'], elemento['alto'])
+        if tipo == 'salto':
+            return PageBreak()
+        if tipo == 'tabla':
+            filas = [[flowable(celda) for celda in fila] for fila in elemento['filas']]
+            resultado = Table(filas, colWidths=elemento['anchos'], **elemento['opciones'])
+            if elemento['estilo']:
+                resultado.setStyle(TableStyle([
+                    tuple(comando[:3]) + tuple(_colores(valor) for valor in comando[3:])
+                    for comando in elemento['estilo']
+                ]))
+            return resultado
+        if tipo == 'grafico':
+            return _grafico(elemento)
+        raise ValueError(f"Elemento de PDF desconocido: {tipo}")
+
+    pagesize = especificacion['pagesize']
+    if isinstance(pagesize, str):
+        pagesize = getattr(pagesizes, pagesize)
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=pagesize, **especificacion['opciones'])
+    doc.build([flowable(elemento) for elemento in especificacion['elementos']])
+    return buffer.getvalue()
+
+
+def _preparar_hijo():
+    """Importa ReportLab al iniciar cada proceso del pool y no en el primer PDF"""
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.graphics.charts import barcharts, linecharts, piecharts  # noqa: F401
+    from reportlab.platypus import SimpleDocTemplate  # noqa: F401
+    getSampleStyleSheet()
+
+
+def _construir_medido(especificacion, enviado):
+    """(bytes, segundos en cola, segundos de render) medido dentro del hijo"""
+    inicio = time.time()
+    contenido = construir_pdf(especificacion)
+    return contenido, max(0.0, inicio - enviado), time.time() - inicio
+
+
+# ======= POOL DE PROCESOS =======
+
+class ServicioPDF:
+    """Pool de procesos acotado para construir PDF, con métricas de cola y render."""
+
+    def __init__(self, procesos, max_pendientes, espera_max, muestras=500):
+        self.procesos = procesos
+        self.espera_max = espera_max
+        self._pool = None
+        self._lock = threading.Lock()
+        # Lugares en cola + en proceso: acota memoria y tiempo de espera
+        self._lugares = threading.BoundedSemaphore(procesos + max_pendientes) if procesos else None
+        self.renderizados = 0
+        self.rechazados = 0
+        self.errores = 0
+        self._cola = deque(maxlen=muestras)
+        self._render = deque(maxlen=muestras)
+
+    def _obtener_pool(self):
+        with self._lock:
+            if self._pool is None:
+                # spawn: los hijos no heredan hilos ni conexiones del worker de Django
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.procesos,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_preparar_hijo,
+                )
+            return self._pool
+
+    def _reiniciar_pool(self, pool):
+        with self._lock:
+            if self._pool is pool:
+                self._pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def _registrar(self, cola, render):
+        with self._lock:
+            self.renderizados += 1
+            self._cola.append(cola)
+            self._render.append(render)
+
+    def renderizar(self, especificacion):
+        if not self.procesos:
+            inicio = time.perf_counter()
+            contenido = construir_pdf(especificacion)
+            self._registrar(0.0, time.perf_counter() - inicio)
+            return contenido
+
+        if not self._lugares.acquire(timeout=self.espera_max):
+            with self._lock:
+                self.rechazados += 1
+            raise ColaPDFLlena('Hay demasiados PDF en cola, intente más tarde')
+        try:
+            for intento in range(2):
+                pool = self._obtener_pool()
+                try:
+                    futuro = pool.submit(_construir_medido, especificacion, time.time())
+                    contenido, cola, render = futuro.result()
+                    break
+                except BrokenProcessPool:
+                    # Un hijo murió (memoria, señal): se recrea el pool y se reintenta una vez
+                    self._reiniciar_pool(pool)
+                    if intento:
+                        raise
+            self._registrar(cola, render)
+            return contenido
+        except Exception:
+            with self._lock:
+                self.errores += 1
+            raise
+        finally:
+            self._lugares.release()
+
+    def metricas(self):
+        with self._lock:
+            cola = sorted(self._cola)
+            render = sorted(self._render)
+            datos = {
+                'procesos': self.procesos,
+                'renderizados': self.renderizados,
+                'rechazados': self.rechazados,
+                'errores': self.errores,
+            }
+
+        def percentil(valores, p):
+            return round(valores[min(len(valores) - 1, int(len(valores) * p))] * 1000, 1) if valores else 0.0
+
+        datos.update({
+            'cola_ms_p50': percentil(cola, 0.5),
+            'cola_ms_p95': percentil(cola, 0.95),
+            'cola_ms_max': round(cola[-1] * 1000, 1) if cola else 0.0,
+            'render_ms_p50': percentil(render, 0.5),
+            'render_ms_p95': percentil(render, 0.95),
+            'render_ms_max': round(render[-1] * 1000, 1) if render else 0.0,
+        })
+        return datos
+
+    def cerrar(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True)
+
+
+_servicio = None
+_servicio_lock = threading.Lock()
+
+
+def servicio_pdf():
+    """Servicio del proceso, creado con la configuración de settings al primer uso"""
+    global _servicio
+    with _servicio_lock:
+        if _servicio is None:
+            from django.conf import settings
+            _servicio = ServicioPDF(
+                procesos=getattr(settings, 'PDF_PROCESOS', 2),
+                max_pendientes=getattr(settings, 'PDF_MAX_PENDIENTES', 16),
+                espera_max=getattr(settings, 'PDF_ESPERA_MAX', 30),
+            )
+        return _servicio
+
+
+def renderizar_pdf(especificacion):
+    """Bytes del PDF construido en el pool de procesos (ver módulo)"""
+    return servicio_pdf().renderizar(especificacion)
+
+
+def metricas_pdf():
+    return servicio_pdf().metricas()
@@ -62,6 +62,7 @@ INSTALLED_APPS = [
     'Pedidos',
     'Facturas',
     'predicciones',
+    'dashboard',
 ]
 
 # Stripe Configuration
@@ -115,6 +116,10 @@ DATABASES = {
         'PASSWORD': os.getenv('DB_PASSWORD'),
         'HOST': os.getenv('DB_HOST', 'localhost'),
         'PORT': os.getenv('DB_PORT', '5432'),
+        # El esquema del negocio viene de respaldo.sql y no de las migraciones
+        # (algunas siembran datos desde esas tablas): la base de pruebas se crea
+        # sin migrar y cada test crea las tablas que usa.
+        'TEST': {'MIGRATE': False},
     }
 }
 
@@ -159,3 +164,88 @@ STATIC_URL = 'static/'
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Paginación por cursor (opcional) de los endpoints de listado
+KEYSET_PAGE_SIZE = 50
+KEYSET_MAX_PAGE_SIZE = 500
+
+# Caché del usuario autenticado (jwt_required / require_permission), en segundos
+PRINCIPAL_CACHE_TTL = 60
+
+# Caché de la matriz de permisos por ventana, en segundos
+PERMISOS_CACHE_TTL = 300
+# Cada cuántos segundos se relee la versión compartida de permisos (tabla permisos_version)
+PERMISOS_VERSION_TTL = 2
+
+# Escritor asíncrono de la bitácora (Bitacora/writer.py)
+BITACORA_ASYNC = True
+BITACORA_COLA_MAX = 10000
+BITACORA_LOTE = 200
+BITACORA_FLUSH_SEGUNDOS = 1.0
+# Tamaño máximo del body JSON que el middleware retiene para la descripción
+BITACORA_MAX_BODY = 64 * 1024
+
+# Reportes asíncronos (Reportes/jobs.py)
+REPORTES_JOBS_DIR = os.path.join(BASE_DIR, 'reportes_generados')
+REPORTES_MAX_CONCURRENCIA = 2
+REPORTES_MAX_PENDIENTES = 20
+REPORTES_JOBS_TTL_HORAS = 24
+
+# Caché en disco de reportes (Reportes/cache.py)
+REPORTES_CACHE_ACTIVO = True
+REPORTES_CACHE_DIR = os.path.join(BASE_DIR, 'reportes_cache')
+REPORTES_CACHE_MAX_MB = 200
+REPORTES_CACHE_TTL = 600
+REPORTES_CACHE_MARCA_TTL = 2
+REPORTES_CACHE_ENTRADA_MAX_MB = 20
+
+# Pregeneración nocturna de reportes (Reportes/pregeneracion.py), horas en UTC
+REPORTES_PREGENERACION_ACTIVA = True
+REPORTES_PREGENERACION_DIR = os.path.join(BASE_DIR, 'reportes_pregenerados')
+REPORTES_PREGENERACION_MAX_HORAS = 26
+REPORTES_PREGENERACION = [
+    {
+        'id': 'nocturna',
+        'hora': 2,
+        'minuto': 0,
+        'reportes': ['ventas', 'produccion', 'inventario-consumo', 'pedidos'],
+        'rangos': ['ayer', 'mes_actual', 'ultimos_30_dias'],
+        'formatos': ['json', 'pdf', 'excel'],
+    },
+]
+
+# Pool de procesos para construir PDF (backwf/pdf.py); 0 procesos = en el hilo de la petición
+PDF_PROCESOS = 2
+PDF_MAX_PENDIENTES = 16
+PDF_ESPERA_MAX = 30
+
+# Caché en disco de los PDF de facturas (Facturas/cache.py)
+FACTURAS_PDF_CACHE_ACTIVO = True
+FACTURAS_PDF_DIR = os.path.join(BASE_DIR, 'facturas_pdf')
+
+# Caché de los KPIs del dashboard en segundos (dashboard/kpis.py)
+DASHBOARD_KPIS_TTL = 5
+
+# Canal SSE del dashboard (dashboard/eventos.py); requiere servidor ASGI
+EVENTOS_ACTIVOS = True
+EVENTOS_BUFFER = 1000
+EVENTOS_MAX_COLA = 100
+EVENTOS_MAX_REENVIO = 500
+EVENTOS_HEARTBEAT = 15
+EVENTOS_RETENCION_HORAS = 24
+
+# Estimadores entrenados de predicciones (predicciones/almacen.py)
+PREDICCIONES_MODELOS_DIR = os.path.join(BASE_DIR, 'modelos_prediccion')
+PREDICCIONES_REGISTRO_MAX = 8
+PREDICCIONES_REGISTRO_TTL = 3600
+
+# Entrenamiento de modelos en segundo plano (predicciones/jobs.py)
+PREDICCIONES_MAX_ENTRENAMIENTOS = 1
+PREDICCIONES_MAX_PENDIENTES = 10
+PREDICCIONES_MAX_N_JOBS = 2
+PREDICCIONES_NICE = 10
+PREDICCIONES_JOB_TIMEOUT_MINUTOS = 60
+
+# Scheduler de BR (backups, pregeneración de reportes, limpieza de eventos):
+# solo en el proceso del servidor web que tenga PROGRAMADOR_ACTIVO=true
+PROGRAMADOR_ACTIVO = os.getenv('PROGRAMADOR_ACTIVO', 'false').lower() in ('1', 'true')
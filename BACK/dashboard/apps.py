@@ -0,0 +1,13 @@
+from django.apps import AppConfig
+
+
+class DashboardConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'dashboard'
+
+    def ready(self):
+        """Programa la limpieza de eventos_dashboard en el scheduler de BR"""
+        from BR.scheduler import programador_habilitado
+        from .eventos import EVENTOS_ACTIVOS, programar_limpieza_eventos
+        if EVENTOS_ACTIVOS and programador_habilitado():
+            programar_limpieza_eventos()
@@ -0,0 +1,153 @@
+"""
+Contadores de KPIs mantenidos en la tabla kpi_counters.
+
+El dashboard recalculaba con COUNT(*) las órdenes activas, el inventario
+crítico, el personal activo y la asistencia del día en cada lectura. Ahora
+cada escritura que puede cambiar uno de esos números ajusta su contador en
+la misma transacción y leer los KPIs es buscar unas pocas claves.
+
+    with contando('ordenes_activas', [orden.id_orden]):
+        orden.save()
+
+contando() bloquea las filas afectadas, evalúa la condición del contador
+antes y después del bloque y suma la diferencia. Para filas creadas dentro
+del bloque se agregan sus ids a la lista que devuelve (antes no existían).
+La asistencia cuenta personal distinto por día (claves 'asistencia:AAAA-MM-DD')
+y usa contando_asistencia() con pares (id_personal, fecha).
+
+El comando reconciliar_kpis recalcula todo desde cero e informa la deriva.
+"""
+from contextlib import contextmanager
+
+from django.db import connection, transaction
+
+from .eventos import emitir
+
+# clave -> (tabla, columna con la que se identifican las filas afectadas, condición)
+CONTADORES = {
+	'ordenes_activas': ('orden_produccion', 'id_orden', "estado IN ('Pendiente', 'En Proceso')"),
+	'inventario_critico': ('inventario', 'id_inventario', 'cantidad_actual <= stock_minimo'),
+	'personal_activo': ('personal', 'id_usuario', "estado = 'activo'"),
+}
+
+PREFIJO_ASISTENCIA = 'asistencia:'
+
+
+def ajustar(cursor, clave, delta):
+	if not delta:
+		return
+	cursor.execute("""
+		INSERT INTO kpi_counters (clave, valor, actualizado)
+		VALUES (%s, %s, now())
+		ON CONFLICT (clave) DO UPDATE
+			SET valor = kpi_counters.valor + EXCLUDED.valor, actualizado = now()
+		RETURNING valor
+	""", [clave, delta])
+	# Los clientes SSE del dashboard reciben el delta al confirmar la transacción
+	emitir('kpi', {'clave': clave, 'delta': delta, 'valor': cursor.fetchone()[0]})
+
+
+def _contar(cursor, clave, ids, bloquear=False):
+	tabla, columna, condicion = CONTADORES[clave]
+	ids = [valor for valor in ids if valor is not None]
+	if not ids:
+		return 0
+	cursor.execute(
+		f"SELECT ({condicion}) FROM {tabla} WHERE {columna} = ANY(%s)" + (" FOR UPDATE" if bloquear else ""),
+		[ids]
+	)
+	return sum(1 for (cumple,) in cursor.fetchall() if cumple)
+
+
+@contextmanager
+def contando(clave, ids=()):
+	"""Ajusta el contador con lo que cambien las filas ids (y las agregadas a la lista) dentro del bloque"""
+	filas = list(ids)
+	with transaction.atomic(), connection.cursor() as cursor:
+		antes = _contar(cursor, clave, filas, bloquear=True)
+		yield filas
+		ajustar(cursor, clave, _contar(cursor, clave, filas) - antes)
+
+
+def _asistencias(cursor, pares):
+	"""{fecha: personal con asistencia ese día} para los pares (id_personal, fecha)"""
+	pares = [(id_personal, str(fecha)) for id_personal, fecha in pares if id_personal is not None and fecha]
+	if not pares:
+		return {}
+	# DISTINCT después de convertir a date: '2025-03-14' y date(2025, 3, 14) son el mismo par
+	cursor.execute("""
+		SELECT p.fecha, COUNT(*) FILTER (WHERE EXISTS (
+			SELECT 1 FROM control_asistencia c WHERE c.id_personal = p.id_personal AND c.fecha = p.fecha
+		))
+		FROM (SELECT DISTINCT * FROM unnest(%s::integer[], %s::date[]) AS u(id_personal, fecha)) p
+		GROUP BY p.fecha
+	""", [[int(id_personal) for id_personal, _ in pares], [fecha for _, fecha in pares]])
+	return dict(cursor.fetchall())
+
+
+@contextmanager
+def contando_asistencia(pares=()):
+	"""Como contando() para la asistencia por día; pares = [(id_personal, fecha)]"""
+	pares = list(pares)
+	with transaction.atomic(), connection.cursor() as cursor:
+		# Dos marcaciones simultáneas de la misma persona verían "sin asistencia" las dos
+		for id_personal in sorted({int(id_personal) for id_personal, _ in pares if id_personal is not None}):
+			cursor.execute("SELECT pg_advisory_xact_lock(hashtext('kpi_asistencia'), %s)", [id_personal])
+		antes = _asistencias(cursor, pares)
+		yield pares
+		despues = _asistencias(cursor, pares)
+		for dia in set(antes) | set(despues):
+			ajustar(cursor, clave_asistencia(dia), despues.get(dia, 0) - antes.get(dia, 0))
+
+
+def leer(claves):
+	"""{clave: valor}; las claves sin fila valen 0"""
+	with connection.cursor() as cursor:
+		cursor.execute("SELECT clave, valor FROM kpi_counters WHERE clave = ANY(%s)", [list(claves)])
+		valores = dict(cursor.fetchall())
+	return {clave: valores.get(clave, 0) for clave in claves}
+
+
+def clave_asistencia(dia):
+	return f'{PREFIJO_ASISTENCIA}{dia.isoformat()}'
+
+
+def valores_reales(cursor):
+	"""{clave: valor} recalculado con COUNT(*) (solo para reconciliar)"""
+	reales = {}
+	for clave, (tabla, _, condicion) in CONTADORES.items():
+		cursor.execute(f"SELECT COUNT(*) FROM {tabla} WHERE {condicion}")
+		reales[clave] = cursor.fetchone()[0]
+	cursor.execute("""
+		SELECT fecha, COUNT(DISTINCT id_personal)
+		FROM control_asistencia
+		GROUP BY fecha
+	""")
+	for dia, cantidad in cursor.fetchall():
+		reales[clave_asistencia(dia)] = cantidad
+	return reales
+
+
+def reconciliar(corregir=True):
+	"""
+	[(clave, valor guardado, valor real)] de los contadores con deriva.
+	Con corregir=True reemplaza los valores guardados en la misma transacción.
+	"""
+	with transaction.atomic(), connection.cursor() as cursor:
+		# Las escrituras que ajustan contadores esperan a que termine
+		cursor.execute("LOCK TABLE kpi_counters IN SHARE ROW EXCLUSIVE MODE")
+		reales = valores_reales(cursor)
+		cursor.execute("SELECT clave, valor FROM kpi_counters")
+		guardados = dict(cursor.fetchall())
+		deriva = [
+			(clave, guardados.get(clave, 0), reales.get(clave, 0))
+			for clave in sorted(set(reales) | set(guardados))
+			if guardados.get(clave, 0) != reales.get(clave, 0)
+		]
+		if corregir and deriva:
+			cursor.execute("DELETE FROM kpi_counters")
+			cursor.executemany(
+				"INSERT INTO kpi_counters (clave, valor, actualizado) VALUES (%s, %s, now())",
+				[(clave, valor) for clave, valor in reales.items() if valor or clave in CONTADORES]
+			)
+	return deriva
@@ -0,0 +1,287 @@
+"""
+Canal de eventos del dashboard por Server-Sent Events (SSE).
+
+El dashboard de Angular y la app de Flutter consultaban los KPIs y las
+órdenes cada pocos segundos aunque nada hubiera cambiado. Ahora las
+escrituras llaman a emitir(tipo, datos): en la misma transacción se
+guarda el evento en eventos_dashboard y se hace pg_notify, que Postgres
+entrega al confirmar. Cada proceso tiene un único hilo (Oyente) con una
+conexión propia en LISTEN que reparte los eventos a los clientes SSE
+conectados; un cliente sin eventos no genera consultas.
+
+Tipos de evento:
+- kpi: {'clave', 'delta', 'valor'} al ajustar kpi_counters (contadores.py)
+- orden: {'id_orden', 'cod_orden', 'estado', 'accion'} al crear, editar o eliminar órdenes
+- bitacora: {'cantidad', 'registros'} por cada lote del escritor de la bitácora
+
+Cada evento lleva su id (el de eventos_dashboard). Al reconectar,
+EventSource envía Last-Event-ID y se reenvían los eventos posteriores:
+desde el buffer en memoria (EVENTOS_BUFFER) o, si no alcanza, desde la
+tabla. emitir() toma un advisory lock de transacción para que los ids se
+asignen en el mismo orden en que se confirman (y se notifican).
+
+El endpoint lo atiende el servicio ASGI de eventos
+(backwf.asgi.eventos_application, puerto 8001 en docker-compose); bajo
+WSGI responde 501, porque cada conexión ocuparía un hilo del worker
+indefinidamente. El resto de la API sigue en el servidor WSGI.
+"""
+import asyncio
+import json
+import os
+import select
+import threading
+from collections import deque
+
+import psycopg2
+import psycopg2.extensions
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+
+EVENTOS_ACTIVOS = getattr(settings, 'EVENTOS_ACTIVOS', True)
+EVENTOS_BUFFER = getattr(settings, 'EVENTOS_BUFFER', 1000)
+EVENTOS_MAX_COLA = getattr(settings, 'EVENTOS_MAX_COLA', 100)
+EVENTOS_MAX_REENVIO = getattr(settings, 'EVENTOS_MAX_REENVIO', 500)
+EVENTOS_RETENCION_HORAS = getattr(settings, 'EVENTOS_RETENCION_HORAS', 24)
+
+CANAL = 'eventos_dashboard'
+
+# pg_notify admite hasta 8000 bytes de payload: los textos libres se recortan
+MAX_TEXTO = 200
+
+
+def emitir(tipo, datos):
+	"""
+	Registra y notifica un evento dentro de la transacción actual.
+	Un error aquí no debe romper la escritura que lo origina (savepoint).
+	"""
+	if not EVENTOS_ACTIVOS:
+		return
+	try:
+		with transaction.atomic(), connection.cursor() as cursor:
+			cursor.execute("SELECT pg_advisory_xact_lock(hashtext(%s))", [CANAL])
+			cursor.execute("""
+				WITH nuevo AS (
+					INSERT INTO eventos_dashboard (tipo, datos) VALUES (%s, %s::jsonb)
+					RETURNING id, tipo, datos
+				)
+				SELECT pg_notify(%s, json_build_object('id', id, 'tipo', tipo, 'datos', datos)::text)
+				FROM nuevo
+			""", [tipo, json.dumps(datos, default=str), CANAL])
+	except Exception as e:
+		print(f"Error al emitir evento {tipo}: {e}")
+
+
+def recortar(texto):
+	texto = '' if texto is None else str(texto)
+	return texto if len(texto) <= MAX_TEXTO else texto[:MAX_TEXTO - 3] + '...'
+
+
+def eventos_guardados(ultimo_id, limite=EVENTOS_MAX_REENVIO):
+	with connection.cursor() as cursor:
+		cursor.execute("""
+			SELECT id, tipo, datos FROM eventos_dashboard
+			WHERE id > %s
+			ORDER BY id
+			LIMIT %s
+		""", [ultimo_id, limite])
+		return [
+			{'id': id_evento, 'tipo': tipo, 'datos': json.loads(datos) if isinstance(datos, str) else datos}
+			for id_evento, tipo, datos in cursor.fetchall()
+		]
+
+
+def limpiar_eventos():
+	"""Borra los eventos más viejos que EVENTOS_RETENCION_HORAS (job del scheduler)"""
+	close_old_connections()
+	try:
+		with connection.cursor() as cursor:
+			cursor.execute(
+				"DELETE FROM eventos_dashboard WHERE creado < now() - make_interval(hours => %s)",
+				[EVENTOS_RETENCION_HORAS]
+			)
+			return cursor.rowcount
+	except Exception as e:
+		print(f"Error al limpiar eventos del dashboard: {e}")
+		return 0
+	finally:
+		connection.close()
+
+
+def programar_limpieza_eventos():
+	"""Limpieza horaria de eventos_dashboard en el scheduler de BR"""
+	from apscheduler.triggers.interval import IntervalTrigger
+	from BR.scheduler import scheduler
+
+	scheduler.add_job(
+		limpiar_eventos,
+		IntervalTrigger(hours=1),
+		id='dashboard_limpiar_eventos',
+		replace_existing=True,
+		coalesce=True,
+	)
+
+
+class Suscripcion:
+	"""Cola asyncio de un cliente SSE; el hilo del oyente entrega con call_soon_threadsafe."""
+
+	def __init__(self, loop, tipos=None, maximo=EVENTOS_MAX_COLA):
+		self.loop = loop
+		self.tipos = set(tipos) if tipos else None
+		self.cola = asyncio.Queue(maxsize=maximo)
+		# Cliente que no consume a tiempo: se cierra y reconecta con Last-Event-ID
+		self.atrasada = False
+
+	def acepta(self, evento):
+		return self.tipos is None or evento['tipo'] in self.tipos
+
+	def _poner(self, evento):
+		try:
+			self.cola.put_nowait(evento)
+		except asyncio.QueueFull:
+			self.atrasada = True
+
+	def entregar(self, evento):
+		if evento is not None and not self.acepta(evento):
+			return
+		try:
+			self.loop.call_soon_threadsafe(self._poner, evento)
+		except RuntimeError:
+			pass  # el loop del cliente ya terminó
+
+
+class Oyente:
+	"""Hilo con una conexión en LISTEN que reparte los eventos a las suscripciones del proceso."""
+
+	def __init__(self, tamanio_buffer=EVENTOS_BUFFER):
+		self._buffer = deque(maxlen=tamanio_buffer)
+		self._suscripciones = set()
+		self._lock = threading.Lock()
+		self._hilo = None
+		self._pid = None
+		self._detenido = threading.Event()
+		self.ultimo_id = 0
+		self.recibidos = 0
+		self.reconexiones = 0
+		self.conectado = False
+
+	def _asegurar_hilo(self):
+		# Se arranca con el primer cliente y de nuevo tras un fork del worker
+		if self._hilo is not None and self._hilo.is_alive() and self._pid == os.getpid():
+			return
+		with self._lock:
+			if self._hilo is not None and self._hilo.is_alive() and self._pid == os.getpid():
+				return
+			self._pid = os.getpid()
+			self._detenido.clear()
+			self._hilo = threading.Thread(target=self._bucle, name='eventos-dashboard', daemon=True)
+			self._hilo.start()
+
+	def _conectar(self):
+		db = settings.DATABASES['default']
+		conexion = psycopg2.connect(
+			dbname=db['NAME'],
+			user=db['USER'],
+			password=db['PASSWORD'],
+			host=db['HOST'],
+			port=db['PORT'],
+			**db.get('OPTIONS', {})
+		)
+		conexion.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+		with conexion.cursor() as cursor:
+			cursor.execute(f"LISTEN {CANAL}")
+		return conexion
+
+	def _recuperar(self, conexion):
+		"""Eventos confirmados mientras no se escuchaba (tras una reconexión)"""
+		if not self.ultimo_id:
+			return
+		with conexion.cursor() as cursor:
+			cursor.execute(
+				"SELECT id, tipo, datos FROM eventos_dashboard WHERE id > %s ORDER BY id",
+				[self.ultimo_id]
+			)
+			for id_evento, tipo, datos in cursor.fetchall():
+				self._publicar({'id': id_evento, 'tipo': tipo, 'datos': datos})
+
+	def _bucle(self):
+		espera = 1
+		while not self._detenido.is_set():
+			try:
+				conexion = self._conectar()
+			except Exception as e:
+				print(f"Error al conectar el oyente de eventos: {e}")
+				self._detenido.wait(espera)
+				espera = min(espera * 2, 30)
+				continue
+			espera = 1
+			self.conectado = True
+			try:
+				self._recuperar(conexion)
+				while not self._detenido.is_set():
+					if not select.select([conexion], [], [], 5)[0]:
+						continue
+					conexion.poll()
+					while conexion.notifies:
+						aviso = conexion.notifies.pop(0)
+						self._publicar(json.loads(aviso.payload))
+			except Exception as e:
+				print(f"Error en el oyente de eventos: {e}")
+				self.reconexiones += 1
+			finally:
+				self.conectado = False
+				conexion.close()
+
+	def _publicar(self, evento):
+		with self._lock:
+			if evento['id'] <= self.ultimo_id:
+				return  # ya recibido (recuperación tras reconectar)
+			self.ultimo_id = evento['id']
+			self.recibidos += 1
+			self._buffer.append(evento)
+			suscripciones = list(self._suscripciones)
+		for suscripcion in suscripciones:
+			suscripcion.entregar(evento)
+
+	def suscribir(self, suscripcion):
+		self._asegurar_hilo()
+		with self._lock:
+			self._suscripciones.add(suscripcion)
+
+	def desuscribir(self, suscripcion):
+		with self._lock:
+			self._suscripciones.discard(suscripcion)
+
+	def pendientes_desde(self, ultimo_id):
+		"""Eventos posteriores a ultimo_id del buffer o None si el buffer no los cubre"""
+		with self._lock:
+			if self._buffer and self._buffer[0]['id'] <= ultimo_id + 1:
+				return [evento for evento in self._buffer if evento['id'] > ultimo_id]
+			if not self._buffer and ultimo_id >= self.ultimo_id > 0:
+				return []
+		return None
+
+	def detener(self):
+		"""Cierra la conexión LISTEN y termina los streams abiertos (apagado del servidor)"""
+		self._detenido.set()
+		with self._lock:
+			suscripciones = list(self._suscripciones)
+		for suscripcion in suscripciones:
+			suscripcion.entregar(None)
+
+	def estado(self):
+		with self._lock:
+			return {
+				'conectado': self.conectado,
+				'suscripciones': len(self._suscripciones),
+				'ultimo_id': self.ultimo_id,
+				'recibidos': self.recibidos,
+				'reconexiones': self.reconexiones,
+				'buffer': len(self._buffer),
+			}
+
+
+oyente = Oyente()
+
+
+def detener_oyente():
+	oyente.detener()
@@ -0,0 +1,131 @@
+"""
+KPIs del dashboard en una sola consulta y con caché corto en memoria.
+
+Cada dashboard abierto consulta /dashboard/estadisticas/ cada pocos
+segundos y antes eran siete consultas por petición. Ahora los KPIs (los
+contadores de kpi_counters, ver contadores.py) y las últimas 5
+actividades de la bitácora salen de una sola sentencia (CTE) y
+se guardan DASHBOARD_KPIS_TTL segundos en un TTLCache del proceso, con
+cálculo single-flight: N dashboards simultáneos cuestan una consulta por
+ventana de TTL y por worker. metricas_kpis() informa hit ratio y tiempo
+de cálculo.
+"""
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+from backwf.cache import TTLCache
+from .contadores import clave_asistencia
+
+DASHBOARD_KPIS_TTL = getattr(settings, 'DASHBOARD_KPIS_TTL', 5)
+
+_cache = TTLCache(ttl=DASHBOARD_KPIS_TTL, maxsize=4)
+
+_metricas = {'solicitudes': 0, 'calculos': 0, 'errores': 0, 'ms_total': 0.0, 'ms_ultimo': 0.0, 'ms_max': 0.0}
+_metricas_lock = threading.Lock()
+
+# Contadores de kpi_counters (dashboard/contadores.py), lectura por clave.
+# Una fila por actividad (LEFT JOIN: al menos una fila aunque la bitácora esté vacía)
+CONSULTA_KPIS = """
+	WITH kpis AS (
+		SELECT
+			(SELECT valor FROM kpi_counters WHERE clave = 'personal_activo') AS total_personal,
+			(SELECT valor FROM kpi_counters WHERE clave = %s) AS asistencia_hoy,
+			(SELECT COUNT(*) FROM usuarios WHERE estado = 'activo') AS total_usuarios,
+			(SELECT valor FROM kpi_counters WHERE clave = 'ordenes_activas') AS ordenes_activas,
+			(SELECT valor FROM kpi_counters WHERE clave = 'inventario_critico') AS inventario_critico
+	),
+	eficiencia AS (
+		SELECT
+			COUNT(*) AS total,
+			SUM(CASE WHEN estado = 'Completado' THEN 1 ELSE 0 END) AS completadas
+		FROM orden_produccion
+		WHERE fecha_inicio >= %s
+	),
+	actividad AS (
+		SELECT accion, descripcion, fecha_hora, username
+		FROM bitacora
+		ORDER BY fecha_hora DESC
+		LIMIT 5
+	)
+	SELECT
+		k.total_personal, k.asistencia_hoy, k.total_usuarios, k.ordenes_activas, k.inventario_critico,
+		e.total, e.completadas,
+		a.accion, a.descripcion, a.fecha_hora, a.username
+	FROM kpis k
+	CROSS JOIN eficiencia e
+	LEFT JOIN actividad a ON true
+	ORDER BY a.fecha_hora DESC NULLS LAST
+"""
+
+
+def _calcular(hoy):
+	inicio = time.perf_counter()
+	try:
+		ultimo_mes = timezone.now() - timedelta(days=30)
+		with connection.cursor() as cursor:
+			cursor.execute(CONSULTA_KPIS, [clave_asistencia(hoy), ultimo_mes])
+			filas = cursor.fetchall()
+	except Exception:
+		with _metricas_lock:
+			_metricas['errores'] += 1
+		raise
+	ms = (time.perf_counter() - inicio) * 1000
+	with _metricas_lock:
+		_metricas['calculos'] += 1
+		_metricas['ms_total'] += ms
+		_metricas['ms_ultimo'] = ms
+		_metricas['ms_max'] = max(_metricas['ms_max'], ms)
+
+	primera = filas[0]
+	total_ordenes = primera[5] or 0
+	ordenes_completadas = primera[6] or 0
+	kpis = {
+		'totalPersonal': primera[0] or 0,
+		'asistenciaHoy': primera[1] or 0,
+		'usuarios': primera[2] or 0,
+		'ordenes': primera[3] or 0,
+		'inventarioCritico': primera[4] or 0,
+		'eficiencia': round((ordenes_completadas / total_ordenes), 2) if total_ordenes > 0 else 0.0
+	}
+	# (accion, descripcion, fecha_hora, username); "hace" se calcula en cada respuesta
+	actividad = [fila[7:11] for fila in filas if fila[9] is not None]
+	return kpis, actividad
+
+
+def kpis_dashboard():
+	"""(kpis, últimas actividades) desde el caché o con una sola consulta"""
+	hoy = timezone.now().date()
+	with _metricas_lock:
+		_metricas['solicitudes'] += 1
+	return _cache.get_or_compute(('kpis', hoy), lambda: _calcular(hoy))
+
+
+def invalidar_kpis():
+	_cache.clear()
+
+
+def metricas_kpis():
+	"""
+	Estadísticas del caché y del cálculo. hit_ratio cuenta como miss a quien
+	esperó el cálculo de otro hilo; calculos / solicitudes es la fracción de
+	peticiones que realmente consultaron la base.
+	"""
+	estadisticas = _cache.stats()
+	with _metricas_lock:
+		solicitudes = _metricas['solicitudes']
+		calculos = _metricas['calculos']
+		estadisticas.update({
+			'solicitudes': solicitudes,
+			'calculos': calculos,
+			'consultas_por_solicitud': round(calculos / solicitudes, 4) if solicitudes else 0.0,
+			'errores': _metricas['errores'],
+			'calculo_ms_promedio': round(_metricas['ms_total'] / calculos, 2) if calculos else 0.0,
+			'calculo_ms_ultimo': round(_metricas['ms_ultimo'], 2),
+			'calculo_ms_max': round(_metricas['ms_max'], 2),
+		})
+	return estadisticas
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from dashboard.contadores import reconciliar
+
+
+class Command(BaseCommand):
+    help = 'Recalcula los contadores de kpi_counters desde las tablas e informa la deriva'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--solo-informar',
+            action='store_true',
+            help='Solo informa la deriva, sin corregir los contadores',
+        )
+
+    def handle(self, *args, **options):
+        corregir = not options['solo_informar']
+        try:
+            deriva = reconciliar(corregir=corregir)
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f'✗ Error al reconciliar los contadores: {str(e)}'))
+            return
+
+        if not deriva:
+            self.stdout.write(self.style.SUCCESS('✓ Contadores sin deriva'))
+            return
+        for clave, guardado, real in deriva:
+            self.stdout.write(self.style.ERROR(f'✗ {clave}: guardado {guardado}, real {real} ({real - guardado:+d})'))
+        if corregir:
+            self.stdout.write(self.style.SUCCESS(f'✓ {len(deriva)} contadores corregidos'))
+        else:
+            self.stdout.write(self.style.ERROR(f'✗ {len(deriva)} contadores con deriva (sin corregir)'))
@@ -0,0 +1,46 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.RunSQL(
+            sql="""
+                CREATE TABLE IF NOT EXISTS kpi_counters (
+                    clave character varying(100) PRIMARY KEY,
+                    valor bigint NOT NULL DEFAULT 0,
+                    actualizado timestamp with time zone
+                );
+                INSERT INTO kpi_counters (clave, valor, actualizado)
+                SELECT 'ordenes_activas', COUNT(*), now() FROM orden_produccion WHERE estado IN ('Pendiente', 'En Proceso')
+                UNION ALL
+                SELECT 'inventario_critico', COUNT(*), now() FROM inventario WHERE cantidad_actual <= stock_minimo
+                UNION ALL
+                SELECT 'personal_activo', COUNT(*), now() FROM personal WHERE estado = 'activo'
+                UNION ALL
+                SELECT 'asistencia:' || to_char(fecha, 'YYYY-MM-DD'), COUNT(DISTINCT id_personal), now()
+                FROM control_asistencia
+                GROUP BY fecha
+                ON CONFLICT (clave) DO NOTHING;
+            """,
+            reverse_sql="DROP TABLE IF EXISTS kpi_counters;",
+            state_operations=[
+                migrations.CreateModel(
+                    name='KpiContador',
+                    fields=[
+                        ('clave', models.CharField(max_length=100, primary_key=True, serialize=False)),
+                        ('valor', models.BigIntegerField(default=0)),
+                        ('actualizado', models.DateTimeField(null=True)),
+                    ],
+                    options={
+                        'db_table': 'kpi_counters',
+                        'managed': False,
+                    },
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,38 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dashboard', '0001_kpicontador'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql="""
+                CREATE TABLE IF NOT EXISTS eventos_dashboard (
+                    id bigserial PRIMARY KEY,
+                    tipo character varying(30) NOT NULL,
+                    datos jsonb NOT NULL DEFAULT '{}'::jsonb,
+                    creado timestamp with time zone NOT NULL DEFAULT now()
+                );
+                CREATE INDEX IF NOT EXISTS eventos_dashboard_creado_idx ON eventos_dashboard (creado);
+            """,
+            reverse_sql="DROP TABLE IF EXISTS eventos_dashboard;",
+            state_operations=[
+                migrations.CreateModel(
+                    name='Evento',
+                    fields=[
+                        ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                        ('tipo', models.CharField(max_length=30)),
+                        ('datos', models.JSONField(default=dict)),
+                        ('creado', models.DateTimeField()),
+                    ],
+                    options={
+                        'db_table': 'eventos_dashboard',
+                        'managed': False,
+                    },
+                ),
+            ],
+        ),
+    ]
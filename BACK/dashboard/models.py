@@ -0,0 +1,24 @@
+from django.db import models
+
+
+class KpiContador(models.Model):
+	"""Valor actual de un KPI (mantenido por dashboard/contadores.py)"""
+	clave = models.CharField(max_length=100, primary_key=True)
+	valor = models.BigIntegerField(default=0)
+	actualizado = models.DateTimeField(null=True)
+
+	class Meta:
+		db_table = 'kpi_counters'
+		managed = False
+
+
+class Evento(models.Model):
+	"""Evento enviado por SSE a los dashboards (dashboard/eventos.py)"""
+	id = models.BigAutoField(primary_key=True)
+	tipo = models.CharField(max_length=30)
+	datos = models.JSONField(default=dict)
+	creado = models.DateTimeField()
+
+	class Meta:
+		db_table = 'eventos_dashboard'
+		managed = False
@@ -3,6 +3,9 @@ from . import views
 
 urlpatterns = [
     path('estadisticas/', views.obtener_estadisticas_dashboard, name='dashboard-estadisticas'),
+    path('estadisticas/metricas/', views.obtener_metricas_kpis, name='dashboard-estadisticas-metricas'),
     path('ordenes-recientes/', views.obtener_ordenes_recientes, name='dashboard-ordenes-recientes'),
     path('inventario-critico/', views.obtener_inventario_critico, name='dashboard-inventario-critico'),
+    path('eventos/', views.stream_eventos, name='dashboard-eventos'),
+    path('eventos/estado/', views.obtener_estado_eventos, name='dashboard-eventos-estado'),
 ]
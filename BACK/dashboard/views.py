@@ -4,89 +4,109 @@ from rest_framework.response import Response
 from rest_framework import status
 from django.db import connection
 from django.utils import timezone
-from datetime import datetime, timedelta
+from datetime import datetime
+import asyncio
+import json
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from .kpis import kpis_dashboard, metricas_kpis
+from .eventos import oyente, eventos_guardados, Suscripcion
+
+EVENTOS_HEARTBEAT = getattr(settings, 'EVENTOS_HEARTBEAT', 15)
 
 @api_view(['GET'])
 def obtener_estadisticas_dashboard(request):
+	"""KPIs y actividad reciente; ver dashboard/kpis.py (una consulta, caché de pocos segundos)"""
 	try:
-		with connection.cursor() as cursor:
-			cursor.execute("""
-				SELECT COUNT(*) FROM personal WHERE estado = 'activo'
-			""")
-			total_personal = cursor.fetchone()[0] or 0
-			hoy = timezone.now().date()
-			cursor.execute("""
-				SELECT COUNT(DISTINCT id_personal) 
-				FROM control_asistencia 
-				WHERE DATE(fecha) = %s
-			""", [hoy])
-			asistencia_hoy = cursor.fetchone()[0] or 0
-			cursor.execute("""
-				SELECT COUNT(*) FROM usuarios WHERE estado = 'activo'
-			""")
-			total_usuarios = cursor.fetchone()[0] or 0
-			cursor.execute("""
-				SELECT COUNT(*) 
-				FROM orden_produccion 
-				WHERE estado IN ('Pendiente', 'En Proceso')
-			""")
-			ordenes_activas = cursor.fetchone()[0] or 0
-			cursor.execute("""
-				SELECT COUNT(*) 
-				FROM inventario 
-				WHERE cantidad_actual <= stock_minimo
-			""")
-			inventario_critico = cursor.fetchone()[0] or 0
-			ultimo_mes = timezone.now() - timedelta(days=30)
-			cursor.execute("""
-				SELECT 
-					COUNT(*) as total,
-					SUM(CASE WHEN estado = 'Completado' THEN 1 ELSE 0 END) as completadas
-				FROM orden_produccion
-				WHERE fecha_inicio >= %s
-			""", [ultimo_mes])
-			resultado_eficiencia = cursor.fetchone()
-			total_ordenes = resultado_eficiencia[0] or 0
-			ordenes_completadas = resultado_eficiencia[1] or 0
-			eficiencia = round((ordenes_completadas / total_ordenes), 2) if total_ordenes > 0 else 0.0
-			cursor.execute("""
-				SELECT 
-					accion,
-					descripcion,
-					fecha_hora,
-					username
-				FROM bitacora
-				ORDER BY fecha_hora DESC
-				LIMIT 5
-			""")
-			actividades_raw = cursor.fetchall()
-			actividades = []
-			for act in actividades_raw:
-				tiempo_transcurrido = calcular_tiempo_transcurrido(act[2])
-				actividades.append({
-					'titulo': act[0],
-					'detalle': act[1],
-					'hace': tiempo_transcurrido,
-					'usuario': act[3]
-				})
-			datos = {
-				'kpis': {
-					'totalPersonal': total_personal,
-					'asistenciaHoy': asistencia_hoy,
-					'usuarios': total_usuarios,
-					'ordenes': ordenes_activas,
-					'inventarioCritico': inventario_critico,
-					'eficiencia': eficiencia
-				},
-				'actividad': actividades
-			}
-			return Response(datos, status=status.HTTP_200_OK)
+		kpis, actividad = kpis_dashboard()
+		actividades = []
+		for act in actividad:
+			tiempo_transcurrido = calcular_tiempo_transcurrido(act[2])
+			actividades.append({
+				'titulo': act[0],
+				'detalle': act[1],
+				'hace': tiempo_transcurrido,
+				'usuario': act[3]
+			})
+		datos = {
+			'kpis': dict(kpis),
+			'actividad': actividades
+		}
+		return Response(datos, status=status.HTTP_200_OK)
 	except Exception as e:
 		return Response(
 			{'error': f'Error al obtener estadísticas: {str(e)}'}, 
 			status=status.HTTP_500_INTERNAL_SERVER_ERROR
 		)
 
+@api_view(['GET'])
+def obtener_metricas_kpis(request):
+	return Response(metricas_kpis(), status=status.HTTP_200_OK)
+
+def formato_sse(evento):
+	return f"id: {evento['id']}\nevent: {evento['tipo']}\ndata: {json.dumps(evento['datos'], default=str)}\n\n"
+
+async def eventos_pendientes(ultimo_id, suscripcion):
+	"""Eventos perdidos por el cliente desde ultimo_id: del buffer del oyente o de la tabla"""
+	pendientes = oyente.pendientes_desde(ultimo_id)
+	if pendientes is None:
+		pendientes = await sync_to_async(eventos_guardados)(ultimo_id)
+	return [evento for evento in pendientes if suscripcion.acepta(evento)]
+
+async def stream_eventos(request):
+	"""
+	Canal SSE del dashboard (ver dashboard/eventos.py).
+	Reconexión: Last-Event-ID (EventSource) o ?ultimo_id=; filtro opcional ?tipos=kpi,orden
+	"""
+	if not isinstance(request, ASGIRequest):
+		return JsonResponse(
+			{'error': 'El canal de eventos lo atiende el servicio ASGI (backwf.asgi.eventos_application)'},
+			status=501
+		)
+	try:
+		ultimo_id = int(request.headers.get('Last-Event-ID') or request.GET.get('ultimo_id') or 0)
+	except ValueError:
+		return JsonResponse({'error': 'ultimo_id inválido'}, status=400)
+	tipos = [tipo for tipo in request.GET.get('tipos', '').split(',') if tipo]
+
+	suscripcion = Suscripcion(asyncio.get_running_loop(), tipos)
+	# Suscribirse antes de leer los pendientes para no perder eventos entre ambos pasos
+	oyente.suscribir(suscripcion)
+
+	async def generar():
+		enviado = ultimo_id
+		try:
+			yield "retry: 3000\n\n"
+			if ultimo_id:
+				for evento in await eventos_pendientes(ultimo_id, suscripcion):
+					enviado = evento['id']
+					yield formato_sse(evento)
+			while True:
+				try:
+					evento = await asyncio.wait_for(suscripcion.cola.get(), EVENTOS_HEARTBEAT)
+				except asyncio.TimeoutError:
+					yield ": ping\n\n"
+					continue
+				if evento is None or suscripcion.atrasada:
+					break
+				if evento['id'] <= enviado:
+					continue  # ya enviado en el reenvío
+				enviado = evento['id']
+				yield formato_sse(evento)
+		finally:
+			oyente.desuscribir(suscripcion)
+
+	respuesta = StreamingHttpResponse(generar(), content_type='text/event-stream')
+	respuesta['Cache-Control'] = 'no-cache'
+	respuesta['X-Accel-Buffering'] = 'no'
+	return respuesta
+
+@api_view(['GET'])
+def obtener_estado_eventos(request):
+	return Response(oyente.estado(), status=status.HTTP_200_OK)
+
 def calcular_tiempo_transcurrido(fecha_hora):
 	if isinstance(fecha_hora, str):
 		fecha_hora = datetime.fromisoformat(fecha_hora.replace('Z', '+00:00'))
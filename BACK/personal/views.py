@@ -5,6 +5,8 @@ from rest_framework import status
 from .models import personal
 from .serializers import EmpleadoSerializer
 from django.db import connection 
+from usuarios.principal import invalidar_principal
+from dashboard.contadores import contando
 
 # Create your views here.
 
@@ -23,10 +25,14 @@ def registrar_Empleado(request):
 
     try:
         with connection.cursor() as cursor:
+            cursor.execute("SELECT id FROM usuarios WHERE name_user = %s", [username])
+            ids_usuario = [fila[0] for fila in cursor.fetchall()]
+        with contando('personal_activo', ids_usuario), connection.cursor() as cursor:
             cursor.execute(
                 "CALL registrar_empleado(%s, %s, %s, %s, %s, %s, %s)", 
                 [nombre_completo, direccion, telefono, rol, fecha_nacimiento, estado, username]
             )
+        invalidar_principal(username=username)
     except Exception as e:
         return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
@@ -71,11 +77,12 @@ def actualizar_empleado(request):
     estado = request.data.get('estado')
     id_usuario = request.data.get('id_usuario')
     try:
-        with connection.cursor() as cursor:
+        with contando('personal_activo', [id_usuario]), connection.cursor() as cursor:
             cursor.execute(
                 "CALL actualizar_empleado(%s, %s, %s, %s, %s, %s, %s)", 
                 [nombre_completo, direccion, telefono, rol, fecha_nacimiento, estado, id_usuario]
             )
+        invalidar_principal(id_usuario)
     except Exception as e:
         return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
@@ -85,11 +92,12 @@ def actualizar_empleado(request):
 def eliminar_empleado(request):
     id_usuario = request.data.get('id_usuario')
     try:
-        with connection.cursor() as cursor:
+        with contando('personal_activo', [id_usuario]), connection.cursor() as cursor:
             cursor.execute(
                 "CALL eliminar_empleado_usuario(%s)", 
                 [id_usuario]
             )
+        invalidar_principal(id_usuario)
     except Exception as e:
         return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
@@ -0,0 +1,133 @@
+"""
+Almacén en disco y registro en memoria de los modelos de predicción.
+
+entrenar_modelo guardaba solo las métricas y predecir_pedidos devolvía
+valores simulados. Ahora los estimadores entrenados se serializan con
+joblib en PREDICCIONES_MODELOS_DIR junto con lo necesario para construir
+las características de meses futuros, y modelos_prediccion.parametros
+guarda la referencia:
+
+    parametros['artefacto'] = {'archivo', 'sha256', 'formato', 'sklearn', 'bytes'}
+
+El archivo se nombra por el sha256 de su contenido: nunca se sobrescribe
+y un modelo reentrenado tiene otro archivo. FORMATO_ARTEFACTO se
+incrementa si cambia la estructura guardada o las características.
+
+Cada proceso mantiene un registro LRU (PREDICCIONES_REGISTRO_MAX modelos)
+para no leer y deserializar el archivo en cada predicción; la clave
+incluye el sha256, así que no hace falta invalidarlo al reentrenar.
+"""
+import hashlib
+import io
+import os
+import tempfile
+import time
+
+import joblib
+import sklearn
+from django.conf import settings
+
+from backwf.cache import TTLCache
+
+PREDICCIONES_MODELOS_DIR = getattr(
+    settings, 'PREDICCIONES_MODELOS_DIR', os.path.join(settings.BASE_DIR, 'modelos_prediccion')
+)
+PREDICCIONES_REGISTRO_MAX = getattr(settings, 'PREDICCIONES_REGISTRO_MAX', 8)
+PREDICCIONES_REGISTRO_TTL = getattr(settings, 'PREDICCIONES_REGISTRO_TTL', 3600)
+
+FORMATO_ARTEFACTO = 1
+
+
+class ArtefactoNoDisponible(Exception):
+    """El modelo no tiene estimadores guardados o el archivo no es utilizable"""
+    pass
+
+
+def ruta_artefacto(archivo):
+    # Solo nombres de archivo: parametros viene de la base de datos
+    return os.path.join(PREDICCIONES_MODELOS_DIR, os.path.basename(archivo))
+
+
+def guardar_artefacto(artefacto):
+    """
+    Serializa el artefacto (estimadores + metadatos) y devuelve la referencia
+    que se guarda en modelos_prediccion.parametros['artefacto'].
+    """
+    buffer = io.BytesIO()
+    joblib.dump({**artefacto, 'formato': FORMATO_ARTEFACTO}, buffer, compress=3)
+    contenido = buffer.getvalue()
+    sha256 = hashlib.sha256(contenido).hexdigest()
+    archivo = f'{artefacto["tipo_modelo"]}_{sha256[:16]}.joblib'
+    ruta = ruta_artefacto(archivo)
+
+    if not os.path.exists(ruta):
+        os.makedirs(PREDICCIONES_MODELOS_DIR, exist_ok=True)
+        descriptor, temporal = tempfile.mkstemp(dir=PREDICCIONES_MODELOS_DIR, suffix='.tmp')
+        try:
+            with os.fdopen(descriptor, 'wb') as destino:
+                destino.write(contenido)
+            os.replace(temporal, ruta)
+        except Exception:
+            os.unlink(temporal)
+            raise
+
+    return {
+        'archivo': archivo,
+        'sha256': sha256,
+        'formato': FORMATO_ARTEFACTO,
+        'sklearn': sklearn.__version__,
+        'bytes': len(contenido),
+    }
+
+
+def cargar_artefacto(referencia):
+    """Lee y verifica el archivo de la referencia (sin pasar por el registro)"""
+    if not referencia or referencia.get('formato') != FORMATO_ARTEFACTO:
+        raise ArtefactoNoDisponible('El modelo no tiene un artefacto entrenado compatible; vuelva a entrenarlo')
+    try:
+        with open(ruta_artefacto(referencia['archivo']), 'rb') as origen:
+            contenido = origen.read()
+    except FileNotFoundError:
+        raise ArtefactoNoDisponible(f'No se encontró el archivo del modelo {referencia["archivo"]}')
+    if hashlib.sha256(contenido).hexdigest() != referencia['sha256']:
+        raise ArtefactoNoDisponible(f'El archivo del modelo {referencia["archivo"]} no coincide con su sha256')
+    if referencia.get('sklearn') != sklearn.__version__:
+        print(f"Modelo {referencia['archivo']} entrenado con scikit-learn {referencia.get('sklearn')}, "
+              f"se carga con {sklearn.__version__}")
+    return joblib.load(io.BytesIO(contenido))
+
+
+class RegistroModelos:
+    """Modelos cargados del proceso: LRU acotado con carga única por clave (backwf.cache)."""
+
+    def __init__(self, maximo=PREDICCIONES_REGISTRO_MAX, ttl=PREDICCIONES_REGISTRO_TTL):
+        self._cache = TTLCache(ttl=ttl, maxsize=maximo)
+        self.cargas = 0
+        self.carga_ms_total = 0.0
+
+    def _cargar(self, referencia):
+        inicio = time.perf_counter()
+        artefacto = cargar_artefacto(referencia)
+        self.cargas += 1
+        self.carga_ms_total += (time.perf_counter() - inicio) * 1000
+        return artefacto
+
+    def obtener(self, id_modelo, referencia):
+        if not referencia or 'sha256' not in referencia:
+            raise ArtefactoNoDisponible('El modelo no tiene un artefacto entrenado; vuelva a entrenarlo')
+        return self._cache.get_or_compute(
+            (id_modelo, referencia['sha256']), lambda: self._cargar(referencia)
+        )
+
+    def limpiar(self):
+        self._cache.clear()
+
+    def metricas(self):
+        return {
+            **self._cache.stats(),
+            'cargas': self.cargas,
+            'carga_ms_promedio': round(self.carga_ms_total / self.cargas, 2) if self.cargas else 0.0,
+        }
+
+
+registro = RegistroModelos()
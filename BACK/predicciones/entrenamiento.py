@@ -0,0 +1,239 @@
+"""
+Entrenamiento de los modelos de predicción de pedidos.
+
+Se ejecuta en los procesos del pool de predicciones/jobs.py y no dentro de
+la petición HTTP. entrenar() recibe n_jobs (hilos de scikit-learn y BLAS
+del proceso) y un callback avance(fraccion) que el job usa para informar el
+progreso y cancelar (lanzando una excepción) entre etapas.
+"""
+import json
+from datetime import datetime
+
+import numpy as np
+from django.db import connection
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.linear_model import LinearRegression
+from sklearn.metrics import mean_absolute_error, r2_score
+
+from .almacen import guardar_artefacto
+
+TIPOS_MODELO = ('regresion_lineal', 'random_forest')
+
+N_ARBOLES = 100
+ARBOLES_POR_LOTE = 10
+
+
+def _avanzar(avance, fraccion):
+    if avance:
+        avance(fraccion)
+
+
+def entrenar(tipo_modelo, meses_historico, parametros=None, n_jobs=1, avance=None):
+    """
+    Entrena, guarda los estimadores (predicciones/almacen.py) y registra el
+    modelo. Devuelve (id_modelo, metricas). ValueError si no se puede entrenar.
+    Etapas para avance: datos 0-10 %, ajuste 10-90 %, guardado 90-100 %.
+    """
+    if tipo_modelo not in TIPOS_MODELO:
+        raise ValueError('Tipo de modelo no soportado')
+    
+    # Obtener datos históricos de pedidos
+    datos_historicos = obtener_datos_historicos(meses_historico)
+    if len(datos_historicos) < 3:
+        raise ValueError('No hay suficientes datos históricos para entrenar el modelo')
+    
+    # Preparar datos para el modelo
+    X, y_cantidad, y_monto = preparar_datos_entrenamiento(datos_historicos)
+    _avanzar(avance, 0.1)
+    
+    ajuste = (lambda fraccion: avance(0.1 + 0.8 * fraccion)) if avance else None
+    if tipo_modelo == 'regresion_lineal':
+        modelo_cantidad, modelo_monto, metricas = entrenar_regresion_lineal(X, y_cantidad, y_monto, n_jobs, ajuste)
+    else:
+        modelo_cantidad, modelo_monto, metricas = entrenar_random_forest(X, y_cantidad, y_monto, n_jobs, ajuste)
+    
+    # Guardar los estimadores en disco y el modelo en la base de datos
+    artefacto = guardar_artefacto({
+        'tipo_modelo': tipo_modelo,
+        'modelo_cantidad': modelo_cantidad,
+        'modelo_monto': modelo_monto,
+        'historico_len': len(X),
+        'año_inicio': int(X[:, 1].min()),
+        'ultimo_mes': [int(X[-1][1]), int(X[-1][0])],
+    })
+    modelo_guardado = guardar_modelo(tipo_modelo, metricas, {**(parametros or {}), 'artefacto': artefacto})
+    if modelo_guardado.id_modelo is None:
+        raise RuntimeError('No se pudo registrar el modelo en modelos_prediccion')
+    _avanzar(avance, 1.0)
+    
+    # Tipos nativos de Python para el JSON
+    return modelo_guardado.id_modelo, json.loads(json.dumps(metricas, default=float))
+
+
+def obtener_datos_historicos(meses_historico):
+    """
+    Obtener datos históricos de pedidos desde la base de datos
+    """
+    with connection.cursor() as cursor:
+        cursor.execute("""
+            SELECT 
+                fecha_creacion,
+                total,
+                EXTRACT(MONTH FROM fecha_creacion) as mes,
+                EXTRACT(YEAR FROM fecha_creacion) as año,
+                EXTRACT(QUARTER FROM fecha_creacion) as trimestre,
+                CASE 
+                    WHEN EXTRACT(DOW FROM fecha_creacion) IN (0,6) THEN 1 
+                    ELSE 0 
+                END as fin_de_semana
+            FROM pedidos 
+            WHERE fecha_creacion >= CURRENT_DATE - INTERVAL '%s months'
+            ORDER BY fecha_creacion
+        """, [meses_historico])
+        
+        datos = cursor.fetchall()
+    
+    return datos
+
+
+def preparar_datos_entrenamiento(datos_historicos):
+    """
+    Preparar datos para entrenamiento de modelos
+    """
+    X = []
+    y_cantidad = []
+    y_monto = []
+    
+    # Agrupar por mes para análisis de series de tiempo
+    datos_por_mes = {}
+    for fila in datos_historicos:
+        fecha = fila[0]
+        mes_key = f"{fecha.year}-{fecha.month:02d}"
+        
+        if mes_key not in datos_por_mes:
+            datos_por_mes[mes_key] = {
+                'cantidad': 0,
+                'monto': 0,
+                'mes': fecha.month,
+                'año': fecha.year
+            }
+        
+        datos_por_mes[mes_key]['cantidad'] += 1
+        datos_por_mes[mes_key]['monto'] += float(fila[1])
+    
+    # Preparar características y objetivos
+    meses_ordenados = sorted(datos_por_mes.keys())
+    for i, mes_key in enumerate(meses_ordenados):
+        datos_mes = datos_por_mes[mes_key]
+        
+        # Características: mes, año, tendencia
+        X.append([
+            datos_mes['mes'],
+            datos_mes['año'],
+            i,  # tendencia temporal
+            datos_mes['mes'] % 12,  # estacionalidad
+            datos_mes['año'] - min([datos_por_mes[m]['año'] for m in meses_ordenados])  # años desde inicio
+        ])
+        
+        y_cantidad.append(datos_mes['cantidad'])
+        y_monto.append(datos_mes['monto'])
+    
+    return np.array(X), np.array(y_cantidad), np.array(y_monto)
+
+
+def entrenar_regresion_lineal(X, y_cantidad, y_monto, n_jobs=1, avance=None):
+    """
+    Entrenar modelo de regresión lineal
+    """
+    modelo_cantidad = LinearRegression(n_jobs=n_jobs)
+    modelo_monto = LinearRegression(n_jobs=n_jobs)
+    
+    # Entrenar modelos
+    modelo_cantidad.fit(X, y_cantidad)
+    _avanzar(avance, 0.5)
+    modelo_monto.fit(X, y_monto)
+    _avanzar(avance, 1.0)
+    
+    # Calcular métricas
+    pred_cantidad = modelo_cantidad.predict(X)
+    pred_monto = modelo_monto.predict(X)
+    
+    metricas = {
+        'mae_cantidad': mean_absolute_error(y_cantidad, pred_cantidad),
+        'r2_cantidad': r2_score(y_cantidad, pred_cantidad),
+        'mae_monto': mean_absolute_error(y_monto, pred_monto),
+        'r2_monto': r2_score(y_monto, pred_monto)
+    }
+    
+    return modelo_cantidad, modelo_monto, metricas
+
+
+def entrenar_random_forest(X, y_cantidad, y_monto, n_jobs=1, avance=None):
+    """
+    Entrenar modelo Random Forest
+    """
+    modelos = []
+    for indice, y in enumerate((y_cantidad, y_monto)):
+        modelo = RandomForestRegressor(
+            n_estimators=ARBOLES_POR_LOTE, random_state=42, n_jobs=n_jobs, warm_start=True
+        )
+        # Los árboles se agregan por lotes (warm_start, mismo resultado que de una vez)
+        # para informar el avance y poder cancelar entre lotes
+        for arboles in range(ARBOLES_POR_LOTE, N_ARBOLES + 1, ARBOLES_POR_LOTE):
+            modelo.set_params(n_estimators=arboles)
+            modelo.fit(X, y)
+            _avanzar(avance, (indice * N_ARBOLES + arboles) / (2 * N_ARBOLES))
+        modelo.set_params(warm_start=False, n_jobs=None)
+        modelos.append(modelo)
+    modelo_cantidad, modelo_monto = modelos
+    
+    # Calcular métricas
+    pred_cantidad = modelo_cantidad.predict(X)
+    pred_monto = modelo_monto.predict(X)
+    
+    metricas = {
+        'mae_cantidad': mean_absolute_error(y_cantidad, pred_cantidad),
+        'r2_cantidad': r2_score(y_cantidad, pred_cantidad),
+        'mae_monto': mean_absolute_error(y_monto, pred_monto),
+        'r2_monto': r2_score(y_monto, pred_monto),
+        'importancias_cantidad': modelo_cantidad.feature_importances_.tolist(),
+        'importancias_monto': modelo_monto.feature_importances_.tolist()
+    }
+    
+    return modelo_cantidad, modelo_monto, metricas
+
+
+def guardar_modelo(tipo_modelo, metricas, parametros):
+    """
+    Guardar información del modelo en la base de datos
+    """
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("""
+                INSERT INTO modelos_prediccion 
+                (nombre_modelo, tipo_modelo, precision, parametros)
+                VALUES (%s, %s, %s, %s)
+                RETURNING id_modelo
+            """, [
+                f"Modelo_{tipo_modelo}_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
+                tipo_modelo,
+                float(metricas.get('r2_monto', 0.8)),
+                json.dumps(parametros)
+            ])
+            resultado = cursor.fetchone()
+            id_modelo = resultado[0] if resultado else None
+            
+        # Retornar un objeto con el atributo id_modelo
+        class ModeloGuardado:
+            def __init__(self, id_modelo):
+                self.id_modelo = id_modelo
+                
+        return ModeloGuardado(id_modelo)
+        
+    except Exception as e:
+        print(f"Error guardando modelo: {e}")
+        # Retornar un objeto con id_modelo None en caso de error
+        class ModeloGuardado:
+            def __init__(self):
+                self.id_modelo = None
+        return ModeloGuardado()
\ No newline at end of file
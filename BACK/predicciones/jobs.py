@@ -0,0 +1,298 @@
+"""
+Entrenamiento de modelos de predicción en segundo plano.
+
+entrenar_modelo entrenaba dentro de la petición HTTP (dos RandomForest de
+100 árboles) y bloqueaba el worker. Ahora registra un job en
+entrenamiento_jobs y lo envía a un pool de procesos (spawn); el cliente
+consulta estado, progreso, métricas e id_modelo resultante y puede
+cancelarlo.
+
+- PREDICCIONES_MAX_ENTRENAMIENTOS acota los entrenamientos simultáneos de
+  todo el sistema: además del tamaño del pool de cada worker, el hijo toma
+  uno de esos lugares con un advisory lock de Postgres antes de empezar.
+- n_jobs (hilos de scikit-learn y de BLAS en el hijo) se limita a
+  PREDICCIONES_MAX_N_JOBS y el hijo baja su prioridad (PREDICCIONES_NICE)
+  para no quitarle CPU a las peticiones web.
+- La cancelación marca el job; el hijo la revisa al informar el avance
+  (entre lotes de árboles) y termina sin registrar el modelo.
+- Jobs activos pasado PREDICCIONES_JOB_TIMEOUT_MINUTOS se marcan como
+  error (worker reiniciado o proceso muerto).
+
+El módulo usa solo SQL: los hijos lo importan antes de django.setup().
+"""
+import json
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+
+PREDICCIONES_MAX_ENTRENAMIENTOS = getattr(settings, 'PREDICCIONES_MAX_ENTRENAMIENTOS', 1)
+PREDICCIONES_MAX_PENDIENTES = getattr(settings, 'PREDICCIONES_MAX_PENDIENTES', 10)
+PREDICCIONES_MAX_N_JOBS = getattr(settings, 'PREDICCIONES_MAX_N_JOBS', 2)
+PREDICCIONES_NICE = getattr(settings, 'PREDICCIONES_NICE', 10)
+PREDICCIONES_JOB_TIMEOUT_MINUTOS = getattr(settings, 'PREDICCIONES_JOB_TIMEOUT_MINUTOS', 60)
+
+ACTIVOS = ('pendiente', 'en_proceso')
+LOCK_ENTRENAMIENTO = 'predicciones_entrenamiento'
+# Segundos entre intentos de tomar un lugar de entrenamiento
+ESPERA_LUGAR = 2
+
+COLUMNAS = (
+    'id_job', 'tipo_modelo', 'meses_historico', 'parametros', 'n_jobs', 'estado', 'progreso',
+    'etapa', 'mensaje', 'metricas', 'id_modelo', 'cancelar', 'fecha_creacion', 'fecha_inicio', 'fecha_fin',
+)
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+class LimiteJobsExcedido(Exception):
+    pass
+
+
+class EntrenamientoCancelado(Exception):
+    pass
+
+
+# ======= PROCESO HIJO =======
+
+def _preparar_hijo():
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backwf.settings')
+    import django
+    django.setup()
+    if PREDICCIONES_NICE:
+        try:
+            os.nice(PREDICCIONES_NICE)
+        except (AttributeError, OSError):
+            pass
+
+
+def _tomar_lugar(cursor, id_job):
+    """Espera un lugar libre (advisory lock de sesión); False si el job se canceló mientras tanto"""
+    while True:
+        for lugar in range(PREDICCIONES_MAX_ENTRENAMIENTOS):
+            cursor.execute("SELECT pg_try_advisory_lock(hashtext(%s), %s)", [LOCK_ENTRENAMIENTO, lugar])
+            if cursor.fetchone()[0]:
+                return True
+        cursor.execute("SELECT estado, cancelar FROM entrenamiento_jobs WHERE id_job = %s", [id_job])
+        fila = cursor.fetchone()
+        if not fila or fila[0] != 'pendiente' or fila[1]:
+            return False
+        time.sleep(ESPERA_LUGAR)
+
+
+def _informar_avance(id_job, fraccion):
+    """Guarda el progreso y lanza EntrenamientoCancelado si se pidió cancelar"""
+    etapa = 'entrenando' if fraccion < 0.9 else 'guardando'
+    with connection.cursor() as cursor:
+        cursor.execute("""
+            UPDATE entrenamiento_jobs SET progreso = %s, etapa = %s
+            WHERE id_job = %s
+            RETURNING cancelar
+        """, [int(fraccion * 100), etapa, id_job])
+        fila = cursor.fetchone()
+    # Con el modelo ya registrado (fraccion 1) no se cancela
+    if fraccion < 1 and (not fila or fila[0]):
+        raise EntrenamientoCancelado()
+
+
+def _finalizar(id_job, estado, mensaje='', metricas=None, id_modelo=None):
+    with connection.cursor() as cursor:
+        cursor.execute("""
+            UPDATE entrenamiento_jobs
+            SET estado = %s, mensaje = %s, metricas = %s::jsonb, id_modelo = %s, etapa = '',
+                progreso = CASE WHEN %s = 'completado' THEN 100 ELSE progreso END,
+                fecha_fin = now()
+            WHERE id_job = %s
+        """, [estado, mensaje, json.dumps(metricas) if metricas is not None else None, id_modelo, estado, id_job])
+
+
+def ejecutar_job(id_job):
+    """Entrena el modelo del job (corre en un proceso del pool)"""
+    from threadpoolctl import threadpool_limits
+
+    from .entrenamiento import entrenar
+
+    close_old_connections()
+    try:
+        with connection.cursor() as cursor:
+            if not _tomar_lugar(cursor, id_job):
+                return
+            cursor.execute("""
+                UPDATE entrenamiento_jobs
+                SET estado = 'en_proceso', progreso = 0, etapa = 'datos', fecha_inicio = now()
+                WHERE id_job = %s AND estado = 'pendiente' AND NOT cancelar
+                RETURNING tipo_modelo, meses_historico, parametros, n_jobs
+            """, [id_job])
+            fila = cursor.fetchone()
+        if not fila:
+            return  # cancelado o vencido antes de empezar
+        tipo_modelo, meses_historico, parametros, n_jobs = fila
+        if isinstance(parametros, str):
+            parametros = json.loads(parametros)
+
+        with threadpool_limits(limits=n_jobs):
+            id_modelo, metricas = entrenar(
+                tipo_modelo, meses_historico, parametros, n_jobs=n_jobs,
+                avance=lambda fraccion: _informar_avance(id_job, fraccion)
+            )
+        _finalizar(id_job, 'completado', metricas=metricas, id_modelo=id_modelo)
+    except EntrenamientoCancelado:
+        _finalizar(id_job, 'cancelado', 'Cancelado por el usuario')
+    except Exception as e:
+        print(f"Error al entrenar modelo del job {id_job}: {str(e)}")
+        _finalizar(id_job, 'error', str(e))
+    finally:
+        # Cerrar la conexión libera también el lugar (advisory lock de sesión)
+        connection.close()
+
+
+# ======= WORKER WEB =======
+
+def _obtener_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn: los hijos no heredan hilos ni conexiones del worker de Django
+            _pool = ProcessPoolExecutor(
+                max_workers=PREDICCIONES_MAX_ENTRENAMIENTOS,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_preparar_hijo,
+            )
+        return _pool
+
+
+def _reiniciar_pool(pool):
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _al_terminar(id_job, pool, futuro):
+    """El hijo murió sin actualizar el job (memoria, señal): se marca como error"""
+    if futuro.cancelled() or not isinstance(futuro.exception(), BrokenProcessPool):
+        return
+    _reiniciar_pool(pool)
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("""
+                UPDATE entrenamiento_jobs
+                SET estado = 'error', mensaje = 'El proceso de entrenamiento terminó inesperadamente', fecha_fin = now()
+                WHERE id_job = %s AND estado IN %s
+            """, [id_job, ACTIVOS])
+    except Exception as e:
+        print(f"Error al marcar el job {id_job}: {str(e)}")
+    finally:
+        connection.close()
+
+
+def _enviar(id_job):
+    for intento in range(2):
+        pool = _obtener_pool()
+        try:
+            futuro = pool.submit(ejecutar_job, id_job)
+            futuro.add_done_callback(lambda f, pool=pool: _al_terminar(id_job, pool, f))
+            return
+        except BrokenProcessPool:
+            _reiniciar_pool(pool)
+            if intento:
+                raise
+
+
+def _leer(where, params):
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT {', '.join(COLUMNAS)} FROM entrenamiento_jobs WHERE {where}", params)
+        return [dict(zip(COLUMNAS, fila)) for fila in cursor.fetchall()]
+
+
+def crear_job(tipo_modelo, meses_historico, parametros=None, n_jobs=1):
+    """Registra el job y lo envía al pool. Lanza ValueError o LimiteJobsExcedido."""
+    from .entrenamiento import TIPOS_MODELO
+
+    if tipo_modelo not in TIPOS_MODELO:
+        raise ValueError('Tipo de modelo no soportado')
+    try:
+        meses_historico = int(meses_historico)
+        n_jobs = int(n_jobs)
+    except (TypeError, ValueError):
+        raise ValueError('meses_historico y n_jobs deben ser números')
+    if meses_historico < 1:
+        raise ValueError('meses_historico debe ser mayor a 0')
+    if parametros is not None and not isinstance(parametros, dict):
+        raise ValueError('parametros debe ser un objeto')
+    # -1 = todos los permitidos (como en scikit-learn)
+    if n_jobs == -1:
+        n_jobs = PREDICCIONES_MAX_N_JOBS
+    if n_jobs < 1:
+        raise ValueError('n_jobs debe ser mayor a 0 o -1')
+    n_jobs = min(n_jobs, PREDICCIONES_MAX_N_JOBS)
+
+    limpiar_jobs()
+    id_job = str(uuid.uuid4())
+    with connection.cursor() as cursor:
+        # Inserta solo si no se superó el límite de jobs activos
+        cursor.execute("""
+            INSERT INTO entrenamiento_jobs (id_job, tipo_modelo, meses_historico, parametros, n_jobs, fecha_creacion)
+            SELECT %s, %s, %s, %s::jsonb, %s, now()
+            WHERE (SELECT COUNT(*) FROM entrenamiento_jobs WHERE estado IN %s) < %s
+        """, [id_job, tipo_modelo, meses_historico, json.dumps(parametros or {}), n_jobs,
+              ACTIVOS, PREDICCIONES_MAX_PENDIENTES])
+        if not cursor.rowcount:
+            raise LimiteJobsExcedido('Hay demasiados entrenamientos en cola, intente más tarde')
+
+    try:
+        _enviar(id_job)
+    except Exception as e:
+        _finalizar(id_job, 'error', f'No se pudo enviar el entrenamiento: {str(e)}')
+        raise
+    return obtener_job(id_job)
+
+
+def obtener_job(id_job):
+    jobs = _leer('id_job = %s', [str(id_job)])
+    return serializar_job(jobs[0]) if jobs else None
+
+
+def cancelar_job(id_job):
+    """
+    Pide cancelar el job: si está pendiente queda cancelado de inmediato y si
+    está en proceso el hijo lo cancela en el siguiente avance.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute("""
+            UPDATE entrenamiento_jobs
+            SET cancelar = true,
+                mensaje = CASE WHEN estado = 'pendiente' THEN 'Cancelado por el usuario' ELSE mensaje END,
+                fecha_fin = CASE WHEN estado = 'pendiente' THEN now() ELSE fecha_fin END,
+                estado = CASE WHEN estado = 'pendiente' THEN 'cancelado' ELSE estado END
+            WHERE id_job = %s AND estado IN %s
+        """, [str(id_job), ACTIVOS])
+    return obtener_job(id_job)
+
+
+def limpiar_jobs():
+    """Marca como error los jobs activos que superaron el tiempo máximo."""
+    with connection.cursor() as cursor:
+        cursor.execute("""
+            UPDATE entrenamiento_jobs
+            SET estado = 'error', mensaje = 'Tiempo de entrenamiento excedido', fecha_fin = now()
+            WHERE estado IN %s AND fecha_creacion < now() - make_interval(mins => %s)
+        """, [ACTIVOS, PREDICCIONES_JOB_TIMEOUT_MINUTOS])
+        return cursor.rowcount
+
+
+def serializar_job(job):
+    datos = dict(job)
+    datos['id_job'] = str(datos['id_job'])
+    for campo in ('parametros', 'metricas'):
+        if isinstance(datos[campo], str):
+            datos[campo] = json.loads(datos[campo])
+    return datos
@@ -0,0 +1,61 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql="""
+                CREATE TABLE IF NOT EXISTS entrenamiento_jobs (
+                    id_job uuid PRIMARY KEY,
+                    tipo_modelo character varying(100) NOT NULL,
+                    meses_historico integer NOT NULL,
+                    parametros jsonb NOT NULL DEFAULT '{}'::jsonb,
+                    n_jobs integer NOT NULL DEFAULT 1,
+                    estado character varying(20) NOT NULL DEFAULT 'pendiente',
+                    progreso integer NOT NULL DEFAULT 0,
+                    etapa character varying(30) NOT NULL DEFAULT '',
+                    mensaje text NOT NULL DEFAULT '',
+                    metricas jsonb,
+                    id_modelo integer,
+                    cancelar boolean NOT NULL DEFAULT false,
+                    fecha_creacion timestamp with time zone NOT NULL,
+                    fecha_inicio timestamp with time zone,
+                    fecha_fin timestamp with time zone
+                );
+                CREATE INDEX IF NOT EXISTS entrenamiento_jobs_estado_idx ON entrenamiento_jobs (estado, fecha_creacion);
+            """,
+            reverse_sql="DROP TABLE IF EXISTS entrenamiento_jobs;",
+            state_operations=[
+                migrations.CreateModel(
+                    name='EntrenamientoJob',
+                    fields=[
+                        ('id_job', models.UUIDField(primary_key=True, serialize=False)),
+                        ('tipo_modelo', models.CharField(max_length=100)),
+                        ('meses_historico', models.IntegerField()),
+                        ('parametros', models.JSONField(default=dict)),
+                        ('n_jobs', models.IntegerField(default=1)),
+                        ('estado', models.CharField(choices=[('pendiente', 'Pendiente'), ('en_proceso', 'En proceso'), ('completado', 'Completado'), ('error', 'Error'), ('cancelado', 'Cancelado')], default='pendiente', max_length=20)),
+                        ('progreso', models.IntegerField(default=0)),
+                        ('etapa', models.CharField(blank=True, default='', max_length=30)),
+                        ('mensaje', models.TextField(blank=True, default='')),
+                        ('metricas', models.JSONField(null=True)),
+                        ('id_modelo', models.IntegerField(null=True)),
+                        ('cancelar', models.BooleanField(default=False)),
+                        ('fecha_creacion', models.DateTimeField()),
+                        ('fecha_inicio', models.DateTimeField(null=True)),
+                        ('fecha_fin', models.DateTimeField(null=True)),
+                    ],
+                    options={
+                        'db_table': 'entrenamiento_jobs',
+                        'managed': False,
+                    },
+                ),
+            ],
+        ),
+    ]
@@ -24,4 +24,34 @@ class PrediccionPedido(models.Model):
     
     class Meta:
         db_table = 'predicciones_pedidos'
-        managed = False
\ No newline at end of file
+        managed = False
+
+class EntrenamientoJob(models.Model):
+    """Entrenamiento en segundo plano de un modelo (ver predicciones/jobs.py)"""
+    ESTADOS = [
+        ('pendiente', 'Pendiente'),
+        ('en_proceso', 'En proceso'),
+        ('completado', 'Completado'),
+        ('error', 'Error'),
+        ('cancelado', 'Cancelado'),
+    ]
+
+    id_job = models.UUIDField(primary_key=True)
+    tipo_modelo = models.CharField(max_length=100)
+    meses_historico = models.IntegerField()
+    parametros = models.JSONField(default=dict)
+    n_jobs = models.IntegerField(default=1)
+    estado = models.CharField(max_length=20, choices=ESTADOS, default='pendiente')
+    progreso = models.IntegerField(default=0)
+    etapa = models.CharField(max_length=30, blank=True, default='')
+    mensaje = models.TextField(blank=True, default='')
+    metricas = models.JSONField(null=True)
+    id_modelo = models.IntegerField(null=True)
+    cancelar = models.BooleanField(default=False)
+    fecha_creacion = models.DateTimeField()
+    fecha_inicio = models.DateTimeField(null=True)
+    fecha_fin = models.DateTimeField(null=True)
+
+    class Meta:
+        db_table = 'entrenamiento_jobs'
+        managed = False
@@ -4,8 +4,11 @@ from . import views
 urlpatterns = [
     # Modelos predictivos
     path('modelo/entrenar/', views.entrenar_modelo, name='entrenar_modelo'),
+    path('modelo/entrenamientos/<uuid:id_job>/', views.estado_entrenamiento, name='estado_entrenamiento'),
+    path('modelo/entrenamientos/<uuid:id_job>/cancelar/', views.cancelar_entrenamiento, name='cancelar_entrenamiento'),
     path('modelo/predecir/', views.predecir_pedidos, name='predecir_pedidos'),
     path('modelo/<int:modelo_id>/metricas/', views.obtener_metricas_modelo, name='metricas_modelo'),
+    path('modelo/registro/', views.obtener_metricas_registro, name='metricas_registro_modelos'),
     
     # Análisis y reportes
     path('analisis/tendencias/', views.analisis_tendencias, name='analisis_tendencias'),
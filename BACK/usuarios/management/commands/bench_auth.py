@@ -0,0 +1,70 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from rest_framework.decorators import api_view
+from rest_framework.response import Response
+
+from usuarios import principal
+from usuarios.models import usurios
+from usuarios.permissions import require_permission
+from usuarios.utils import generate_jwt, jwt_required
+
+
+@api_view(['GET'])
+@jwt_required
+@require_permission('OrdenProduccion.view_ordenproduccion')
+def _vista_vacia(request):
+    return Response({'ok': True})
+
+
+class Command(BaseCommand):
+    help = 'Mide el costo por petición de jwt_required + require_permission con y sin caché del principal'
+
+    def add_arguments(self, parser):
+        parser.add_argument('username', help='Usuario (con perfil de personal) para generar el token')
+        parser.add_argument(
+            '--iteraciones',
+            type=int,
+            default=1000,
+            help='Número de peticiones simuladas por escenario (por defecto: 1000)',
+        )
+
+    def _medir(self, token, iteraciones):
+        factory = RequestFactory()
+        with CaptureQueriesContext(connection) as consultas:
+            inicio = time.perf_counter()
+            for _ in range(iteraciones):
+                request = factory.get('/bench/', HTTP_AUTHORIZATION=f'Bearer {token}')
+                _vista_vacia(request)
+            total = time.perf_counter() - inicio
+        return total / iteraciones * 1000, len(consultas) / iteraciones
+
+    def handle(self, *args, **options):
+        iteraciones = options['iteraciones']
+        try:
+            usuario = usurios.objects.get(name_user=options['username'])
+        except usurios.DoesNotExist:
+            self.stdout.write(self.style.ERROR(f"✗ Usuario '{options['username']}' no encontrado."))
+            return
+
+        token = generate_jwt(usuario)
+        ttl_original = principal.PRINCIPAL_CACHE_TTL
+        try:
+            principal.PRINCIPAL_CACHE_TTL = 0
+            ms_sin, q_sin = self._medir(token, iteraciones)
+
+            principal.PRINCIPAL_CACHE_TTL = ttl_original or 60
+            principal.limpiar_cache_principal()
+            ms_con, q_con = self._medir(token, iteraciones)
+        finally:
+            principal.PRINCIPAL_CACHE_TTL = ttl_original
+
+        self.stdout.write(f'Iteraciones: {iteraciones}')
+        self.stdout.write(f'Sin caché: {ms_sin:.3f} ms/petición, {q_sin:.2f} consultas/petición')
+        self.stdout.write(f'Con caché: {ms_con:.3f} ms/petición, {q_con:.2f} consultas/petición')
+        if ms_con:
+            self.stdout.write(self.style.SUCCESS(f'✓ Aceleración: {ms_sin / ms_con:.1f}x'))
+        self.stdout.write(f'Estadísticas del caché: {principal.estadisticas_principal()}')
@@ -0,0 +1,72 @@
+"""
+Matriz de permisos por ventana (ventana -> insertar/editar/eliminar/ver).
+
+Las pantallas pedían get_permisos_usuario_ventana una vez por ventana.
+La matriz completa del usuario se obtiene con una sola llamada a
+get_permisos_usuario y se guarda en memoria, versionada: cualquier cambio
+de permisos (insertar_permisos) incrementa la versión y las matrices
+anteriores dejan de usarse.
+
+La versión vive en la tabla permisos_version para que un permiso revocado
+desde un worker deje de concederse en todos: cada proceso la relee como
+mucho cada PERMISOS_VERSION_TTL segundos (el worker que la incrementa la
+ve de inmediato).
+"""
+from django.conf import settings
+from django.db import connection
+
+from backwf.cache import TTLCache
+
+PERMISOS_VERSION_TTL = getattr(settings, 'PERMISOS_VERSION_TTL', 2)
+
+_cache = TTLCache(ttl=getattr(settings, 'PERMISOS_CACHE_TTL', 300), maxsize=1024)
+_version = TTLCache(ttl=PERMISOS_VERSION_TTL, maxsize=1)
+
+PERMISOS_VACIOS = {'insertar': False, 'editar': False, 'eliminar': False, 'ver': False}
+
+
+def _leer_version():
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT version FROM permisos_version WHERE id = 1")
+        fila = cursor.fetchone()
+    return fila[0] if fila else 0
+
+
+def version_actual():
+    if PERMISOS_VERSION_TTL <= 0:
+        return _leer_version()
+    return _version.get_or_compute('version', _leer_version)
+
+
+def incrementar_version():
+    """Invalida las matrices cacheadas en todos los workers (llamar tras modificar permisos)."""
+    with connection.cursor() as cursor:
+        cursor.execute("""
+            INSERT INTO permisos_version (id, version) VALUES (1, 1)
+            ON CONFLICT (id) DO UPDATE SET version = permisos_version.version + 1
+            RETURNING version
+        """)
+        version = cursor.fetchone()[0]
+    _version.set('version', version)
+    return version
+
+
+def _consultar_matriz(username):
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT ventana, insertar, editar, eliminar, ver FROM get_permisos_usuario(%s)", [username])
+        return {
+            ventana: {'insertar': insertar, 'editar': editar, 'eliminar': eliminar, 'ver': ver}
+            for ventana, insertar, editar, eliminar, ver in cursor.fetchall()
+        }
+
+
+def obtener_matriz(username):
+    """Devuelve (version, matriz) del usuario, desde caché si es posible."""
+    version = version_actual()
+    matriz = _cache.get_or_compute((username, version), lambda: _consultar_matriz(username))
+    return version, matriz
+
+
+def permisos_ventana(username, ventana):
+    _, matriz = obtener_matriz(username)
+    return dict(matriz.get(ventana, PERMISOS_VACIOS))
@@ -0,0 +1,35 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('usuarios', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql="""
+                CREATE TABLE IF NOT EXISTS permisos_version (
+                    id smallint PRIMARY KEY,
+                    version bigint NOT NULL DEFAULT 0
+                );
+                INSERT INTO permisos_version (id, version) VALUES (1, 0)
+                ON CONFLICT (id) DO NOTHING;
+            """,
+            reverse_sql="DROP TABLE IF EXISTS permisos_version;",
+            state_operations=[
+                migrations.CreateModel(
+                    name='PermisosVersion',
+                    fields=[
+                        ('id', models.SmallIntegerField(primary_key=True, serialize=False)),
+                        ('version', models.BigIntegerField(default=0)),
+                    ],
+                    options={
+                        'db_table': 'permisos_version',
+                        'managed': False,
+                    },
+                ),
+            ],
+        ),
+    ]
@@ -32,3 +32,13 @@ class usurios(models.Model):
     class Meta:
         db_table = 'usuarios'  #  Este es el nombre real de tu tabla en la base de datos
         managed = False        #  Esto evita que Django intente crear/modificar la tabla
+
+
+class PermisosVersion(models.Model):
+    """Versión de los permisos compartida entre workers (ver usuarios/matriz_permisos.py)"""
+    id = models.SmallIntegerField(primary_key=True)
+    version = models.BigIntegerField(default=0)
+
+    class Meta:
+        db_table = 'permisos_version'
+        managed = False
@@ -2,7 +2,7 @@
 from functools import wraps
 from rest_framework.response import Response
 from rest_framework import status
-from .roles import PERMISSIONS
+from .roles import has_perm
 from personal.models import personal
 
 def require_permission(permission_name):
@@ -21,25 +21,22 @@ def require_permission(permission_name):
             if hasattr(request.user, 'is_superuser') and request.user.is_superuser:
                 return view_func(request, *args, **kwargs)
 
-            # Obtener el rol del usuario desde la tabla personal
-            try:
-                user_profile = personal.objects.get(id_usuario=request.user.id)
-                user_role = user_profile.rol
-            except personal.DoesNotExist:
+            # Obtener el rol del usuario (cacheado en el principal de jwt_required)
+            principal = getattr(request, 'principal', None)
+            if principal is not None:
+                user_role = principal.rol
+            else:
+                user_profile = personal.objects.filter(id_usuario=request.user.id).first()
+                user_role = user_profile.rol if user_profile else None
+            if user_role is None:
                 return Response({
                     'error': 'No tienes un perfil de personal asignado.',
                     'debug_info': f'Usuario ID: {request.user.id}, Username: {getattr(request.user, "name_user", "N/A")}'
                 }, status=status.HTTP_403_FORBIDDEN)
 
-            # Obtener la lista de permisos para el rol del usuario
-            user_permissions = PERMISSIONS.get(user_role, [])
-
-            # Si el rol es Administrador, tiene todos los permisos
-            if user_role == 'Administrador':
-                return view_func(request, *args, **kwargs)
-
-            # Comprobar si el permiso requerido está en la lista de permisos del usuario
-            if permission_name in user_permissions:
+            # Comprobar el permiso contra la máscara compilada del rol
+            # (el Administrador tiene todos los permisos)
+            if has_perm(user_role, permission_name):
                 return view_func(request, *args, **kwargs)
             else:
                 return Response({'error': f'No tienes permiso para realizar esta acción. Se requiere el permiso: {permission_name}'}, status=status.HTTP_403_FORBIDDEN)
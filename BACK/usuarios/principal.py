@@ -0,0 +1,89 @@
+"""
+Caché del "principal" autenticado (usuario + estado + rol).
+
+jwt_required y require_permission consultaban usuarios y personal en cada
+petición. El principal se guarda por (id de usuario, iat del token) con un
+TTL corto (PRINCIPAL_CACHE_TTL, 0 lo desactiva). Las vistas que modifican
+usuarios o personal llaman a invalidar_principal para que el cambio se vea
+de inmediato en este proceso; en los demás workers el TTL acota la demora.
+"""
+import threading
+
+from django.conf import settings
+
+from backwf.cache import TTLCache
+from personal.models import personal
+from .models import usurios
+
+PRINCIPAL_CACHE_TTL = getattr(settings, 'PRINCIPAL_CACHE_TTL', 60)
+
+_cache = TTLCache(ttl=PRINCIPAL_CACHE_TTL, maxsize=getattr(settings, 'PRINCIPAL_CACHE_MAXSIZE', 2048))
+
+# Versión por usuario: invalidar solo incrementa el número y las entradas
+# viejas dejan de ser alcanzables (expiran solas por TTL)
+_versiones = {}
+_versiones_lock = threading.Lock()
+
+_SIN_PERFIL = object()
+
+
+class Principal:
+    """Usuario autenticado con su rol resuelto de forma perezosa."""
+
+    def __init__(self, usuario):
+        self.usuario = usuario
+        self._rol = None
+
+    @property
+    def id(self):
+        return self.usuario.id
+
+    @property
+    def estado(self):
+        return self.usuario.estado
+
+    @property
+    def rol(self):
+        """Rol desde la tabla personal, o None si no tiene perfil."""
+        if self._rol is None:
+            perfil = personal.objects.filter(id_usuario=self.usuario.id).values_list('rol', flat=True).first()
+            self._rol = _SIN_PERFIL if perfil is None else perfil
+        return None if self._rol is _SIN_PERFIL else self._rol
+
+
+def _version(id_usuario):
+    with _versiones_lock:
+        return _versiones.get(id_usuario, 0)
+
+
+def obtener_principal(id_usuario, iat=None):
+    """
+    Devuelve el Principal del usuario. Lanza usurios.DoesNotExist si no existe
+    (los usuarios inexistentes no se cachean).
+    """
+    if PRINCIPAL_CACHE_TTL <= 0:
+        return Principal(usurios.objects.get(id=id_usuario))
+    clave = (id_usuario, iat, _version(id_usuario))
+    return _cache.get_or_compute(clave, lambda: Principal(usurios.objects.get(id=id_usuario)))
+
+
+def invalidar_principal(id_usuario=None, username=None):
+    """Invalida el principal cacheado de un usuario (por id o por username)."""
+    if id_usuario is None and username:
+        id_usuario = usurios.objects.filter(name_user=username).values_list('id', flat=True).first()
+    if id_usuario is None:
+        return
+    try:
+        id_usuario = int(id_usuario)
+    except (TypeError, ValueError):
+        return
+    with _versiones_lock:
+        _versiones[id_usuario] = _versiones.get(id_usuario, 0) + 1
+
+
+def limpiar_cache_principal():
+    _cache.clear()
+
+
+def estadisticas_principal():
+    return _cache.stats()
@@ -78,3 +78,67 @@ PERMISSIONS = {
         'notifications.view_notification',
     ]
 }
+
+
+# ---------- PERMISOS COMPILADOS ----------
+# Las listas de PERMISSIONS se compilan una sola vez al importar el módulo:
+# cada permiso recibe un bit y cada rol queda como frozenset + máscara entera,
+# de modo que comprobar uno o varios permisos es una operación de bits.
+
+ROL_ADMINISTRADOR = 'Administrador'
+
+PERMISO_BITS = {}
+for _permisos in PERMISSIONS.values():
+    for _permiso in _permisos:
+        if _permiso not in PERMISO_BITS:
+            PERMISO_BITS[_permiso] = 1 << len(PERMISO_BITS)
+
+TODOS_LOS_PERMISOS = frozenset(PERMISO_BITS)
+
+PERMISOS_POR_ROL = {rol: frozenset(permisos) for rol, permisos in PERMISSIONS.items()}
+# El Administrador tiene todos los permisos registrados
+PERMISOS_POR_ROL[ROL_ADMINISTRADOR] = TODOS_LOS_PERMISOS
+
+MASCARA_POR_ROL = {
+    rol: sum(PERMISO_BITS[p] for p in permisos)
+    for rol, permisos in PERMISOS_POR_ROL.items()
+}
+
+
+def mascara_de(permisos):
+    """Máscara de bits de una lista de permisos (None si alguno no existe)."""
+    mascara = 0
+    for permiso in permisos:
+        bit = PERMISO_BITS.get(permiso)
+        if bit is None:
+            return None
+        mascara |= bit
+    return mascara
+
+
+def has_perm(rol, permiso):
+    if rol == ROL_ADMINISTRADOR:
+        return True
+    bit = PERMISO_BITS.get(permiso)
+    return bit is not None and bool(MASCARA_POR_ROL.get(rol, 0) & bit)
+
+
+def has_all(rol, permisos):
+    """True si el rol tiene todos los permisos indicados."""
+    if rol == ROL_ADMINISTRADOR:
+        return True
+    mascara = mascara_de(permisos)
+    return mascara is not None and MASCARA_POR_ROL.get(rol, 0) & mascara == mascara
+
+
+def has_any(rol, permisos):
+    """True si el rol tiene al menos uno de los permisos indicados."""
+    if rol == ROL_ADMINISTRADOR:
+        return True
+    mascara_rol = MASCARA_POR_ROL.get(rol, 0)
+    return any(mascara_rol & PERMISO_BITS.get(p, 0) for p in permisos)
+
+
+def permisos_efectivos(rol):
+    """Conjunto completo de permisos del rol (vacío si el rol no existe)."""
+    return PERMISOS_POR_ROL.get(rol, frozenset())
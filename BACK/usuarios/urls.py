@@ -3,7 +3,8 @@ from django.urls import path
 from .views import (login, register, agregar_permiso, actualizar_password, obtener_usuario_por_id,
                     obtener_username_por_email, obtener_permisos_usuario, obtener_permisos_usuario_ventana,
                     obtener_tipo_usuario, editar_empleado_usuario, obtener_todos_usuarios,
-                    actualizar_usuario, eliminar_usuario, listar_permisos, logout, registro_publico_cliente)
+                    actualizar_usuario, eliminar_usuario, listar_permisos, logout, registro_publico_cliente,
+                    permisos_efectivos_usuario, obtener_matriz_permisos)
 ## Dashboard endpoints moved to dashboard app
 
 urlpatterns = [
@@ -15,6 +16,7 @@ urlpatterns = [
     path('getuser', obtener_todos_usuarios, name='getuser'),
     path('getpermisosUser/<str:username>', obtener_permisos_usuario),
     path('getpermisosUser_Ventana/<str:username>/<str:ventana>', obtener_permisos_usuario_ventana),
+    path('permisos-matriz/<str:username>', obtener_matriz_permisos, name='permisos_matriz'),
     path('newPassword/<str:username>', actualizar_password),
     path('getUser/<int:id_usuario>', obtener_usuario_por_id),
     path('username_email/<str:email>', obtener_username_por_email),
@@ -23,5 +25,6 @@ urlpatterns = [
     path('actualizar/<int:id_usuario>', actualizar_usuario, name='actualizar_usuario'),
     path('eliminar/<int:id_usuario>', eliminar_usuario, name='eliminar_usuario'),
     path('permisos-lista', listar_permisos),
+    path('permisos-efectivos', permisos_efectivos_usuario, name='permisos_efectivos'),
     # Dashboard endpoints are now in dashboard/urls.py
 ]
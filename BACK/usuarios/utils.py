@@ -5,6 +5,7 @@ from rest_framework.response import Response
 from rest_framework import status
 from functools import wraps
 from .models import usurios
+from .principal import obtener_principal
 
 def jwt_required(view_func):
     @wraps(view_func)
@@ -17,8 +18,10 @@ def jwt_required(view_func):
         try:
             token = auth_header.split(" ")[1]
             payload = jwt.decode(token, settings.SECRET_KEY, algorithms=["HS256"])
-            user = usurios.objects.get(id=payload['id'])
-            request.user = user
+            # Usuario y rol cacheados por (id, iat); ver usuarios/principal.py
+            principal = obtener_principal(payload['id'], payload.get('iat'))
+            request.user = principal.usuario
+            request.principal = principal
         except jwt.ExpiredSignatureError:
             return Response({'error': 'El token ha expirado'}, status=status.HTTP_401_UNAUTHORIZED)
         except (jwt.InvalidTokenError, IndexError):
@@ -4,6 +4,10 @@ from rest_framework import status
 from .models import usurios
 from .serializers import LoginSerializer, RegisterSerializer ,UsuarioListSerializer
 from .utils import generate_jwt, jwt_required
+from .principal import invalidar_principal
+from .matriz_permisos import incrementar_version as incrementar_version_permisos, obtener_matriz, permisos_ventana
+from .roles import ROL_ADMINISTRADOR, get_user_role, permisos_efectivos
+from backwf.pagination import respuesta_paginada
 from django.db import connection
 
 # Create your views here.
@@ -22,11 +26,9 @@ def logout(request):
         username = request.user.name_user
         
         # Registrar directamente con SQL para evitar problemas de secuencia
-        with connection.cursor() as cursor:
-            cursor.execute("""
-                INSERT INTO bitacora (username, ip, fecha_hora, accion, descripcion)
-                VALUES (%s, %s, %s, %s, %s)
-            """, [username, ip, timezone.now(), 'CIERRE_SESION', f'El usuario {username} cerró sesión.'])
+        # (también actualiza el resumen diario de la bitácora)
+        from Bitacora.writer import insertar_registros
+        insertar_registros([(username, ip, timezone.now(), 'CIERRE_SESION', f'El usuario {username} cerró sesión.')])
         
     except Exception as e:
         # No bloqueamos el logout si falla la bitácora
@@ -45,6 +47,23 @@ def listar_permisos(request):
     ]
     return Response(permisos, status=status.HTTP_200_OK)
 
+@api_view(['GET'])
+@jwt_required
+def permisos_efectivos_usuario(request):
+    """
+    Devuelve en una sola llamada todos los permisos efectivos del usuario
+    autenticado según su rol, para no consultar ventana por ventana.
+    """
+    principal = getattr(request, 'principal', None)
+    rol = principal.rol if principal is not None else get_user_role(request.user)
+    return Response({
+        'id_usuario': request.user.id,
+        'name_user': request.user.name_user,
+        'rol': rol,
+        'es_administrador': rol == ROL_ADMINISTRADOR,
+        'permisos': sorted(permisos_efectivos(rol)),
+    }, status=status.HTTP_200_OK)
+
 @api_view(['POST'])
 def login(request):
     from personal.models import personal
@@ -202,6 +221,7 @@ def agregar_permiso(request):
                 "CALL insertar_permisos(%s, %s, %s, %s, %s, %s)", 
                 [username, tipo_ventana, tipo_insertar, tipo_editar, tipo_eliminar, tipo_ver]
             )
+        incrementar_version_permisos()
     except Exception as e:
         return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
@@ -226,23 +246,26 @@ def obtener_permisos_usuario(request, username):
 @api_view(['GET'])
 def obtener_permisos_usuario_ventana(request, username, ventana):
     try:
-        with connection.cursor() as cursor:
-            cursor.execute("SELECT * FROM get_permisos_usuario_ventana(%s, %s)", [username, ventana])
-            columnas = [col[0] for col in cursor.description]
-            fila = cursor.fetchone()
-
-            if fila:
-                permisos = dict(zip(columnas, fila))
-            else:
-                # Si no hay datos, devolvemos todo en false
-                permisos = {
-                    'insertar': False,
-                    'editar': False,
-                    'eliminar': False,
-                    'ver': False
-                }
-
-            return Response(permisos, status=status.HTTP_200_OK)
+        # Se resuelve desde la matriz cacheada del usuario
+        # (si no hay datos, devuelve todo en false)
+        permisos = permisos_ventana(username, ventana)
+        return Response(permisos, status=status.HTTP_200_OK)
+    except Exception as e:
+        return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+@api_view(['GET'])
+def obtener_matriz_permisos(request, username):
+    """
+    Matriz completa ventana -> {insertar, editar, eliminar, ver} del usuario.
+    Reemplaza las llamadas por ventana; se sirve desde caché versionado.
+    """
+    try:
+        version, matriz = obtener_matriz(username)
+        return Response({
+            'username': username,
+            'version': version,
+            'permisos': matriz
+        }, status=status.HTTP_200_OK)
     except Exception as e:
         return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
@@ -300,6 +323,9 @@ def obtener_tipo_usuario(request, username):
 def obtener_todos_usuarios(request):
     try:
         usuarios = usurios.objects.all().order_by('id')
+        paginada = respuesta_paginada(request, usuarios, 'id', UsuarioListSerializer)
+        if paginada is not None:
+            return paginada
         serializer = UsuarioListSerializer(usuarios, many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
     except Exception as e:
@@ -331,6 +357,7 @@ def editar_empleado_usuario(request):
                 direccion,
                 fecha_nacimiento
             ])
+        invalidar_principal(id_usuario)
 
         return Response({'mensaje': 'Empleado actualizado correctamente'}, status=status.HTTP_200_OK)
 
@@ -373,6 +400,9 @@ def actualizar_usuario(request, id_usuario):
         
         # Guardar cambios
         usuario.save()
+        invalidar_principal(usuario.id)
+        if name_user:
+            incrementar_version_permisos()
         
         return Response({
             'mensaje': 'Usuario actualizado exitosamente',
@@ -405,6 +435,8 @@ def eliminar_usuario(request, id_usuario):
         
         # Eliminar el usuario
         usuario.delete()
+        invalidar_principal(info_eliminada['id'])
+        incrementar_version_permisos()
         
         return Response({
             'mensaje': 'Usuario eliminado exitosamente',